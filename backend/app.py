@@ -9,17 +9,32 @@ import threading
 import traceback
 import re
 import time
-import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import pandas as pd
-from openai import OpenAI
 
 # 导入自定义模块
 from crawler import BilibiliCrawler
-from transcriber import get_transcriber, TranscriptResult
+from rate_limiter import TokenBucketRateLimiter
+from detail_cache import VideoDetailCache
+from crawl_jobs import CrawlJobStore, CrawlJobRegistry
+from event_bus import EventBus
+from download_scheduler import DownloadScheduler
+from downloads_catalog import DownloadsCatalog, SUMMARY_SUFFIX
+from transcriber import (WhisperTranscriber, TranscriptResult, TranscriptWriter,
+                         ENGINES as TRANSCRIBE_ENGINES, load_engine_model)
+from transcript_cache import TranscriptCache
+from transcript_index import TranscriptIndex
+from summary_cache import SummaryCache
+from model_manager import ModelManager, parse_model_specs
+from transcribe_queue import TranscribeQueue, TranscribeQueueFull
+from transcribe_batch import BatchItem, BatchTranscriber
+from pipeline import PipelineJob, PipelineStage
+import summarizer
 
 # ========== 配置 ==========
 os.environ['PATH'] = '/opt/homebrew/bin:/usr/local/bin:' + os.environ.get('PATH', '')
@@ -28,6 +43,8 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 FRONTEND_DIR = os.path.join(BASE_DIR, 'frontend')
 DOWNLOAD_DIR = os.path.join(BASE_DIR, 'downloads')
 UPLOAD_DIR = os.path.join(BASE_DIR, 'uploads')
+CACHE_DIR = os.path.join(BASE_DIR, 'cache')
+DATA_DIR = os.path.join(BASE_DIR, 'data')
 
 # 创建Flask应用
 app = Flask(__name__, static_folder=FRONTEND_DIR, static_url_path='')
@@ -37,9 +54,67 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_DIR
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
 app.config['ALLOWED_EXTENSIONS'] = {'xlsx', 'xls'}
 
+# 爬虫并发与限速配置（可通过环境变量覆盖）
+CRAWLER_SEARCH_WORKERS = int(os.environ.get('CRAWLER_SEARCH_WORKERS', 4))
+CRAWLER_RATE = float(os.environ.get('CRAWLER_RATE', 0.5))  # 每秒请求数
+CRAWLER_BURST = int(os.environ.get('CRAWLER_BURST', 2))
+CRAWLER_JITTER = float(os.environ.get('CRAWLER_JITTER', 1.0))  # 随机延迟上限（秒）
+# 搜索限速由所有任务共享，请求参数只能在以下范围内调整（默认不能比上面的配置更快）
+CRAWLER_MAX_RATE = float(os.environ.get('CRAWLER_MAX_RATE', CRAWLER_RATE))
+CRAWLER_MAX_BURST = int(os.environ.get('CRAWLER_MAX_BURST', CRAWLER_BURST))
+CRAWLER_MIN_JITTER = float(os.environ.get('CRAWLER_MIN_JITTER', 0.0))
+CRAWLER_PARSER_ENGINE = os.environ.get('CRAWLER_PARSER_ENGINE', 'fast')  # fast / bs4
+CRAWLER_DETAIL_WORKERS = int(os.environ.get('CRAWLER_DETAIL_WORKERS', 4))
+CRAWLER_DETAIL_RATE = float(os.environ.get('CRAWLER_DETAIL_RATE', 1.0))
+CRAWLER_DETAIL_BURST = int(os.environ.get('CRAWLER_DETAIL_BURST', 2))
+CRAWLER_DETAIL_JITTER = float(os.environ.get('CRAWLER_DETAIL_JITTER', 0.5))
+CRAWLER_DETAIL_RETRIES = int(os.environ.get('CRAWLER_DETAIL_RETRIES', 2))
+ENRICH_BATCH_SIZE = 200  # 补充详细信息时每批从存储读取的视频数
+STATUS_VIDEO_LIMIT = 100  # 状态轮询每次最多返回的新视频数
+VIDEO_PAGE_MAX_LIMIT = 1000  # 视频分页接口单页上限
+DETAIL_CACHE_TTL = float(os.environ.get('DETAIL_CACHE_TTL', 7 * 24 * 3600))  # 秒
+DETAIL_CACHE_MAX_ENTRIES = int(os.environ.get('DETAIL_CACHE_MAX_ENTRIES', 200000))
+# 转写工作线程数与排队上限（同一模型被并发使用时每个线程各借一份）
+TRANSCRIBE_MODEL_SIZE = os.environ.get('TRANSCRIBE_MODEL_SIZE', 'medium')
+TRANSCRIBE_ENGINE = os.environ.get('TRANSCRIBE_ENGINE', 'openai')  # openai / faster
+TRANSCRIBE_COMPUTE_TYPE = os.environ.get('TRANSCRIBE_COMPUTE_TYPE', 'int8')  # faster 引擎的计算精度
+TRANSCRIBE_LANGUAGE = 'zh'
+TRANSCRIBE_WORKERS = int(os.environ.get('TRANSCRIBE_WORKERS', 1))
+TRANSCRIBE_QUEUE_SIZE = int(os.environ.get('TRANSCRIBE_QUEUE_SIZE', 20))
+# 启动时后台预加载的模型，如 "medium,faster:small"（未写引擎时为 TRANSCRIBE_ENGINE），空表示不预加载
+TRANSCRIBE_PRELOAD_MODELS = os.environ.get('TRANSCRIBE_PRELOAD_MODELS', '')
+# 模型常驻内存预算（MB），超出时卸载最久未使用的空闲模型，0 表示不限制
+TRANSCRIBE_MEMORY_BUDGET_MB = float(os.environ.get('TRANSCRIBE_MEMORY_BUDGET_MB', 0))
+# 转写结果缓存条目上限（按音频内容与转写参数去重）
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.environ.get('TRANSCRIPT_CACHE_MAX_ENTRIES', 10000))
+# 批量转写时提前解码的文件数（解码与推理重叠执行）
+TRANSCRIBE_BATCH_PREFETCH = int(os.environ.get('TRANSCRIBE_BATCH_PREFETCH', 1))
+# 音频超过该时长（秒）时解码结果内存映射到磁盘，0 表示不启用
+TRANSCRIBE_MMAP_THRESHOLD = float(os.environ.get('TRANSCRIBE_MMAP_THRESHOLD', 2 * 3600))
+# 长音频分段并行转写：进程数（每个进程各加载一份模型，0 表示不启用）、启用阈值与分段长度（秒）
+TRANSCRIBE_CHUNK_WORKERS = int(os.environ.get('TRANSCRIBE_CHUNK_WORKERS', 0))
+TRANSCRIBE_LONG_AUDIO_THRESHOLD = float(os.environ.get('TRANSCRIBE_LONG_AUDIO_THRESHOLD', 1800))
+TRANSCRIBE_CHUNK_SECONDS = float(os.environ.get('TRANSCRIBE_CHUNK_SECONDS', 300))
+# 流式转写：openai 引擎按该长度（秒）逐段转写并实时产出结果，0 表示整段一次转写
+TRANSCRIBE_STREAM_SECONDS = float(os.environ.get('TRANSCRIBE_STREAM_SECONDS', 60))
+# 长文本分块总结：每块估计的 token 上限与同时进行的请求数
+SUMMARY_CHUNK_TOKENS = int(os.environ.get('SUMMARY_CHUNK_TOKENS', 3000))
+SUMMARY_MAX_CONCURRENCY = int(os.environ.get('SUMMARY_MAX_CONCURRENCY', 4))
+SUMMARY_CACHE_TTL = float(os.environ.get('SUMMARY_CACHE_TTL', 30 * 24 * 3600))  # 秒
+SUMMARY_CACHE_MAX_ENTRIES = int(os.environ.get('SUMMARY_CACHE_MAX_ENTRIES', 5000))
+# 同时运行的 yt-dlp 下载数
+DOWNLOAD_MAX_CONCURRENT = int(os.environ.get('DOWNLOAD_MAX_CONCURRENT', 3))
+# 后台核对下载目录索引的间隔（秒）
+DOWNLOADS_SCAN_INTERVAL = float(os.environ.get('DOWNLOADS_SCAN_INTERVAL', 60))
+DOWNLOADS_PAGE_MAX_SIZE = 500  # 下载列表单页上限
+# 所有爬取任务共享的请求线程数；单个任务搜索/补充详情时分别最多占用上面的 WORKERS 个
+CRAWLER_POOL_WORKERS = int(os.environ.get('CRAWLER_POOL_WORKERS', 8))
+
 # 确保目录存在
 os.makedirs(DOWNLOAD_DIR, exist_ok=True)
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
+os.makedirs(DATA_DIR, exist_ok=True)
 
 # ========== 全局状态存储 ==========
 # 下载任务状态
@@ -48,8 +123,14 @@ download_task_status = {}
 # 转写任务状态
 transcribe_status = {}
 
-# 爬虫任务状态
-crawler_status = {
+# 进度事件总线：后台任务推送进度，/api/events 以 SSE 转发给前端
+event_bus = EventBus()
+TASK_EVENT_INTERVAL = 0.5  # 下载/转写进度事件的最小间隔（秒），状态变化不受限制
+TASK_EVENT_FIELDS = ('status', 'progress', 'message')
+
+# 没有任何爬虫任务时返回的空闲状态
+IDLE_CRAWLER_STATUS = {
+    'job_id': None,
     'is_running': False,
     'is_paused': False,
     'progress': 0,
@@ -60,11 +141,52 @@ crawler_status = {
     'current_keyword': '',
     'error': None,
     'logs': [],
-    'videos': []
+    'log_cursor': 0
 }
 
-# 初始化爬虫
-crawler = BilibiliCrawler()
+# 初始化爬虫，搜索与详情请求分别由全局令牌桶统一限速
+crawler = BilibiliCrawler(parser_engine=CRAWLER_PARSER_ENGINE)
+search_rate_limiter = TokenBucketRateLimiter(CRAWLER_RATE, CRAWLER_BURST, CRAWLER_JITTER)
+detail_rate_limiter = TokenBucketRateLimiter(CRAWLER_DETAIL_RATE, CRAWLER_DETAIL_BURST, CRAWLER_DETAIL_JITTER)
+crawler.set_rate_limiter(BilibiliCrawler.SEARCH_HOST, search_rate_limiter)
+crawler.set_rate_limiter(BilibiliCrawler.DETAIL_HOST, detail_rate_limiter)
+
+# 视频详情持久化缓存，重复爬取时无需再次请求详情页
+detail_cache = VideoDetailCache(
+    os.path.join(CACHE_DIR, 'video_details.db'),
+    ttl=DETAIL_CACHE_TTL,
+    max_entries=DETAIL_CACHE_MAX_ENTRIES
+)
+crawler.set_detail_cache(detail_cache)
+
+# 转写结果持久化缓存：相同音频与参数直接返回已有结果，重启后仍有效
+transcript_cache = TranscriptCache(
+    os.path.join(CACHE_DIR, 'transcripts.db'),
+    max_entries=TRANSCRIPT_CACHE_MAX_ENTRIES
+)
+
+# 总结结果持久化缓存：相同文本、总结要求、模型与接口地址直接返回已有总结
+summary_cache = SummaryCache(
+    os.path.join(CACHE_DIR, 'summaries.db'),
+    ttl=SUMMARY_CACHE_TTL,
+    max_entries=SUMMARY_CACHE_MAX_ENTRIES
+)
+
+# 转写全文索引：转写完成时按片段增量建立，/api/search/transcripts 直接检索
+transcript_index = TranscriptIndex(os.path.join(CACHE_DIR, 'transcript_index.db'))
+
+# 下载目录索引：下载列表直接查询索引，下载/转写/删除时即时更新，后台定期核对外部改动
+downloads_catalog = DownloadsCatalog(os.path.join(CACHE_DIR, 'downloads.db'), DOWNLOAD_DIR)
+
+# 爬取任务存储：每个任务的结果逐页落盘并记录断点，崩溃或重启后可继续
+job_store = CrawlJobStore(os.path.join(DATA_DIR, 'crawl_jobs'))
+# 任务注册表：每个任务独立的状态与日志，可同时运行多个任务
+job_registry = CrawlJobRegistry(job_store, event_bus)
+# 所有任务共享的请求线程池，请求总量由上面的全局令牌桶约束
+crawler_executor = ThreadPoolExecutor(
+    max_workers=CRAWLER_POOL_WORKERS,
+    thread_name_prefix='crawler'
+)
 
 
 # ========== 工具函数 ==========
@@ -73,17 +195,41 @@ def allowed_file(filename):
         filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
 
-def add_crawler_log(message, is_error=False):
-    """添加爬虫日志"""
-    timestamp = datetime.now().strftime('%H:%M:%S')
-    log_entry = {
-        'timestamp': timestamp,
-        'message': message,
-        'is_error': is_error
-    }
-    crawler_status['logs'].append(log_entry)
-    if len(crawler_status['logs']) > 100:
-        crawler_status['logs'] = crawler_status['logs'][-100:]
+def publish_task_status(event, task_id, status, throttle=False):
+    """推送下载/转写任务状态事件（只含进度字段，转写全文等仍通过状态接口获取）"""
+    data = {'task_id': task_id}
+    data.update({key: status[key] for key in TASK_EVENT_FIELDS if key in status})
+    event_bus.publish(
+        event, data,
+        throttle_key=f'{event}:{task_id}' if throttle else None,
+        min_interval=TASK_EVENT_INTERVAL
+    )
+
+
+def set_download_status(task_id, status):
+    download_task_status[task_id] = status
+    publish_task_status('download', task_id, status)
+
+
+def set_transcribe_status(task_id, status, throttle=False):
+    transcribe_status[task_id] = status
+    publish_task_status('transcribe', task_id, status, throttle=throttle)
+
+
+def configure_rate_limiter_from_form(form):
+    """
+    根据请求参数调整搜索限速（rate / burst / jitter，均可选）
+
+    限速器为所有任务共享，参数限制在 CRAWLER_MAX_RATE / CRAWLER_MAX_BURST / CRAWLER_MIN_JITTER 以内
+    """
+    rate = form.get('rate', type=float)
+    burst = form.get('burst', type=int)
+    jitter = form.get('jitter', type=float)
+    search_rate_limiter.configure(
+        rate=None if rate is None else min(rate, CRAWLER_MAX_RATE),
+        burst=None if burst is None else min(burst, CRAWLER_MAX_BURST),
+        jitter=None if jitter is None else max(jitter, CRAWLER_MIN_JITTER)
+    )
 
 
 def read_keywords(filepath):
@@ -98,157 +244,261 @@ def read_keywords(filepath):
 
 
 # ========== 爬虫任务 ==========
-def run_crawler_task(filename, pages_per_keyword=5, enable_detailed_info=True, remove_duplicates=True):
-    """运行爬虫任务"""
-    global crawler_status
-
+def wait_while_paused(job):
+    """任务暂停时在调度线程中等待，返回任务是否未被停止"""
+    while job.is_paused and not job.stop_event.is_set():
+        job.stop_event.wait(0.5)
+    return not job.stop_event.is_set()
+
+
+def search_keywords_concurrently(job):
+    """
+    并发搜索任务的所有关键词/页码组合，每页结果到达后立即写入结果存储并记录断点，
+    已在断点中的页面会被跳过
+
+    Returns:
+        是否完成全部搜索（任务被停止时返回 False）
+    """
+    keywords = job.keywords
+    pages_per_keyword = job.params.get('pages_per_keyword', 5)
+    store = job.store
+
+    done = store.get_done_pages()
+    pending = [(i, keyword, page)
+               for i, keyword in enumerate(keywords)
+               for page in range(1, pages_per_keyword + 1)
+               if (i, page) not in done]
+
+    keyword_counts = {i: 0 for i in range(len(keywords))}
+    pages_left = {i: 0 for i in range(len(keywords))}
+    for i, _, _ in pending:
+        pages_left[i] += 1
+    total_pages = len(keywords) * pages_per_keyword
+    done_pages = total_pages - len(pending)
+    finished_keywords = sum(1 for left in pages_left.values() if left == 0)
+    job.update(processed_keywords=finished_keywords,
+               progress=int((done_pages / total_pages) * 50) if total_pages else 50)
+    duplicate_count = 0
+    failed_pages = 0
+
+    if done:
+        job.add_log(f"从断点继续：已完成 {done_pages}/{total_pages} 页")
+
+    # 每个任务最多同时占用 CRAWLER_SEARCH_WORKERS 个共享线程，暂停时不再提交新请求
+    in_flight = {}
+    next_index = 0
     try:
-        crawler_status['is_running'] = True
-        crawler_status['is_paused'] = False
-        crawler_status['progress'] = 0
-        crawler_status['error'] = None
-        crawler_status['logs'] = []
-        crawler_status['videos'] = []
-
-        # 读取关键词
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        keywords = read_keywords(filepath)
-        if not keywords:
-            crawler_status['error'] = "未找到关键词"
-            add_crawler_log("未找到关键词", True)
-            return
+        while next_index < len(pending) or in_flight:
+            while next_index < len(pending) and len(in_flight) < CRAWLER_SEARCH_WORKERS:
+                if not wait_while_paused(job):
+                    return False
+                i, keyword, page = pending[next_index]
+                future = crawler_executor.submit(crawler.search, keyword, page, stop_event=job.stop_event)
+                in_flight[future] = pending[next_index]
+                next_index += 1
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i, keyword, page = in_flight.pop(future)
+
+                if job.stop_event.is_set():
+                    return False
 
-        crawler_status['total_keywords'] = len(keywords)
-        crawler_status['processed_keywords'] = 0
-        crawler_status['total_videos'] = 0
+                try:
+                    videos = future.result()
+                except Exception as e:
+                    # 请求失败的页面不记录断点，从断点继续时会重新请求
+                    job.add_log(f"关键词 '{keyword}' 第{page}页请求异常: {str(e)}", True)
+                    failed_pages += 1
+                    videos = None
+
+                if videos is not None:
+                    current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    for video in videos:
+                        video['搜索关键词'] = keyword
+                        video['操作时间'] = current_time
 
-        add_crawler_log(f"找到 {len(keywords)} 个关键词")
+                    _, skipped = store.add_page(i, page, videos)
+                    duplicate_count += skipped
 
-        all_videos = []
+                    if videos:
+                        keyword_counts[i] += len(videos)
+                        job.update(total_videos=store.count())
+                        job.add_log(f"'{keyword}' 第{page}页成功获取到 {len(videos)} 个视频")
+                    else:
+                        job.add_log(f"'{keyword}' 第{page}页未获取到数据")
 
-        # 第一阶段：搜索并抓取基础信息
-        for i, keyword in enumerate(keywords):
-            while crawler_status['is_paused']:
-                if not crawler_status['is_running']:
-                    return
-                time.sleep(1)
+                done_pages += 1
+                pages_left[i] -= 1
+                job.update(current_keyword=keyword, progress=int((done_pages / total_pages) * 50))
 
-            if not crawler_status['is_running']:
-                add_crawler_log("任务已停止")
-                return
+                if pages_left[i] == 0:
+                    finished_keywords += 1
+                    job.update(processed_keywords=finished_keywords)
+                    job.add_log(f"关键词 '{keyword}' 处理完成，共获取 {keyword_counts[i]} 个视频")
+    finally:
+        # 共享线程池不能关闭，只取消本任务尚未开始的请求
+        for future in in_flight:
+            future.cancel()
+
+    if duplicate_count:
+        job.add_log(f"去除了 {duplicate_count} 个重复视频")
+    if failed_pages:
+        job.add_log(f"{failed_pages} 个页面请求失败，未记录断点，可从断点继续重试", True)
+    return True
+
+
+def enrich_stored_videos(job):
+    """
+    分批从任务的结果存储读取未补充详情的视频，补充后写回
+
+    Returns:
+        是否全部完成（任务被停止时返回 False）
+    """
+    store = job.store
+    total = store.count()
+    processed = total - store.count(pending_only=True)
+
+    for batch in store.iter_batches(batch_size=ENRICH_BATCH_SIZE, pending_only=True):
+        base = processed
+
+        def on_enrich_progress(done, _batch_total):
+            overall = base + done
+            job.update(progress=50 + int((overall / total) * 40),
+                       current_task=f'正在补充视频详细信息 ({overall}/{total})...')
+            if overall % 10 == 0 or overall == total:
+                job.add_log(f"已处理 {overall}/{total} 个视频")
+
+        failed = set()
+        enriched = crawler.enrich_videos(
+            [video for _, video in batch],
+            max_retries=CRAWLER_DETAIL_RETRIES,
+            item_callback=on_enrich_progress,
+            stop_event=job.stop_event,
+            force_refresh=job.params.get('force_refresh', False),
+            max_workers=CRAWLER_DETAIL_WORKERS,
+            executor=crawler_executor,
+            failed=failed
+        )
+        if job.stop_event.is_set():
+            return False
 
-            crawler_status['current_keyword'] = keyword
-            crawler_status['processed_keywords'] = i
-            crawler_status['progress'] = int((i / len(keywords)) * 50)
+        # 只标记成功补充详情的视频，失败的保持待补充，从断点继续时重试
+        store.update_videos([(seq, video) for index, ((seq, _), video) in enumerate(zip(batch, enriched))
+                             if index not in failed])
+        if failed:
+            job.add_log(f"{len(failed)} 个视频详情获取失败，可从断点继续重试", True)
+        processed += len(batch)
 
-            add_crawler_log(f"开始处理关键词: {keyword}")
+    return True
 
-            for page in range(1, pages_per_keyword + 1):
-                add_crawler_log(f"处理第{page}页...")
 
-                videos = crawler.search(keyword, page)
+def run_crawler_task(job):
+    """运行（或从断点继续）爬虫任务"""
+    store = job.store
 
-                if videos:
-                    current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    for video in videos:
-                        video['搜索关键词'] = keyword
-                        video['操作时间'] = current_time
+    try:
+        job.start()
+        job_store.update_status(store, 'running')
 
-                    all_videos.extend(videos)
-                    crawler_status['total_videos'] = len(all_videos)
-                    crawler_status['videos'] = all_videos
-                    add_crawler_log(f"第{page}页成功获取到 {len(videos)} 个视频")
-                else:
-                    add_crawler_log(f"第{page}页未获取到数据")
+        if not job.keywords:
+            job.update(error="未找到关键词")
+            job.add_log("未找到关键词", True)
+            job_store.update_status(store, 'error')
+            return
 
-                delay = random.uniform(3, 5)
-                add_crawler_log(f"等待 {delay:.1f} 秒...")
-                time.sleep(delay)
+        job.add_log(f"任务 {job.job_id}：共 {len(job.keywords)} 个关键词")
+        limiter_stats = search_rate_limiter.get_stats()
+        job.add_log(f"共享线程池: {CRAWLER_POOL_WORKERS} 个线程（运行中任务 {len(job_registry.running())} 个），"
+                    f"搜索限速 {limiter_stats['rate']} 次/秒（突发 {limiter_stats['burst']}）")
 
-            keyword_count = len([v for v in all_videos if v['搜索关键词'] == keyword])
-            add_crawler_log(f"关键词 '{keyword}' 处理完成，共获取 {keyword_count} 个视频")
+        # 第一阶段：并发搜索，每页结果即时写入存储并增量去重
+        if not search_keywords_concurrently(job):
+            job_store.update_status(store, 'stopped')
+            return
 
         # 第二阶段：补充详细信息
-        if all_videos:
-            crawler_status['progress'] = 50
-            crawler_status['current_task'] = '正在补充视频详细信息...'
-            add_crawler_log("开始补充视频详细信息...")
-
-            # 去重
-            if remove_duplicates:
-                df_temp = pd.DataFrame(all_videos)
-                before_count = len(df_temp)
-                df_temp = df_temp.drop_duplicates(subset=['bvid'], keep='first')
-                after_count = len(df_temp)
-
-                if before_count != after_count:
-                    add_crawler_log(f"去除了 {before_count - after_count} 个重复视频")
-
-                all_videos = df_temp.to_dict('records')
-
-            # 补充详细信息
-            if enable_detailed_info:
-                enriched_videos = crawler.enrich_videos(all_videos,
-                                                        progress_callback=lambda msg: add_crawler_log(msg))
-            else:
-                enriched_videos = all_videos
-
-            # 第三阶段：保存数据
-            crawler_status['progress'] = 90
-            crawler_status['current_task'] = '正在保存数据...'
-            add_crawler_log("开始保存数据...")
-
-            df = pd.DataFrame(enriched_videos)
-
-            columns_order = [
-                'bvid', 'title', 'arcurl', 'description', 'author',
-                'uploadDate', 'play', 'review', 'tag', 'pubdate',
-                'duration', '搜索关键词', '操作时间'
-            ]
+        if store.count():
+            job.update(progress=50, current_task='正在补充视频详细信息...')
+
+            if job.params.get('enable_detailed_info', True):
+                job.add_log("开始补充视频详细信息...")
+                completed = enrich_stored_videos(job)
+                cache_stats = detail_cache.get_stats()
+                job.add_log(f"详情缓存: 命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次")
+                if not completed:
+                    job_store.update_status(store, 'stopped')
+                    return
 
-            for col in columns_order:
-                if col not in df.columns:
-                    df[col] = ''
+            # 第三阶段：从存储导出 Excel
+            job.update(progress=90, current_task='正在保存数据...')
+            job.add_log("开始保存数据...")
 
-            df = df[columns_order]
+            output_filename = job_store.export_path(job.job_id)
+            exported = store.export_excel(output_filename)
 
-            output_filename = os.path.join(DOWNLOAD_DIR, 'BVID.xlsx')
-            df.to_excel(output_filename, index=False)
+            job.update(progress=100, current_task='任务完成！')
+            job.add_log(f"数据已保存到 {output_filename}")
+            job.add_log(f"总共获取到 {exported} 个唯一视频数据")
 
-            crawler_status['progress'] = 100
-            crawler_status['current_task'] = '任务完成！'
-            crawler_status['videos'] = enriched_videos
-            add_crawler_log(f"数据已保存到 {output_filename}")
-            add_crawler_log(f"总共获取到 {len(df)} 个唯一视频数据")
+            # 仍有请求失败的页面或未补充详情的视频时不标记完成，以便从断点继续重试
+            total_pages = len(job.keywords) * job.params.get('pages_per_keyword', 5)
+            incomplete = (len(store.get_done_pages()) < total_pages
+                          or (job.params.get('enable_detailed_info', True) and store.count(pending_only=True)))
+            job_store.update_status(store, 'incomplete' if incomplete else 'completed')
         else:
-            crawler_status['error'] = "未获取到任何数据"
-            add_crawler_log("未获取到任何数据", True)
+            job.update(error="未获取到任何数据")
+            job.add_log("未获取到任何数据", True)
+            job_store.update_status(store, 'error')
 
     except Exception as e:
-        crawler_status['error'] = f"任务执行出错: {str(e)}"
-        add_crawler_log(f"任务执行出错: {str(e)}", True)
+        job.update(error=f"任务执行出错: {str(e)}")
+        job.add_log(f"任务执行出错: {str(e)}", True)
+        job_store.update_status(store, 'error')
     finally:
-        crawler_status['is_running'] = False
-        crawler_status['is_paused'] = False
+        job.finish()
+
+
+def start_crawler_job(job):
+    """
+    在后台线程中运行爬虫任务（该线程只负责调度，请求在共享线程池中执行）
+
+    Returns:
+        是否已启动；任务已在运行时返回 False
+    """
+    if not job.try_start():
+        return False
+    thread = threading.Thread(target=run_crawler_task, args=(job,))
+    thread.daemon = True
+    thread.start()
+    return True
+
+
+def read_crawler_params(form):
+    """从请求表单读取爬取参数"""
+    return {
+        'pages_per_keyword': form.get('pages', 5, type=int),
+        'enable_detailed_info': form.get('enable_detailed_info', 'true') == 'true',
+        'remove_duplicates': form.get('remove_duplicates', 'true') == 'true',
+        'force_refresh': form.get('force_refresh', 'false') == 'true',
+    }
 
-        # 清理临时文件
-        if filename.startswith('temp_keywords_'):
-            try:
-                temp_filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                if os.path.exists(temp_filepath):
-                    os.remove(temp_filepath)
-            except:
-                pass
+
+def get_job_or_latest(job_id=None):
+    """按 ID 获取任务，未提供 ID 时返回最近启动的任务"""
+    if job_id:
+        return job_registry.get(job_id)
+    return job_registry.latest()
 
 
 # ========== 下载任务 ==========
-def run_yt_dlp(bvid, download_type, task_id):
-    """运行yt-dlp下载"""
+def run_yt_dlp(bvid, download_type, task_id, task=None):
+    """运行yt-dlp下载（task 为调度器中的任务，用于取消）"""
     url = f"https://www.bilibili.com/video/{bvid}"
     output_dir = os.path.join(DOWNLOAD_DIR, bvid)
     os.makedirs(output_dir, exist_ok=True)
 
-    download_task_status[task_id] = {"status": "downloading", "progress": 0, "message": "开始下载..."}
+    set_download_status(task_id, {"status": "downloading", "progress": 0, "message": "开始下载..."})
 
     try:
         import shutil
@@ -297,6 +547,8 @@ def run_yt_dlp(bvid, download_type, task_id):
             bufsize=1,
             env=os.environ
         )
+        if task is not None:
+            download_scheduler.attach_process(task, process)
 
         output_lines = []
         for line in process.stdout:
@@ -315,94 +567,432 @@ def run_yt_dlp(bvid, download_type, task_id):
                 except:
                     pass
 
+            publish_task_status('download', task_id, download_task_status[task_id], throttle=True)
+
         process.wait()
 
+        if task is not None and task.cancelled:
+            # 清理未完成的分片文件
+            for f in os.listdir(output_dir):
+                if f.endswith(('.part', '.ytdl')):
+                    os.remove(os.path.join(output_dir, f))
+            set_download_status(task_id, {"status": "cancelled", "progress": 0, "message": "已取消"})
+            return
+
         if process.returncode == 0:
             files = os.listdir(output_dir) if os.path.exists(output_dir) else []
             if files:
-                download_task_status[task_id] = {
+                set_download_status(task_id, {
                     "status": "completed",
                     "progress": 100,
                     "message": f"下载完成，共 {len(files)} 个文件",
                     "output_dir": output_dir
-                }
+                })
             else:
-                download_task_status[task_id] = {
+                set_download_status(task_id, {
                     "status": "error",
                     "message": "下载完成但未找到文件"
-                }
+                })
         else:
             error_lines = [l for l in output_lines if 'error' in l.lower()]
             error_msg = error_lines[-1] if error_lines else output_lines[-1] if output_lines else "未知错误"
-            download_task_status[task_id] = {
+            set_download_status(task_id, {
                 "status": "error",
                 "message": error_msg[:200]
-            }
+            })
 
     except FileNotFoundError:
-        download_task_status[task_id] = {
+        set_download_status(task_id, {
             "status": "error",
             "message": "yt-dlp 未安装，请运行: pip install yt-dlp"
-        }
+        })
     except Exception as e:
-        download_task_status[task_id] = {
+        set_download_status(task_id, {
             "status": "error",
             "message": f"异常: {str(e)}"
-        }
+        })
+    finally:
+        downloads_catalog.refresh(bvid)
+
+
+def set_download_queued(task):
+    """下载任务加入队列时写入排队状态"""
+    set_download_status(task.task_id, {"status": "queued", "progress": 0, "message": "排队中..."})
+
+
+def run_download_task(task):
+    """下载调度器的执行函数"""
+    run_yt_dlp(task.bvid, task.download_type, task.task_id, task)
+
+
+# 下载队列：按优先级排队，最多 DOWNLOAD_MAX_CONCURRENT 个同时执行
+download_scheduler = DownloadScheduler(run_download_task, max_concurrent=DOWNLOAD_MAX_CONCURRENT)
 
 
 # ========== 转写任务 ==========
-def run_transcribe(bvid, audio_file, task_id, output_formats):
-    """后台运行转写任务"""
+def segment_to_dict(seg) -> dict:
+    """转写片段的接口格式"""
+    return {
+        "start": seg.start,
+        "end": seg.end,
+        "start_formatted": seg.start_formatted,
+        "end_formatted": seg.end_formatted,
+        "text": seg.text
+    }
+
+
+def transcribe_cache_params(engine: str, model_size: str) -> dict:
+    """影响转写结果的参数，与音频内容哈希一起组成缓存键"""
+    return {
+        "engine": engine,
+        "model": model_size,
+        "compute_type": TRANSCRIBE_COMPUTE_TYPE if engine == 'faster' else None,
+        "language": TRANSCRIBE_LANGUAGE,
+        "task": "transcribe",
+        "prompt": WhisperTranscriber.SIMPLIFIED_CHINESE_PROMPT
+    }
+
+
+def completed_transcribe_status(result: TranscriptResult, files: dict) -> dict:
+    """转写完成后的任务状态"""
+    return {
+        "status": "completed",
+        "progress": 100,
+        "message": "转写完成",
+        "text": result.text,
+        "timestamped_text": result.to_timestamped_text(),
+        "segments": [segment_to_dict(seg) for seg in result.segments],
+        "duration": result.duration,
+        "language": result.language,
+        "files": files
+    }
+
+
+def index_transcript(bvid, result, audio_file):
+    """将转写结果加入全文索引，标题取音频文件名"""
     try:
-        output_dir = os.path.join(DOWNLOAD_DIR, bvid)
+        transcript_index.index(bvid, result, os.path.splitext(os.path.basename(audio_file))[0])
+    except Exception as e:
+        print(f"[TranscriptIndex] 索引 {bvid} 失败: {e}")
 
-        def progress_callback(message, progress):
-            transcribe_status[task_id] = {
-                "status": "transcribing",
-                "progress": progress,
-                "message": message
-            }
 
-        transcriber = get_transcriber(model_size="medium")
-        transcriber.set_progress_callback(progress_callback)
+def transcribe_file(transcriber, task_id, bvid, audio_file, output_formats, engine, model_size,
+                    audio=None) -> TranscriptResult:
+    """转写一个音频文件：实时上报进度与已转写片段，完成后写入结果缓存与完成状态"""
+    output_dir = os.path.join(DOWNLOAD_DIR, bvid)
+    # 已转写出的片段，转写过程中通过状态接口返回
+    partial_segments = []
+
+    def progress_callback(message, progress):
+        set_transcribe_status(task_id, {
+            "status": "transcribing",
+            "progress": progress,
+            "message": message,
+            "segments": partial_segments,
+            "partial": True
+        }, throttle=True)
+
+    def segment_callback(seg):
+        partial_segments.append(segment_to_dict(seg))
+
+    # 进度回调随本次调用传入，同一转写器上的任务互不覆盖
+    output = transcriber.transcribe_and_save(
+        audio_file,
+        output_dir,
+        formats=output_formats,
+        language=TRANSCRIBE_LANGUAGE,
+        progress_callback=progress_callback,
+        segment_callback=segment_callback,
+        audio=audio
+    )
 
-        output = transcriber.transcribe_and_save(
-            audio_file,
-            output_dir,
-            formats=output_formats,
-            language="zh"
-        )
+    result: TranscriptResult = output["result"]
+    downloads_catalog.refresh(bvid)
+    index_transcript(bvid, result, audio_file)
+
+    params = transcribe_cache_params(engine, model_size)
+    audio_hash = transcript_cache.hash_audio(audio_file)
+    transcript_cache.put(transcript_cache.make_key(audio_hash, params), result, audio_hash, params)
+
+    set_transcribe_status(task_id, completed_transcribe_status(result, output["files"]))
+    return result
+
+
+def set_transcribe_error(task_id, error):
+    set_transcribe_status(task_id, {
+        "status": "error",
+        "progress": 0,
+        "message": f"转写失败: {str(error)}"
+    })
 
-        result: TranscriptResult = output["result"]
-
-        transcribe_status[task_id] = {
-            "status": "completed",
-            "progress": 100,
-            "message": "转写完成",
-            "text": result.text,
-            "timestamped_text": result.to_timestamped_text(),
-            "segments": [
-                {
-                    "start": seg.start,
-                    "end": seg.end,
-                    "start_formatted": seg.start_formatted,
-                    "end_formatted": seg.end_formatted,
-                    "text": seg.text
-                }
-                for seg in result.segments
-            ],
-            "duration": result.duration,
-            "language": result.language,
-            "files": output["files"]
-        }
 
+def run_transcribe(job, transcriber):
+    """转写队列的执行函数，transcriber 为当前工作线程持有的转写器"""
+    try:
+        transcribe_file(transcriber, job.task_id, job.bvid, job.audio_file, job.output_formats,
+                        job.engine, job.model_size)
     except Exception as e:
-        transcribe_status[task_id] = {
-            "status": "error",
+        set_transcribe_error(job.task_id, e)
+
+
+def create_transcriber(engine, model_size):
+    """按配置创建转写器，模型从模型池借用"""
+    return WhisperTranscriber(
+        model_size,
+        engine=engine,
+        model_manager=model_manager,
+        compute_type=TRANSCRIBE_COMPUTE_TYPE,
+        mmap_threshold=TRANSCRIBE_MMAP_THRESHOLD,
+        mmap_dir=CACHE_DIR,
+        chunk_workers=TRANSCRIBE_CHUNK_WORKERS,
+        long_audio_threshold=TRANSCRIBE_LONG_AUDIO_THRESHOLD,
+        chunk_seconds=TRANSCRIBE_CHUNK_SECONDS,
+        stream_seconds=TRANSCRIBE_STREAM_SECONDS
+    )
+
+
+def lookup_cached_transcript(bvid, audio_file, output_formats, engine, model_size):
+    """
+    查找相同音频内容与参数的已有转写结果
+
+    命中时补齐本目录缺少的格式文件并写入完成状态，返回该状态；未命中返回 None
+    """
+    cached = transcript_cache.get(
+        transcript_cache.key_for(audio_file, transcribe_cache_params(engine, model_size)))
+    if cached is None:
+        return None
+    output_dir = os.path.join(DOWNLOAD_DIR, bvid)
+    base_name = os.path.splitext(os.path.basename(audio_file))[0]
+    files = TranscriptWriter.save(cached, output_dir, base_name, output_formats)
+    downloads_catalog.refresh(bvid)
+    index_transcript(bvid, cached, audio_file)
+    status = completed_transcribe_status(cached, files)
+    set_transcribe_status(f"transcribe_{bvid}", status)
+    return status
+
+
+# 模型池：各工作线程按需借用模型，空闲模型留在池中复用，超出内存预算时按最久未使用卸载
+model_manager = ModelManager(
+    lambda engine, model_size: load_engine_model(engine, model_size, TRANSCRIBE_COMPUTE_TYPE),
+    memory_budget_mb=TRANSCRIBE_MEMORY_BUDGET_MB
+)
+
+# 转写队列：TRANSCRIBE_WORKERS 个工作线程，排队满时拒绝新任务
+transcribe_queue = TranscribeQueue(
+    run_transcribe,
+    create_transcriber,
+    workers=TRANSCRIBE_WORKERS,
+    max_queue=TRANSCRIBE_QUEUE_SIZE
+)
+
+
+# ========== 批量转写 ==========
+# 批量转写使用的转写器，按 (引擎, 模型大小) 区分；模型按次从模型池借用，可多线程共用
+shared_transcribers = {}
+shared_transcribers_lock = threading.Lock()
+
+
+def get_shared_transcriber(engine, model_size):
+    key = (engine, model_size)
+    with shared_transcribers_lock:
+        if key not in shared_transcribers:
+            shared_transcribers[key] = create_transcriber(engine, model_size)
+        return shared_transcribers[key]
+
+
+def prepare_batch_item(batch, item):
+    """解码线程：命中缓存的直接完成，否则解码音频供推理线程使用"""
+    task_id = f"transcribe_{item.bvid}"
+    try:
+        if lookup_cached_transcript(item.bvid, item.audio_file, batch.formats,
+                                    batch.engine, batch.model_size) is not None:
+            transcribe_queue.release(task_id)
+            return None
+        set_transcribe_status(task_id, {
+            "status": "queued",
             "progress": 0,
-            "message": f"转写失败: {str(e)}"
-        }
+            "message": "批量转写：已预解码，等待转写..."
+        })
+        return get_shared_transcriber(batch.engine, batch.model_size).load_audio(item.audio_file)
+    except Exception:
+        transcribe_queue.release(task_id)
+        raise
+
+
+def process_batch_item(batch, item, audio):
+    """推理线程：转写已解码的音频，返回音频时长（秒）"""
+    task_id = f"transcribe_{item.bvid}"
+    try:
+        result = transcribe_file(get_shared_transcriber(batch.engine, batch.model_size), task_id,
+                                 item.bvid, item.audio_file, batch.formats,
+                                 batch.engine, batch.model_size, audio=audio)
+    except Exception as e:
+        set_transcribe_error(task_id, e)
+        raise
+    finally:
+        transcribe_queue.release(task_id)
+    return result.duration
+
+
+def publish_batch_status(batch):
+    """推送批次概况，运行中的进度事件节流"""
+    if batch.state == 'cancelled':
+        for item in batch.items:
+            if item.state == 'cancelled':
+                set_transcribe_status(f"transcribe_{item.bvid}", {
+                    "status": "cancelled",
+                    "progress": 0,
+                    "message": "批量转写已取消"
+                })
+                transcribe_queue.release(f"transcribe_{item.bvid}")
+    event_bus.publish('transcribe_batch', batch.to_dict(include_items=False),
+                      throttle_key=f'transcribe_batch:{batch.batch_id}' if batch.state == 'running' else None,
+                      min_interval=TASK_EVENT_INTERVAL)
+
+
+batch_transcriber = BatchTranscriber(
+    prepare_batch_item,
+    process_batch_item,
+    prefetch=TRANSCRIBE_BATCH_PREFETCH,
+    on_update=publish_batch_status
+)
+
+
+# ========== 流水线任务 ==========
+# 流水线任务：关键词 → 搜索 → 下载音频 → 转写 → 总结，各阶段并发执行
+pipeline_jobs = {}
+
+
+def wait_pipeline_task(job, finished):
+    """等待下载或转写队列中的任务结束，流水线被取消时返回 False"""
+    while not finished.wait(1):
+        if job.cancel_event.is_set():
+            return False
+    return True
+
+
+def submit_pipeline_transcribe(job, task_id, bvid, audio_file, formats, engine, model_size):
+    """
+    将流水线条目加入转写队列，队列满时等待后重试
+
+    Returns:
+        新加入的或同一视频已在排队、转写中的任务；流水线被取消时返回 None
+    """
+    while not job.cancel_event.is_set():
+        if not transcribe_queue.is_active(task_id):
+            set_transcribe_status(task_id, {
+                "status": "queued",
+                "progress": 0,
+                "message": "流水线：排队中..."
+            })
+        try:
+            queued = (transcribe_queue.submit(task_id, bvid, audio_file, formats, engine, model_size)
+                      or transcribe_queue.get_job(task_id))
+        except TranscribeQueueFull:
+            job.cancel_event.wait(1)
+            continue
+        if queued is not None:
+            return queued
+    return None
+
+
+def pipeline_search(job, item):
+    """搜索阶段：逐页搜索关键词，每发现一个视频立即交给下载阶段"""
+    keyword = item['keyword']
+    for page in range(1, job.params['pages_per_keyword'] + 1):
+        if not job.accepting:
+            return
+        videos = crawler.search(keyword, page, stop_event=job.cancel_event)
+        if not videos:
+            return
+        for video in videos:
+            yield {'key': video['bvid'], 'bvid': video['bvid'], 'title': video.get('title', ''),
+                   'keyword': keyword}
+
+
+def pipeline_download(job, item):
+    """下载阶段：下载音频，已有音频文件时跳过"""
+    bvid = item['bvid']
+    output_dir = os.path.join(DOWNLOAD_DIR, bvid)
+    audio_file = find_audio_file(output_dir) if os.path.isdir(output_dir) else None
+
+    if not audio_file:
+        # 经下载队列执行：同一音频已在排队或下载中时不重复提交，等待该任务完成
+        task_id = f"{bvid}_audio"
+        task = download_scheduler.submit(task_id, bvid, 'audio', on_queued=set_download_queued)
+        submitted = task is not None
+        if task is None:
+            task = download_scheduler.get_task(task_id)
+        if task is not None and not wait_pipeline_task(job, task.finished):
+            if submitted:
+                download_scheduler.cancel(task_id)
+            # 已取消：交给下游丢弃并标记为取消
+            return [item]
+        audio_file = find_audio_file(output_dir) if os.path.isdir(output_dir) else None
+        if not audio_file:
+            raise RuntimeError(download_task_status.get(task_id, {}).get('message', '下载失败'))
+
+    item['audio_file'] = os.path.basename(audio_file)
+    item['_audio_path'] = audio_file
+    return [item]
+
+
+def pipeline_transcribe(job, item):
+    """转写阶段：命中缓存时直接取结果"""
+    bvid = item['bvid']
+    engine, model_size, formats = job.params['engine'], job.params['model'], job.params['formats']
+    status = lookup_cached_transcript(bvid, item['_audio_path'], formats, engine, model_size)
+    if status is not None:
+        result = TranscriptResult.from_dict(status)
+        item['transcript_cached'] = True
+    else:
+        # 经转写队列执行，与 /api/transcribe 共用工作线程与同一视频的去重
+        task_id = f"transcribe_{bvid}"
+        queued = submit_pipeline_transcribe(job, task_id, bvid, item['_audio_path'], formats,
+                                            engine, model_size)
+        if queued is None or not wait_pipeline_task(job, queued.finished):
+            return [item]
+        status = transcribe_status.get(task_id, {})
+        if status.get('status') != 'completed':
+            raise RuntimeError(status.get('message', '转写失败'))
+        result = TranscriptResult.from_dict(status)
+    item['transcript_chars'] = len(result.text)
+    item['_transcript'] = result
+    # 没有配置总结时流水线到此结束
+    return [item] if 'summary' in job.context else []
+
+
+def pipeline_summarize(job, item):
+    """总结阶段：调用 AI 接口总结转写文本，长文本分块并发总结；命中总结缓存时直接取结果"""
+    result = item.pop('_transcript')
+    if not result.text.strip():
+        item['summary'] = ''
+        return []
+    config = job.context['summary']
+    cache_key = summary_cache.make_key(result.text, config['prompt'], config['model'], config['base_url'])
+    output = summary_cache.get(cache_key)
+    if output is not None:
+        item['summary_cached'] = True
+    else:
+        output = summarizer.summarize_long(
+            text=result.text,
+            segments=result.segments,
+            chunk_tokens=SUMMARY_CHUNK_TOKENS,
+            max_workers=SUMMARY_MAX_CONCURRENCY,
+            **config
+        )
+        summary_cache.put(cache_key, output)
+    save_summary_file(item['bvid'], output['summary'])
+    item['summary'] = output['summary']
+    item['summary_usage'] = output['usage']
+    return []
+
+
+def publish_pipeline_status(job):
+    """推送流水线概况，运行中的进度事件节流"""
+    event_bus.publish('pipeline', job.to_dict(include_items=False),
+                      throttle_key=f'pipeline:{job.job_id}' if job.state == 'running' else None,
+                      min_interval=TASK_EVENT_INTERVAL)
 
 
 # ========== 前端路由 ==========
@@ -432,21 +1022,15 @@ def crawler_upload_file():
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         file.save(filepath)
 
-        pages = request.form.get('pages', 5, type=int)
-        enable_detailed_info = request.form.get('enable_detailed_info', 'true') == 'true'
-        remove_duplicates = request.form.get('remove_duplicates', 'true') == 'true'
-
-        thread = threading.Thread(
-            target=run_crawler_task,
-            args=(filename, pages, enable_detailed_info, remove_duplicates)
-        )
-        thread.daemon = True
-        thread.start()
+        configure_rate_limiter_from_form(request.form)
 
         keywords = read_keywords(filepath)
+        job = job_registry.register(job_store.create_job(keywords, read_crawler_params(request.form)))
+        start_crawler_job(job)
 
         return jsonify({
             'message': '文件上传成功，开始爬取数据',
+            'job_id': job.job_id,
             'filename': filename,
             'keywords_count': len(keywords),
             'keywords': keywords
@@ -467,25 +1051,15 @@ def crawler_start_with_keywords():
         if not keywords or not isinstance(keywords, list):
             return jsonify({'error': '关键词格式不正确'}), 400
 
-        pages = request.form.get('pages', 5, type=int)
-        enable_detailed_info = request.form.get('enable_detailed_info', 'true') == 'true'
-        remove_duplicates = request.form.get('remove_duplicates', 'true') == 'true'
-
-        temp_filename = f"temp_keywords_{int(time.time())}.xlsx"
-        temp_filepath = os.path.join(app.config['UPLOAD_FOLDER'], temp_filename)
+        configure_rate_limiter_from_form(request.form)
 
-        df = pd.DataFrame({'item': keywords})
-        df.to_excel(temp_filepath, index=False)
-
-        thread = threading.Thread(
-            target=run_crawler_task,
-            args=(temp_filename, pages, enable_detailed_info, remove_duplicates)
-        )
-        thread.daemon = True
-        thread.start()
+        keywords = [str(keyword).strip() for keyword in keywords if str(keyword).strip()]
+        job = job_registry.register(job_store.create_job(keywords, read_crawler_params(request.form)))
+        start_crawler_job(job)
 
         return jsonify({
             'message': '开始爬取数据',
+            'job_id': job.job_id,
             'keywords_count': len(keywords),
             'keywords': keywords
         })
@@ -494,60 +1068,204 @@ def crawler_start_with_keywords():
         return jsonify({'error': f'处理关键词失败: {str(e)}'}), 500
 
 
+def crawler_status_response(job):
+    """
+    任务状态（含限速器与缓存统计），按游标增量返回
+
+    查询参数:
+        log_cursor: 客户端已收到的最后一条日志序号，只返回更新的日志
+        video_cursor: 客户端已收到的最后一个视频序号，只返回之后新增的视频
+        video_limit: 本次最多返回的新视频数（不超过 STATUS_VIDEO_LIMIT）
+
+    每次响应的大小与已爬取的视频总数无关；完整列表通过 /videos 分页接口获取
+    """
+    log_cursor = request.args.get('log_cursor', 0, type=int)
+    video_cursor = request.args.get('video_cursor', 0, type=int)
+    video_limit = min(max(request.args.get('video_limit', STATUS_VIDEO_LIMIT, type=int), 0),
+                      STATUS_VIDEO_LIMIT)
+
+    if job is None:
+        status = dict(IDLE_CRAWLER_STATUS)
+        rows = []
+    else:
+        status = job.to_dict(log_since=log_cursor)
+        rows = job.store.get_videos_after(video_cursor, video_limit) if video_limit else []
+
+    return jsonify({
+        **status,
+        'videos': [video for _, video in rows],
+        'video_cursor': rows[-1][0] if rows else video_cursor,
+        'has_more_videos': len(rows) == video_limit and video_limit > 0,
+        'running_jobs': len(job_registry.running()),
+        'rate_limiter': search_rate_limiter.get_stats(),
+        'detail_rate_limiter': detail_rate_limiter.get_stats(),
+        'detail_cache': detail_cache.get_stats()
+    })
+
+
+def crawler_videos_response(job):
+    """分页返回任务的视频列表（offset / limit）"""
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 100, type=int), 1), VIDEO_PAGE_MAX_LIMIT)
+    return jsonify({
+        'job_id': job.job_id,
+        'videos': job.store.get_videos(offset=offset, limit=limit),
+        'total': job.store.count(),
+        'offset': offset,
+        'limit': limit
+    })
+
+
 @app.route('/api/crawler/status')
 def crawler_get_status():
-    """获取爬虫状态"""
-    return jsonify(crawler_status)
+    """获取爬虫任务状态（默认为最近启动的任务）"""
+    return crawler_status_response(get_job_or_latest(request.args.get('job_id')))
+
+
+@app.route('/api/crawler/jobs/<job_id>/status')
+def crawler_get_job_status(job_id):
+    """获取指定爬虫任务状态"""
+    job = job_registry.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    return crawler_status_response(job)
+
+
+@app.route('/api/crawler/videos')
+@app.route('/api/crawler/jobs/<job_id>/videos')
+def crawler_get_videos(job_id=None):
+    """分页获取爬取到的视频"""
+    job = get_job_or_latest(job_id or request.args.get('job_id'))
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    return crawler_videos_response(job)
 
 
 @app.route('/api/crawler/pause', methods=['POST'])
-def crawler_pause():
-    """暂停爬虫"""
-    global crawler_status
-    if crawler_status['is_running'] and not crawler_status['is_paused']:
-        crawler_status['is_paused'] = True
-        add_crawler_log("任务已暂停")
-    return jsonify({'message': '任务已暂停'})
+@app.route('/api/crawler/jobs/<job_id>/pause', methods=['POST'])
+def crawler_pause(job_id=None):
+    """暂停爬虫任务"""
+    job = get_job_or_latest(job_id or request.args.get('job_id'))
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    job.pause()
+    return jsonify({'message': '任务已暂停', 'job_id': job.job_id})
 
 
 @app.route('/api/crawler/resume', methods=['POST'])
-def crawler_resume():
-    """继续爬虫"""
-    global crawler_status
-    if crawler_status['is_running'] and crawler_status['is_paused']:
-        crawler_status['is_paused'] = False
-        add_crawler_log("任务继续执行")
-    return jsonify({'message': '任务继续执行'})
+@app.route('/api/crawler/jobs/<job_id>/resume', methods=['POST'])
+def crawler_resume(job_id=None):
+    """继续已暂停的爬虫任务"""
+    job = get_job_or_latest(job_id or request.args.get('job_id'))
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    job.resume()
+    return jsonify({'message': '任务继续执行', 'job_id': job.job_id})
 
 
 @app.route('/api/crawler/stop', methods=['POST'])
-def crawler_stop():
-    """停止爬虫"""
-    global crawler_status
-    crawler_status['is_running'] = False
-    crawler_status['is_paused'] = False
-    crawler_status['current_task'] = '任务已停止'
-    add_crawler_log("任务已停止")
-    return jsonify({'message': '任务已停止'})
+@app.route('/api/crawler/jobs/<job_id>/stop', methods=['POST'])
+def crawler_stop(job_id=None):
+    """停止爬虫任务"""
+    job = get_job_or_latest(job_id or request.args.get('job_id'))
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    job.stop()
+    return jsonify({'message': '正在停止任务', 'job_id': job.job_id})
+
+
+@app.route('/api/crawler/jobs')
+def crawler_list_jobs():
+    """列出所有爬取任务及其断点进度"""
+    jobs = job_store.list_jobs()
+    for item in jobs:
+        job = job_registry.get(item['job_id'])
+        item['is_running'] = bool(job and job.is_running)
+    return jsonify({'jobs': jobs})
+
+
+@app.route('/api/crawler/resume-job/<job_id>', methods=['POST'])
+def crawler_resume_job(job_id):
+    """从断点继续已停止或中断的爬取任务"""
+    job = job_registry.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    if job.is_running:
+        return jsonify({'error': '任务正在运行'}), 409
+
+    if job.store.get_meta().get('status') == 'completed':
+        return jsonify({'error': '任务已完成'}), 400
+
+    job_registry.register(job.store)
+    if not start_crawler_job(job):
+        return jsonify({'error': '任务正在运行'}), 409
+    return jsonify({
+        'message': '任务继续执行',
+        'job_id': job_id,
+        'pages_done': len(job.store.get_done_pages()),
+        'videos': job.store.count()
+    })
+
+
+@app.route('/api/crawler/cache/clear', methods=['POST'])
+def crawler_clear_cache():
+    """清空视频详情缓存"""
+    detail_cache.clear()
+    return jsonify({'message': '缓存已清空'})
 
 
 @app.route('/api/crawler/download')
-def crawler_download():
-    """下载爬取结果"""
-    filepath = os.path.join(DOWNLOAD_DIR, 'BVID.xlsx')
+@app.route('/api/crawler/jobs/<job_id>/download')
+def crawler_download(job_id=None):
+    """下载爬取结果（从任务的结果存储即时生成 Excel）"""
+    job = get_job_or_latest(job_id or request.args.get('job_id'))
+    if job is None:
+        return jsonify({'error': '文件不存在'}), 404
+
+    filepath = job_store.export_path(job.job_id)
+    if job.store.count():
+        job.store.export_excel(filepath)
     if os.path.exists(filepath):
         return send_file(filepath, as_attachment=True, download_name='BVID.xlsx')
     else:
         return jsonify({'error': '文件不存在'}), 404
 
 
+# ========== 事件推送 API ==========
+@app.route('/api/events')
+def event_stream():
+    """
+    SSE 事件流：推送 crawler / download / transcribe 进度事件
+
+    断线重连时浏览器会带上 Last-Event-ID，期间错过的事件从历史中补发
+    """
+    last_event_id = request.headers.get('Last-Event-ID', type=int) or \
+        request.args.get('last_event_id', 0, type=int)
+    return Response(
+        stream_with_context(event_bus.stream(last_event_id)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
 # ========== 下载 API ==========
 @app.route('/api/download', methods=['POST'])
 def download_video():
-    """启动下载任务"""
+    """
+    将下载任务加入队列
+
+    请求参数:
+        bvids: BV号或视频链接列表
+        type: merged / audio / video_only / danmaku
+        priority: high / normal / low（或整数，越小越先执行），默认 normal
+    """
     data = request.json
     bvids = data.get('bvids', [])
     download_type = data.get('type', 'merged')
+    priority = DownloadScheduler.parse_priority(data.get('priority', 'normal'))
 
     task_ids = []
     for bvid in bvids:
@@ -562,81 +1280,104 @@ def download_video():
         task_id = f"{bvid}_{download_type}"
         task_ids.append(task_id)
 
-        thread = threading.Thread(target=run_yt_dlp, args=(bvid, download_type, task_id))
-        thread.daemon = True
-        thread.start()
+        # 已在排队或下载中的任务不重复加入；排队状态只在确实加入队列时、工作线程开始前写入
+        download_scheduler.submit(task_id, bvid, download_type, priority, on_queued=set_download_queued)
 
-    return jsonify({"task_ids": task_ids})
+    return jsonify({"task_ids": task_ids, "queue": download_scheduler.get_stats()})
 
 
 @app.route('/api/download/status/<task_id>', methods=['GET'])
 def get_download_status(task_id):
-    """获取下载任务状态"""
-    status = download_task_status.get(task_id, {"status": "unknown", "message": "任务不存在"})
+    """获取下载任务状态（排队中时包含 queue_position）"""
+    status = dict(download_task_status.get(task_id, {"status": "unknown", "message": "任务不存在"}))
+    position = download_scheduler.queue_position(task_id)
+    if position is not None:
+        status["queue_position"] = position
+        status["message"] = f"排队中，前面还有 {position - 1} 个任务"
     return jsonify(status)
 
 
-@app.route('/api/downloads', methods=['GET'])
-def list_downloads():
-    """列出所有已下载的内容"""
-    downloads = []
+@app.route('/api/download/cancel/<task_id>', methods=['POST'])
+def cancel_download(task_id):
+    """取消排队中或下载中的任务"""
+    task = download_scheduler.get_task(task_id)
+    if task is None:
+        return jsonify({"error": "任务不存在"}), 404
 
-    if not os.path.exists(DOWNLOAD_DIR):
-        return jsonify({"downloads": []})
+    was_queued = task.state == 'queued'
+    if not download_scheduler.cancel(task_id):
+        return jsonify({"error": "任务已结束"}), 400
 
-    for bvid in os.listdir(DOWNLOAD_DIR):
-        bvid_dir = os.path.join(DOWNLOAD_DIR, bvid)
-        if not os.path.isdir(bvid_dir):
-            continue
+    if was_queued:
+        set_download_status(task_id, {"status": "cancelled", "progress": 0, "message": "已取消"})
+    return jsonify({"message": "已取消", "task_id": task_id})
 
-        files = []
-        has_audio = False
-        has_video = False
-        has_transcript = False
-        title = bvid
 
-        for f in os.listdir(bvid_dir):
-            filepath = os.path.join(bvid_dir, f)
-            if not os.path.isfile(filepath):
-                continue
+@app.route('/api/download/queue', methods=['GET'])
+def get_download_queue():
+    """下载队列概况"""
+    return jsonify({
+        **download_scheduler.get_stats(),
+        "pending": [
+            {"task_id": task.task_id, "bvid": task.bvid, "type": task.download_type,
+             "priority": task.priority}
+            for task in download_scheduler.pending()
+        ]
+    })
 
-            file_info = {
-                "name": f,
-                "size": os.path.getsize(filepath),
-                "path": filepath
-            }
-            files.append(file_info)
-
-            ext = os.path.splitext(f)[1].lower()
-            if ext in ['.m4a', '.mp3', '.wav', '.aac']:
-                has_audio = True
-                title = os.path.splitext(f)[0]
-            elif ext in ['.mp4', '.webm', '.flv', '.mkv']:
-                has_video = True
-                if not has_audio:
-                    title = os.path.splitext(f)[0].replace('_video', '')
-            elif ext == '.txt' and not f.endswith('_timestamped.txt'):
-                has_transcript = True
-            elif ext in ['.srt', '.json']:
-                has_transcript = True
-
-        if files:
-            downloads.append({
-                "bvid": bvid,
-                "title": title,
-                "files": files,
-                "has_audio": has_audio,
-                "has_video": has_video,
-                "has_transcript": has_transcript,
-                "file_count": len(files),
-                "total_size": sum(f["size"] for f in files)
-            })
 
-    downloads.sort(key=lambda x: max(
-        os.path.getmtime(f["path"]) for f in x["files"]
-    ) if x["files"] else 0, reverse=True)
+def parse_flag(value):
+    """解析 true/false 查询参数，未提供时返回 None"""
+    if value is None or value == '':
+        return None
+    return value.lower() in ('1', 'true', 'yes')
+
+
+@app.route('/api/downloads', methods=['GET'])
+def list_downloads():
+    """
+    列出已下载的内容（查询下载目录索引）
+
+    查询参数:
+        page / page_size: 分页，不提供 page_size 时返回全部
+        sort: mtime / title / size / files / bvid（默认 mtime）
+        order: asc / desc（默认 desc）
+        q: 按标题或 BVID 筛选
+        has_audio / has_video / has_transcript / has_summary: 按标记筛选
+        include_files: 是否附带文件列表（默认 true）
+
+    已保存 AI 总结的视频附带 summary 字段
+    """
+    if downloads_catalog.last_scan is None:
+        # 索引尚未与目录核对过（如刚启动），先同步核对一次
+        downloads_catalog.reconcile()
+
+    page = max(1, request.args.get('page', 1, type=int))
+    page_size = min(max(0, request.args.get('page_size', 0, type=int)), DOWNLOADS_PAGE_MAX_SIZE)
+    downloads, total = downloads_catalog.query(
+        page=page,
+        page_size=page_size,
+        sort=request.args.get('sort', 'mtime'),
+        order=request.args.get('order', 'desc'),
+        keyword=request.args.get('q', '').strip(),
+        has_audio=parse_flag(request.args.get('has_audio')),
+        has_video=parse_flag(request.args.get('has_video')),
+        has_transcript=parse_flag(request.args.get('has_transcript')),
+        has_summary=parse_flag(request.args.get('has_summary')),
+        include_files=parse_flag(request.args.get('include_files')) is not False
+    )
+    return jsonify({
+        "downloads": downloads,
+        "total": total,
+        "page": page,
+        "page_size": page_size
+    })
 
-    return jsonify({"downloads": downloads})
+
+@app.route('/api/downloads/rescan', methods=['POST'])
+def rescan_downloads():
+    """立即核对下载目录索引"""
+    return jsonify(downloads_catalog.reconcile())
 
 
 @app.route('/api/files/<bvid>', methods=['GET'])
@@ -670,57 +1411,263 @@ def delete_download(bvid):
 
     try:
         shutil.rmtree(output_dir)
+        downloads_catalog.remove(bvid)
+        transcript_index.remove(bvid)
         return jsonify({"success": True, "message": f"已删除 {bvid}"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 # ========== 转写 API ==========
+AUDIO_EXTENSIONS = ('.m4a', '.mp3', '.wav', '.mp4', '.webm', '.flv', '.aac')
+
+
+def find_audio_file(output_dir):
+    """目录中用于转写的音频/视频文件，没有时返回 None"""
+    for f in os.listdir(output_dir):
+        if f.endswith(AUDIO_EXTENSIONS):
+            return os.path.join(output_dir, f)
+    return None
+
+
 @app.route('/api/transcribe', methods=['POST'])
 def transcribe_audio():
-    """启动音频转文本任务"""
+    """
+    将转写任务加入队列
+
+    请求参数:
+        bvid: BV号
+        formats: 输出格式列表
+        engine: 推理引擎 openai / faster（可选，默认 TRANSCRIBE_ENGINE）
+        model: 模型大小 tiny / base / small / medium / large（可选，默认 TRANSCRIBE_MODEL_SIZE）
+    """
     data = request.json
     bvid = data.get('bvid')
     output_formats = data.get('formats', ['txt'])
+    engine = data.get('engine') or TRANSCRIBE_ENGINE
+    if engine not in TRANSCRIBE_ENGINES:
+        return jsonify({"error": f"未知的转写引擎: {engine}"}), 400
+    model_size = data.get('model') or TRANSCRIBE_MODEL_SIZE
+    if model_size not in WhisperTranscriber.MODEL_SIZES:
+        return jsonify({"error": f"未知的模型大小: {model_size}"}), 400
 
     output_dir = os.path.join(DOWNLOAD_DIR, bvid)
 
     if not os.path.exists(output_dir):
         return jsonify({"error": f"目录不存在: {bvid}，请先下载视频"}), 404
 
-    audio_file = None
-    for f in os.listdir(output_dir):
-        if f.endswith(('.m4a', '.mp3', '.wav', '.mp4', '.webm', '.flv', '.aac')):
-            audio_file = os.path.join(output_dir, f)
-            break
-
+    audio_file = find_audio_file(output_dir)
     if not audio_file:
         return jsonify({"error": "未找到音频/视频文件"}), 404
 
     task_id = f"transcribe_{bvid}"
 
-    if task_id in transcribe_status and transcribe_status[task_id]["status"] == "completed":
-        return jsonify({
-            "task_id": task_id,
-            "status": "completed",
-            "cached": True,
-            **transcribe_status[task_id]
-        })
+    # 已在排队或转写中时直接返回该任务
+    if transcribe_queue.is_active(task_id):
+        return jsonify({"task_id": task_id, "status": "started",
+                        "queue_position": transcribe_queue.queue_position(task_id)})
 
-    transcribe_status[task_id] = {
-        "status": "starting",
+    # 相同音频内容与参数已转写过：直接返回，并补齐本目录缺少的格式文件
+    cached_status = lookup_cached_transcript(bvid, audio_file, output_formats, engine, model_size)
+    if cached_status is not None:
+        return jsonify({"task_id": task_id, "cached": True, **cached_status})
+
+    # 先写排队状态，避免覆盖工作线程已开始上报的进度
+    previous_status = transcribe_status.get(task_id)
+    set_transcribe_status(task_id, {
+        "status": "queued",
         "progress": 0,
-        "message": "正在启动转写任务..."
-    }
+        "message": "排队中..."
+    })
+    try:
+        transcribe_queue.submit(task_id, bvid, audio_file, output_formats, engine, model_size)
+    except TranscribeQueueFull as e:
+        if previous_status is None:
+            transcribe_status.pop(task_id, None)
+        else:
+            transcribe_status[task_id] = previous_status
+        response = jsonify({"error": f"{e}，请稍后重试", "queue": transcribe_queue.get_stats()})
+        response.headers['Retry-After'] = '30'
+        return response, 429
+
+    return jsonify({"task_id": task_id, "status": "started",
+                    "queue_position": transcribe_queue.queue_position(task_id)})
+
+
+@app.route('/api/transcribe/batch', methods=['POST'])
+def transcribe_batch():
+    """
+    批量转写：多个视频按同一条流水线依次处理，解码下一个文件与转写当前文件重叠执行
+
+    请求参数:
+        bvids: BV号列表
+        all_pending: 为 true 时加入所有已下载但还没有转写文本的视频
+        formats / engine / model: 同 /api/transcribe
+    """
+    data = request.json or {}
+    output_formats = data.get('formats', ['txt'])
+    engine = data.get('engine') or TRANSCRIBE_ENGINE
+    if engine not in TRANSCRIBE_ENGINES:
+        return jsonify({"error": f"未知的转写引擎: {engine}"}), 400
+    model_size = data.get('model') or TRANSCRIBE_MODEL_SIZE
+    if model_size not in WhisperTranscriber.MODEL_SIZES:
+        return jsonify({"error": f"未知的模型大小: {model_size}"}), 400
+
+    bvids = list(data.get('bvids') or [])
+    if data.get('all_pending'):
+        pending, _ = downloads_catalog.query(sort='bvid', order='asc', has_transcript=False,
+                                             include_files=False)
+        bvids += [item['bvid'] for item in pending]
+
+    items = []
+    skipped = []
+    seen = set()
+    for bvid in bvids:
+        if bvid in seen:
+            continue
+        seen.add(bvid)
+        output_dir = os.path.join(DOWNLOAD_DIR, bvid)
+        audio_file = find_audio_file(output_dir) if os.path.isdir(output_dir) else None
+        if not audio_file:
+            skipped.append({"bvid": bvid, "reason": "未找到音频/视频文件"})
+        # 在转写队列中登记，批次执行期间 /api/transcribe 与流水线不会再转写同一视频
+        elif transcribe_queue.reserve(f"transcribe_{bvid}", bvid, audio_file, output_formats,
+                                      engine, model_size) is None:
+            skipped.append({"bvid": bvid, "reason": "已在转写队列中"})
+        else:
+            items.append(BatchItem(bvid, audio_file))
+
+    if not items:
+        return jsonify({"error": "没有需要转写的视频", "skipped": skipped}), 400
 
-    thread = threading.Thread(
-        target=run_transcribe,
-        args=(bvid, audio_file, task_id, output_formats)
+    for item in items:
+        set_transcribe_status(f"transcribe_{item.bvid}", {
+            "status": "queued",
+            "progress": 0,
+            "message": "批量转写排队中..."
+        })
+    batch = batch_transcriber.submit(items, engine, model_size, output_formats)
+    return jsonify({"batch_id": batch.batch_id, "total": len(items), "skipped": skipped})
+
+
+@app.route('/api/transcribe/batch/<batch_id>', methods=['GET'])
+def get_transcribe_batch(batch_id):
+    """批次状态：各条目进度与吞吐量（audio_hours_per_hour）"""
+    batch = batch_transcriber.get(batch_id)
+    if batch is None:
+        return jsonify({"error": "批次不存在"}), 404
+    return jsonify(batch.to_dict())
+
+
+@app.route('/api/transcribe/batch/<batch_id>/cancel', methods=['POST'])
+def cancel_transcribe_batch(batch_id):
+    """取消批次，正在转写的文件完成后停止"""
+    if not batch_transcriber.cancel(batch_id):
+        return jsonify({"error": "批次不存在或已结束"}), 404
+    return jsonify({"message": "已取消"})
+
+
+@app.route('/api/transcribe/batches', methods=['GET'])
+def list_transcribe_batches():
+    """所有批次的概况"""
+    return jsonify({"batches": [batch.to_dict(include_items=False) for batch in batch_transcriber.list()]})
+
+
+@app.route('/api/pipeline', methods=['POST'])
+def start_pipeline():
+    """
+    启动流水线任务：搜索关键词，发现的视频依次下载音频、转写、总结，各阶段同时进行
+
+    请求参数:
+        keywords: 关键词列表或以逗号/换行分隔的字符串
+        pages_per_keyword: 每个关键词搜索的页数（默认 1）
+        max_videos: 最多处理的视频数（默认 10）
+        download_workers / transcribe_workers / summarize_workers: 各阶段并发数
+        queue_size: 阶段之间的队列容量（默认 4）
+        formats / engine / model: 转写参数，同 /api/transcribe
+        summary: 总结配置 {api_key, base_url, model, prompt}，不提供 api_key 时只转写不总结
+    """
+    data = request.json or {}
+    keywords = data.get('keywords') or []
+    if isinstance(keywords, str):
+        keywords = re.split(r'[,，\n]', keywords)
+    keywords = [k.strip() for k in keywords if k and k.strip()]
+    if not keywords:
+        return jsonify({"error": "请提供关键词"}), 400
+
+    engine = data.get('engine') or TRANSCRIBE_ENGINE
+    if engine not in TRANSCRIBE_ENGINES:
+        return jsonify({"error": f"未知的转写引擎: {engine}"}), 400
+    model_size = data.get('model') or TRANSCRIBE_MODEL_SIZE
+    if model_size not in WhisperTranscriber.MODEL_SIZES:
+        return jsonify({"error": f"未知的模型大小: {model_size}"}), 400
+
+    params = {
+        'keywords': keywords,
+        'pages_per_keyword': max(1, int(data.get('pages_per_keyword', 1))),
+        'max_videos': max(1, int(data.get('max_videos', 10))),
+        'formats': data.get('formats', ['txt']),
+        'engine': engine,
+        'model': model_size,
+    }
+    queue_size = max(1, int(data.get('queue_size', 4)))
+    stages = [
+        PipelineStage('search', pipeline_search, min(len(keywords), CRAWLER_SEARCH_WORKERS), queue_size),
+        PipelineStage('download', pipeline_download, int(data.get('download_workers', 2)), queue_size),
+        PipelineStage('transcribe', pipeline_transcribe, int(data.get('transcribe_workers', 1)), queue_size),
+    ]
+
+    context = {}
+    summary = data.get('summary') or {}
+    if summary.get('api_key'):
+        context['summary'] = {
+            'api_key': summary['api_key'],
+            'base_url': summary.get('base_url') or summarizer.DEFAULT_BASE_URL,
+            'prompt': summary.get('prompt') or summarizer.DEFAULT_PROMPT,
+            'model': summary.get('model') or summarizer.DEFAULT_MODEL,
+        }
+        params['summary_model'] = context['summary']['model']
+        stages.append(PipelineStage('summarize', pipeline_summarize,
+                                    int(data.get('summarize_workers', 2)), queue_size))
+
+    job = PipelineJob(
+        uuid.uuid4().hex[:12],
+        stages,
+        [{'keyword': keyword} for keyword in keywords],
+        params=params,
+        context=context,
+        max_items=params['max_videos'],
+        on_update=publish_pipeline_status
     )
-    thread.daemon = True
-    thread.start()
+    pipeline_jobs[job.job_id] = job
+    job.start()
+    return jsonify({"job_id": job.job_id, "stages": [stage.name for stage in stages]})
+
+
+@app.route('/api/pipeline/<job_id>', methods=['GET'])
+def get_pipeline(job_id):
+    """流水线状态：各视频所在阶段、各阶段的排队数与占用率"""
+    job = pipeline_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "任务不存在"}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/api/pipeline/<job_id>/cancel', methods=['POST'])
+def cancel_pipeline(job_id):
+    """取消流水线，正在处理的视频完成当前阶段后停止"""
+    job = pipeline_jobs.get(job_id)
+    if job is None or not job.cancel():
+        return jsonify({"error": "任务不存在或已结束"}), 404
+    return jsonify({"message": "已取消"})
+
+
+@app.route('/api/pipelines', methods=['GET'])
+def list_pipelines():
+    """所有流水线任务的概况"""
+    jobs = sorted(pipeline_jobs.values(), key=lambda job: job.created_at, reverse=True)
+    return jsonify({"jobs": [job.to_dict(include_items=False) for job in jobs]})
 
-    return jsonify({"task_id": task_id, "status": "started"})
 
 @app.route('/api/transcript/<bvid>', methods=['GET'])
 def get_transcript_content(bvid):
@@ -759,44 +1706,303 @@ def get_transcript_content(bvid):
 
 @app.route('/api/transcribe/status/<task_id>', methods=['GET'])
 def get_transcribe_status(task_id):
-    """获取转写任务状态"""
-    status = transcribe_status.get(task_id, {"status": "unknown", "message": "任务不存在"})
+    """
+    获取转写任务状态（排队中时包含 queue_position）
+
+    转写过程中 segments 为已转写出的片段；传入 segment_cursor 时只返回该位置之后的片段，
+    响应中的 segment_cursor 供下次请求使用
+    """
+    status = dict(transcribe_status.get(task_id, {"status": "unknown", "message": "任务不存在"}))
+    segments = status.get("segments")
+    if segments is not None:
+        total = len(segments)
+        cursor = request.args.get('segment_cursor', type=int) or 0
+        # 转写线程仍在追加片段，按当前长度取快照
+        status["segments"] = segments[min(max(cursor, 0), total):total]
+        status["segment_cursor"] = total
+    position = transcribe_queue.queue_position(task_id)
+    if position is not None:
+        status["queue_position"] = position
+        status["message"] = f"排队中，前面还有 {position - 1} 个任务"
     return jsonify(status)
 
 
+@app.route('/api/transcribe/queue', methods=['GET'])
+def get_transcribe_queue():
+    """转写队列概况"""
+    return jsonify(transcribe_queue.get_stats())
+
+
+@app.route('/api/transcribe/cache', methods=['GET'])
+def get_transcript_cache_stats():
+    """转写结果缓存统计"""
+    return jsonify(transcript_cache.get_stats())
+
+
+@app.route('/api/transcribe/cache/clear', methods=['POST'])
+def clear_transcript_cache():
+    """清空转写结果缓存"""
+    transcript_cache.clear()
+    return jsonify({'message': '缓存已清空'})
+
+
+@app.route('/api/transcribe/models', methods=['GET'])
+def get_transcribe_models():
+    """模型池概况：已加载的模型、加载耗时与常驻内存"""
+    return jsonify(model_manager.get_stats())
+
+
+# ========== 转写检索 API ==========
+def load_existing_transcript(bvid):
+    """
+    读取视频目录中已有的转写结果（用于补建索引）：优先读 JSON 文件，
+    没有时按音频内容从转写缓存中取；都没有时返回 (None, None)
+
+    Returns:
+        (TranscriptResult, 音频/转写文件路径)
+    """
+    output_dir = os.path.join(DOWNLOAD_DIR, bvid)
+    audio_file = find_audio_file(output_dir)
+    for f in os.listdir(output_dir):
+        if f.endswith(TranscriptWriter.FILE_SUFFIXES['json']):
+            path = os.path.join(output_dir, f)
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    return TranscriptResult.from_json(file.read()), audio_file or path
+            except (ValueError, KeyError):
+                continue
+    if audio_file:
+        cached = transcript_cache.find_by_audio(transcript_cache.hash_audio(audio_file))
+        if cached is not None:
+            return cached, audio_file
+    return None, None
+
+
+def backfill_transcript_index(rebuild=False):
+    """为已有转写文件的视频补建索引，rebuild 为 True 时全部重建"""
+    if downloads_catalog.last_scan is None:
+        downloads_catalog.reconcile()
+    indexed = 0
+    missing = []
+    transcripts, _ = downloads_catalog.query(has_transcript=True, include_files=False)
+    for item in transcripts:
+        bvid = item['bvid']
+        if not rebuild and transcript_index.is_indexed(bvid):
+            continue
+        try:
+            result, source = load_existing_transcript(bvid)
+        except OSError:
+            result = None
+        if result is None:
+            missing.append(bvid)
+            continue
+        index_transcript(bvid, result, source)
+        indexed += 1
+    return {"indexed": indexed, "missing": missing}
+
+
+@app.route('/api/search/transcripts', methods=['GET'])
+def search_transcripts():
+    """
+    在所有转写文本中检索
+
+    查询参数:
+        q: 检索词，空格分隔的多个词需出现在同一片段中
+        bvid: 只在该视频中检索
+        limit / offset: 分页（limit 默认 50）
+
+    返回命中片段的 bvid、标题、起止时间（秒）、摘录及摘录中的命中位置
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "请提供检索词"}), 400
+    limit = min(max(request.args.get('limit', 50, type=int), 1), VIDEO_PAGE_MAX_LIMIT)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+
+    start = time.perf_counter()
+    hits, total = transcript_index.search(query, limit=limit, offset=offset,
+                                          bvid=request.args.get('bvid') or None)
+    return jsonify({
+        "query": query,
+        "hits": hits,
+        "total": total,
+        "took_ms": round((time.perf_counter() - start) * 1000, 1)
+    })
+
+
+@app.route('/api/search/transcripts/reindex', methods=['POST'])
+def reindex_transcripts():
+    """为已有转写补建索引；rebuild 为 true 时全部重建"""
+    data = request.json or {}
+    result = backfill_transcript_index(rebuild=bool(data.get('rebuild')))
+    result['stats'] = transcript_index.get_stats()
+    return jsonify(result)
+
+
 # ========== AI总结 API ==========
+def save_summary_file(bvid, summary):
+    """将总结保存到视频目录（与转写文件同名，后缀 _summary.md），下载列表可直接显示"""
+    output_dir = os.path.join(DOWNLOAD_DIR, bvid)
+    if not bvid or not summary or not os.path.isdir(output_dir):
+        return
+    audio_file = find_audio_file(output_dir)
+    base_name = os.path.splitext(os.path.basename(audio_file))[0] if audio_file else bvid
+    path = os.path.join(output_dir, base_name + SUMMARY_SUFFIX)
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                if f.read() == summary:
+                    return
+        with open(path + '.part', 'w', encoding='utf-8') as f:
+            f.write(summary)
+        os.replace(path + '.part', path)
+    except OSError as e:
+        print(f"保存总结失败 {bvid}: {e}")
+        return
+    downloads_catalog.refresh(bvid)
+
+
+def finish_summary(cache_key, bvid, output):
+    """总结完成：写入缓存并保存到视频目录"""
+    summary_cache.put(cache_key, output)
+    save_summary_file(bvid, output['summary'])
+
+
+def stream_summary_events(events, on_done=None):
+    """将流式总结的事件转为 SSE 文本，完成时调用 on_done(结果)；出错时推送 error 事件后结束"""
+    try:
+        for event, data in events:
+            if event == 'done':
+                print(f"[Summarize] 首个 token {data['first_token_seconds']} 秒，"
+                      f"总耗时 {data['elapsed']} 秒，{data['usage']['requests']} 次请求")
+                if on_done:
+                    on_done(data)
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    except Exception as e:
+        yield f"event: error\ndata: {json.dumps({'error': str(e)}, ensure_ascii=False)}\n\n"
+
+
 @app.route('/api/summarize', methods=['POST'])
 def summarize_text():
-    """调用API总结文本"""
+    """
+    调用API总结文本
+
+    请求参数:
+        text: 要总结的文本
+        bvid: 可选，提供时读取该视频的转写片段，按时间顺序分块并标注时间范围
+              （仅在未提供 text 或 text 与该视频的转写文本一致时）
+        base_url / api_key / model / prompt: 接口配置与总结要求
+        chunk_tokens: 每块估计的 token 上限，内容超出时分块并发总结再合并（默认 SUMMARY_CHUNK_TOKENS）
+        stream: 为 true 时以 SSE 返回：plan / chunk 事件报告分块进度，delta 事件逐段推送生成的总结，
+                done 事件为最终结果（含首个 token 的耗时 first_token_seconds），出错时为 error 事件
+        refresh: 为 true 时忽略已缓存的总结，重新调用接口
+
+    返回总结内容，以及分块情况、各块耗时与 token 用量；命中缓存时 cached 为 true。
+    提供 bvid 时总结同时保存到该视频目录
+    """
     data = request.json
     text = data.get('text', '')
-    base_url = data.get('base_url', 'https://api.openai.com/v1')
+    bvid = secure_filename(data.get('bvid') or '')
+    base_url = data.get('base_url', summarizer.DEFAULT_BASE_URL)
     api_key = data.get('api_key', '')
-    prompt = data.get('prompt', '请总结以下内容的主要观点：')
-    model = data.get('model', 'gpt-3.5-turbo')
+    prompt = data.get('prompt', summarizer.DEFAULT_PROMPT)
+    model = data.get('model', summarizer.DEFAULT_MODEL)
+    stream = bool(data.get('stream'))
+    use_cache = not data.get('refresh')
 
     if not api_key:
         return jsonify({"error": "请提供API Key"}), 400
+    try:
+        chunk_tokens = max(200, int(data.get('chunk_tokens') or SUMMARY_CHUNK_TOKENS))
+    except (TypeError, ValueError):
+        return jsonify({"error": "chunk_tokens 必须为整数"}), 400
+
+    def cached_response(cache_key):
+        """命中缓存时返回响应，否则返回 None"""
+        output = summary_cache.get(cache_key) if use_cache else None
+        if output is None:
+            return None
+        output.update(cached=True, first_token_seconds=0.0, elapsed=0.0)
+        save_summary_file(bvid, output['summary'])
+        if stream:
+            return Response(f"event: done\ndata: {json.dumps(output, ensure_ascii=False)}\n\n",
+                            mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+        return jsonify(output)
+
+    # 先用请求中的文本查缓存，命中时无需读取转写片段
+    if text:
+        response = cached_response(summary_cache.make_key(text, prompt, model, base_url))
+        if response is not None:
+            return response
+
+    segments = None
+    if bvid and os.path.isdir(os.path.join(DOWNLOAD_DIR, bvid)):
+        result, _ = load_existing_transcript(bvid)
+        # 只有要总结的正是该视频的转写文本时才按片段分块，否则总结内容与缓存键都以请求中的文本为准
+        if result is not None and result.segments and (not text or text == result.text):
+            segments = result.segments
+            if not text:
+                text = result.text
+                response = cached_response(summary_cache.make_key(text, prompt, model, base_url))
+                if response is not None:
+                    return response
 
     if not text:
         return jsonify({"error": "请提供要总结的文本"}), 400
 
-    try:
-        client = OpenAI(base_url=base_url, api_key=api_key)
-
-        response = client.chat.completions.create(
+    cache_key = summary_cache.make_key(text, prompt, model, base_url)
+    if stream:
+        events = summarizer.summarize_stream(
+            api_key,
+            text=text,
+            segments=segments,
+            base_url=base_url,
+            prompt=prompt,
             model=model,
-            messages=[
-                {"role": "system", "content": "你是一个专业的内容总结助手。"},
-                {"role": "user", "content": f"{prompt}\n\n{text}"}
-            ]
+            chunk_tokens=chunk_tokens,
+            max_workers=SUMMARY_MAX_CONCURRENCY
+        )
+        return Response(
+            stream_with_context(stream_summary_events(
+                events, on_done=lambda output: finish_summary(cache_key, bvid, output))),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
         )
 
-        summary = response.choices[0].message.content
-        return jsonify({"summary": summary})
+    try:
+        output = summarizer.summarize_long(
+            api_key,
+            text=text,
+            segments=segments,
+            base_url=base_url,
+            prompt=prompt,
+            model=model,
+            chunk_tokens=chunk_tokens,
+            max_workers=SUMMARY_MAX_CONCURRENCY
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+    finish_summary(cache_key, bvid, output)
+    output['cached'] = False
+    return jsonify(output)
+
+
+@app.route('/api/summarize/cache', methods=['GET'])
+def get_summary_cache_stats():
+    """总结结果缓存统计"""
+    return jsonify(summary_cache.get_stats())
+
+
+@app.route('/api/summarize/cache/clear', methods=['POST'])
+def clear_summary_cache():
+    """清空总结结果缓存（已保存到视频目录的总结文件不受影响）"""
+    summary_cache.clear()
+    return jsonify({'message': '缓存已清空'})
+
 
 # ========== 启动服务器 ==========
 if __name__ == '__main__':
@@ -809,6 +2015,16 @@ if __name__ == '__main__':
     print(f"\n🌐 请在浏览器中打开: http://localhost:5000")
     print(f"{'=' * 60}\n")
 
-    app.run(debug=True, port=5000, threaded=True)
+    debug = True
+    # 调试模式下重载器的监视进程不处理请求，只在实际服务的进程中预加载模型、核对下载目录
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        downloads_catalog.start_scanner(DOWNLOADS_SCAN_INTERVAL)
+        backfill_thread = threading.Thread(target=backfill_transcript_index, name='transcript-index-backfill')
+        backfill_thread.daemon = True
+        backfill_thread.start()
+        if TRANSCRIBE_PRELOAD_MODELS:
+            model_manager.preload(parse_model_specs(TRANSCRIBE_PRELOAD_MODELS, TRANSCRIBE_ENGINE))
+
+    app.run(debug=debug, port=5000, threaded=True)
 
 
@@ -0,0 +1,287 @@
+# backend/benchmarks/bench_crawler.py
+"""
+爬虫离线基准测试
+启动本地 HTTP 服务回放 fixtures 中保存的搜索页和视频详情页，
+测量爬虫热点函数耗时、页面吞吐量和内存峰值，结果保存为 JSON 便于跨提交对比
+
+用法:
+    python benchmarks/bench_crawler.py                      # 运行并保存结果
+    python benchmarks/bench_crawler.py --compare old.json   # 与历史结果对比
+    python benchmarks/bench_crawler.py --record 关键词       # 从B站录制新的 fixtures（需联网）
+"""
+import argparse
+import functools
+import glob
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import quote
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from crawler import BilibiliCrawler  # noqa: E402
+
+FIXTURE_DIR = os.path.join(BENCH_DIR, 'fixtures')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# 需要单独计时的爬虫函数
+TIMED_FUNCTIONS = [
+    '_parse_search_results',
+    '_extract_video_blocks',
+    '_decode_js_string',
+    'get_video_detail',
+]
+
+
+def load_fixtures(prefix: str) -> List[bytes]:
+    """按文件名顺序读取指定前缀的 fixture"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, f'{prefix}*.html'))):
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+    return pages
+
+
+# ========== 本地回放服务 ==========
+class FixtureHandler(BaseHTTPRequestHandler):
+    """搜索请求循环返回搜索页 fixture，/video/ 请求循环返回详情页 fixture"""
+
+    search_pages: List[bytes] = []
+    detail_pages: List[bytes] = []
+    _counter = 0
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        pages = self.detail_pages if self.path.startswith('/video/') else self.search_pages
+        with self._lock:
+            FixtureHandler._counter += 1
+            body = pages[self._counter % len(pages)]
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    """在后台线程启动回放服务，返回 (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ========== 计时 ==========
+class FunctionTimer:
+    """替换爬虫实例上的方法，统计调用次数与累计耗时（含内部调用）"""
+
+    def __init__(self, crawler: BilibiliCrawler, names: List[str]):
+        self.stats = {name: {'calls': 0, 'total_s': 0.0} for name in names}
+        self._lock = threading.Lock()
+        for name in names:
+            setattr(crawler, name, self._wrap(name, getattr(crawler, name)))
+
+    def _wrap(self, name, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.stats[name]['calls'] += 1
+                    self.stats[name]['total_s'] += elapsed
+        return wrapper
+
+    def report(self) -> Dict:
+        return {
+            name: {
+                'calls': s['calls'],
+                'total_ms': round(s['total_s'] * 1000, 3),
+                'avg_us': round(s['total_s'] / s['calls'] * 1e6, 2) if s['calls'] else 0.0,
+            }
+            for name, s in self.stats.items()
+        }
+
+
+def replay(crawler: BilibiliCrawler, base_url: str, search_pages: int, detail_pages: int) -> Dict:
+    """依次回放搜索页和详情页请求，返回耗时"""
+    start = time.perf_counter()
+    video_count = 0
+    for page in range(1, search_pages + 1):
+        video_count += len(crawler.search('benchmark', page))
+    search_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(detail_pages):
+        crawler.get_video_detail(f"{base_url}/video/BV1bench{i:05d}")
+    detail_elapsed = time.perf_counter() - start
+
+    return {
+        'search': {
+            'pages': search_pages,
+            'videos': video_count,
+            'seconds': round(search_elapsed, 4),
+            'pages_per_sec': round(search_pages / search_elapsed, 2),
+        },
+        'detail': {
+            'pages': detail_pages,
+            'seconds': round(detail_elapsed, 4),
+            'pages_per_sec': round(detail_pages / detail_elapsed, 2),
+        },
+    }
+
+
+def run_benchmark(engine: str, base_url: str, search_pages: int, detail_pages: int) -> Dict:
+    """对一个解析引擎运行完整的搜索 + 详情回放"""
+    crawler = BilibiliCrawler(parser_engine=engine)
+    crawler.search_base_url = base_url
+    timer = FunctionTimer(crawler, TIMED_FUNCTIONS)
+    results = replay(crawler, base_url, search_pages, detail_pages)
+    results['functions'] = timer.report()
+
+    # tracemalloc 会显著拖慢执行，内存峰值单独用一个小规模回放测量
+    crawler = BilibiliCrawler(parser_engine=engine)
+    crawler.search_base_url = base_url
+    tracemalloc.start()
+    replay(crawler, base_url, len(FixtureHandler.search_pages), len(FixtureHandler.detail_pages))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results['peak_memory_kb'] = round(peak / 1024, 1)
+
+    return results
+
+
+def git_revision() -> str:
+    """当前提交的短哈希，不在 git 仓库中时返回 unknown"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def print_results(results: Dict, baseline: Dict = None):
+    """打印结果，提供历史结果时同时输出变化百分比"""
+
+    def delta(current, old):
+        if not old:
+            return ''
+        return f"  ({(current - old) / old * 100:+.1f}%)"
+
+    for engine, r in results['engines'].items():
+        old = (baseline or {}).get('engines', {}).get(engine, {})
+        print(f"\n[{engine}]")
+        print(f"  搜索页: {r['search']['pages_per_sec']:.1f} 页/秒"
+              f"{delta(r['search']['pages_per_sec'], old.get('search', {}).get('pages_per_sec'))}")
+        print(f"  详情页: {r['detail']['pages_per_sec']:.1f} 页/秒"
+              f"{delta(r['detail']['pages_per_sec'], old.get('detail', {}).get('pages_per_sec'))}")
+        print(f"  内存峰值: {r['peak_memory_kb']:.1f} KB"
+              f"{delta(r['peak_memory_kb'], old.get('peak_memory_kb'))}")
+        for name, f in r['functions'].items():
+            old_f = old.get('functions', {}).get(name, {})
+            print(f"  {name:<24}{f['calls']:>8} 次{f['total_ms']:>12.2f} ms{f['avg_us']:>12.2f} us/次"
+                  f"{delta(f['total_ms'], old_f.get('total_ms'))}")
+
+
+# ========== 录制 fixtures ==========
+def record_fixtures(keyword: str, pages: int, details: int):
+    """从B站录制搜索页和视频详情页作为新的 fixtures"""
+    crawler = BilibiliCrawler()
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    slug = ''.join(c if c.isalnum() else '_' for c in keyword)
+
+    arcurls = []
+    for page in range(1, pages + 1):
+        offset = (page - 1) * 30
+        url = f"{crawler.search_base_url}/all?keyword={quote(keyword)}&page={page}&o={offset}"
+        response = crawler.session.get(url, timeout=15)
+        path = os.path.join(FIXTURE_DIR, f'search_{slug}_p{page}.html')
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        print(f"已保存 {path}")
+        arcurls.extend(v['arcurl'] for v in crawler._parse_search_results(response.text) if v['arcurl'])
+        time.sleep(3)
+
+    for i, url in enumerate(arcurls[:details], 1):
+        response = crawler.session.get(url, timeout=10)
+        path = os.path.join(FIXTURE_DIR, f'video_detail_{slug}_{i}.html')
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        print(f"已保存 {path}")
+        time.sleep(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬虫离线基准测试')
+    parser.add_argument('--search-pages', type=int, default=50, help='回放的搜索页请求数')
+    parser.add_argument('--detail-pages', type=int, default=100, help='回放的详情页请求数')
+    parser.add_argument('--engine', choices=BilibiliCrawler.PARSER_ENGINES, action='append',
+                        help='要测试的解析引擎，可重复指定（默认全部）')
+    parser.add_argument('--output', help='结果 JSON 路径（默认 results/<提交>.json）')
+    parser.add_argument('--compare', help='用于对比的历史结果 JSON')
+    parser.add_argument('--record', metavar='KEYWORD', help='录制指定关键词的 fixtures 后退出')
+    parser.add_argument('--record-pages', type=int, default=2)
+    parser.add_argument('--record-details', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.record, args.record_pages, args.record_details)
+        return
+
+    FixtureHandler.search_pages = load_fixtures('search_')
+    FixtureHandler.detail_pages = load_fixtures('video_detail_')
+    if not FixtureHandler.search_pages or not FixtureHandler.detail_pages:
+        print(f"fixtures 不完整，请检查 {FIXTURE_DIR}")
+        sys.exit(1)
+
+    server, base_url = start_server()
+    try:
+        engines = args.engine or list(BilibiliCrawler.PARSER_ENGINES)
+        results = {
+            'revision': git_revision(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'fixtures': {
+                'search': len(FixtureHandler.search_pages),
+                'detail': len(FixtureHandler.detail_pages),
+            },
+            'engines': {
+                engine: run_benchmark(engine, base_url, args.search_pages, args.detail_pages)
+                for engine in engines
+            },
+        }
+    finally:
+        server.shutdown()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"对比基准: {args.compare} (revision {baseline.get('revision')})")
+
+    print_results(results, baseline)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['revision']}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存到 {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# backend/benchmarks/bench_parser.py
+"""
+搜索结果解析引擎微基准
+对比 fast / bs4 两种引擎在已保存搜索页面上的单页耗时与内存峰值
+
+用法: python benchmarks/bench_parser.py [-n 迭代次数] [fixture.html ...]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from crawler import BilibiliCrawler  # noqa: E402
+
+FIXTURE_DIR = os.path.join(BENCH_DIR, 'fixtures')
+
+
+def bench_engine(engine: str, pages: dict, iterations: int) -> dict:
+    """对单个解析引擎计时，并单独测量一次解析的内存峰值"""
+    crawler = BilibiliCrawler(parser_engine=engine)
+    results = {}
+
+    for name, html_content in pages.items():
+        videos = crawler._parse_search_results(html_content)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            crawler._parse_search_results(html_content)
+        elapsed = (time.perf_counter() - start) / iterations
+
+        tracemalloc.start()
+        crawler._parse_search_results(html_content)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[name] = {
+            'videos': videos,
+            'ms_per_page': elapsed * 1000,
+            'peak_kb': peak / 1024,
+        }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='搜索结果解析引擎微基准')
+    parser.add_argument('fixtures', nargs='*', help='搜索结果 HTML 文件（默认使用 fixtures/search_*.html）')
+    parser.add_argument('-n', '--iterations', type=int, default=20, help='每个页面的解析次数')
+    args = parser.parse_args()
+
+    paths = args.fixtures or sorted(glob.glob(os.path.join(FIXTURE_DIR, 'search_*.html')))
+    if not paths:
+        print('未找到搜索结果 fixture')
+        sys.exit(1)
+
+    pages = {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            pages[os.path.basename(path)] = f.read()
+
+    all_results = {engine: bench_engine(engine, pages, args.iterations)
+                   for engine in BilibiliCrawler.PARSER_ENGINES}
+
+    print(f"\n{'fixture':<28}{'engine':<8}{'videos':>8}{'ms/page':>12}{'peak KB':>12}")
+    print('-' * 68)
+    for name in pages:
+        for engine, results in all_results.items():
+            r = results[name]
+            print(f"{name:<28}{engine:<8}{len(r['videos']):>8}{r['ms_per_page']:>12.2f}{r['peak_kb']:>12.1f}")
+
+        fast_videos = all_results['fast'][name]['videos']
+        bs4_videos = all_results['bs4'][name]['videos']
+        if fast_videos != bs4_videos:
+            print(f"  !! {name}: 两种引擎解析结果不一致")
+
+    fast_ms = sum(r['ms_per_page'] for r in all_results['fast'].values())
+    bs4_ms = sum(r['ms_per_page'] for r in all_results['bs4'].values())
+    print('-' * 68)
+    print(f"fast 相对 bs4 加速: {bs4_ms / fast_ms:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+# backend/benchmarks/bench_transcriber.py
+"""
+转写引擎基准测试
+在同一段样例音频上对比不同引擎 / 模型大小的实时率（RTF）与内存峰值，
+每个组合在独立子进程中运行，内存峰值互不影响
+
+用法:
+    python benchmarks/bench_transcriber.py                                  # 默认 openai+faster × tiny,base
+    python benchmarks/bench_transcriber.py --engine faster --model small    # 指定组合（可重复）
+    python benchmarks/bench_transcriber.py --clip 音频文件 --seconds 120
+"""
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from bench_crawler import RESULTS_DIR, git_revision  # noqa: E402
+
+# 默认样例：仓库自带的示例音频
+DEFAULT_CLIP_GLOB = os.path.join(os.path.dirname(BACKEND_DIR), 'downloads', '*', '*.m4a')
+
+
+def run_single(engine: str, model_size: str, clip: str, seconds: float, compute_type: str) -> dict:
+    """子进程中执行：加载模型、转写一次，返回耗时与内存峰值"""
+    from transcriber import SAMPLE_RATE, WhisperTranscriber, load_engine_model, run_engine
+
+    transcriber = WhisperTranscriber(model_size, engine=engine, compute_type=compute_type)
+    audio = transcriber.load_audio(clip)
+    if seconds:
+        audio = audio[:int(seconds * SAMPLE_RATE)]
+    audio_seconds = len(audio) / SAMPLE_RATE
+
+    start = time.perf_counter()
+    model = load_engine_model(engine, model_size, compute_type)
+    load_s = time.perf_counter() - start
+
+    kwargs = {'language': 'zh', 'task': 'transcribe', 'verbose': False,
+              'initial_prompt': WhisperTranscriber.SIMPLIFIED_CHINESE_PROMPT}
+    start = time.perf_counter()
+    result = run_engine(engine, model, audio, kwargs)
+    transcribe_s = time.perf_counter() - start
+
+    # Linux 下 ru_maxrss 单位为 KB，macOS 为字节
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = maxrss / 1024 / 1024 if sys.platform == 'darwin' else maxrss / 1024
+
+    return {
+        'engine': engine,
+        'model': model_size,
+        'compute_type': compute_type if engine == 'faster' else 'fp32',
+        'audio_seconds': round(audio_seconds, 2),
+        'load_s': round(load_s, 2),
+        'transcribe_s': round(transcribe_s, 2),
+        'rtf': round(transcribe_s / audio_seconds, 4) if audio_seconds else None,
+        'peak_rss_mb': round(peak_mb, 1),
+        'segments': len(result.get('segments', [])),
+        'chars': len(result.get('text', '')),
+    }
+
+
+def run_in_subprocess(engine: str, model_size: str, args) -> dict:
+    """在独立子进程中运行一个组合"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker',
+           '--engine', engine, '--model', model_size, '--clip', args.clip,
+           '--seconds', str(args.seconds), '--compute-type', args.compute_type]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        error = (proc.stderr.strip().splitlines() or ['未知错误'])[-1]
+        return {'engine': engine, 'model': model_size, 'error': error}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def print_results(rows):
+    print(f"\n{'engine':<8}{'model':<8}{'精度':<8}{'加载 s':>9}{'转写 s':>9}{'RTF':>9}{'内存 MB':>10}{'分段':>6}")
+    print('-' * 70)
+    for r in rows:
+        if 'error' in r:
+            print(f"{r['engine']:<8}{r['model']:<8}失败: {r['error']}")
+            continue
+        print(f"{r['engine']:<8}{r['model']:<8}{r['compute_type']:<8}{r['load_s']:>9.2f}"
+              f"{r['transcribe_s']:>9.2f}{r['rtf']:>9.3f}{r['peak_rss_mb']:>10.1f}{r['segments']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='转写引擎基准测试')
+    parser.add_argument('--engine', action='append', help='引擎，可重复指定（默认 openai 与 faster）')
+    parser.add_argument('--model', action='append', help='模型大小，可重复指定（默认 tiny 与 base）')
+    parser.add_argument('--clip', help='样例音频（默认使用 downloads 中自带的示例）')
+    parser.add_argument('--seconds', type=float, default=60, help='截取的音频长度，0 表示完整音频')
+    parser.add_argument('--compute-type', default='int8', help='faster 引擎的计算精度')
+    parser.add_argument('--output', help='结果 JSON 路径（默认 results/transcriber_<提交>.json）')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not args.clip:
+        clips = sorted(glob.glob(DEFAULT_CLIP_GLOB))
+        if not clips:
+            print('未找到样例音频，请用 --clip 指定')
+            sys.exit(1)
+        args.clip = clips[0]
+
+    if args.worker:
+        print(json.dumps(run_single(args.engine[0], args.model[0], args.clip,
+                                    args.seconds, args.compute_type)))
+        return
+
+    engines = args.engine or ['openai', 'faster']
+    models = args.model or ['tiny', 'base']
+    print(f"样例音频: {args.clip}（前 {args.seconds:g} 秒）")
+
+    rows = []
+    for model_size in models:
+        for engine in engines:
+            print(f"运行 {engine} / {model_size} ...")
+            rows.append(run_in_subprocess(engine, model_size, args))
+
+    print_results(rows)
+
+    results = {
+        'revision': git_revision(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'clip': os.path.basename(args.clip),
+        'seconds': args.seconds,
+        'cpu_count': os.cpu_count(),
+        'results': rows,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"transcriber_{results['revision']}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存到 {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+# backend/crawl_jobs.py
+"""
+爬取任务模块
+每个任务对应一个独立的结果库，保存关键词、参数和断点，进程重启后可继续执行；
+运行期由注册表按任务 ID 管理各自的状态与日志，多个任务可同时运行
+"""
+import os
+import re
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from event_bus import EventBus
+from result_store import CrawlResultStore
+
+
+class CrawlJobStore:
+    """爬取任务目录管理"""
+
+    JOB_ID_PATTERN = re.compile(r'^[0-9]{8}_[0-9]{6}_[0-9a-f]{6}$')
+
+    def __init__(self, jobs_dir: str):
+        self.jobs_dir = jobs_dir
+        os.makedirs(jobs_dir, exist_ok=True)
+
+    def _db_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f'{job_id}.db')
+
+    def export_path(self, job_id: str) -> str:
+        """任务结果 Excel 的保存路径"""
+        return os.path.join(self.jobs_dir, f'{job_id}.xlsx')
+
+    def create_job(self, keywords: List[str], params: Dict) -> CrawlResultStore:
+        """创建新任务，返回其结果存储"""
+        now = datetime.now()
+        job_id = f"{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        store = CrawlResultStore(self._db_path(job_id))
+        store.set_meta(
+            job_id=job_id,
+            keywords=keywords,
+            params=params,
+            remove_duplicates=params.get('remove_duplicates', True),
+            status='pending',
+            created_at=now.strftime('%Y-%m-%d %H:%M:%S'),
+            updated_at=now.strftime('%Y-%m-%d %H:%M:%S')
+        )
+        return store
+
+    def open_job(self, job_id: str) -> Optional[CrawlResultStore]:
+        """打开已有任务，不存在时返回 None"""
+        if not self.JOB_ID_PATTERN.match(job_id):
+            return None
+        path = self._db_path(job_id)
+        if not os.path.exists(path):
+            return None
+        return CrawlResultStore(path)
+
+    @staticmethod
+    def update_status(store: CrawlResultStore, status: str):
+        """更新任务状态"""
+        store.set_meta(status=status, updated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+    def list_jobs(self) -> List[Dict]:
+        """列出全部任务的摘要，按创建时间倒序"""
+        jobs = []
+        for filename in sorted(os.listdir(self.jobs_dir), reverse=True):
+            job_id, ext = os.path.splitext(filename)
+            if ext != '.db' or not self.JOB_ID_PATTERN.match(job_id):
+                continue
+
+            store = CrawlResultStore(self._db_path(job_id))
+            try:
+                meta = store.get_meta()
+                params = meta.get('params', {})
+                total_pages = len(meta.get('keywords', [])) * params.get('pages_per_keyword', 0)
+                jobs.append({
+                    'job_id': job_id,
+                    'status': meta.get('status'),
+                    'created_at': meta.get('created_at'),
+                    'updated_at': meta.get('updated_at'),
+                    'keywords_count': len(meta.get('keywords', [])),
+                    'pages_done': len(store.get_done_pages()),
+                    'pages_total': total_pages,
+                    'videos': store.count(),
+                    'videos_pending_detail': store.count(pending_only=True),
+                })
+            finally:
+                store.close()
+
+        return jobs
+
+
+class CrawlJob:
+    """运行期的爬取任务：独立的状态、日志环形缓冲区、停止信号和结果存储"""
+
+    # 进度事件的最小发布间隔（秒），状态切换和日志不受限制
+    PROGRESS_EVENT_INTERVAL = 0.25
+
+    def __init__(self, store: CrawlResultStore, log_size: int = 100,
+                 event_bus: Optional[EventBus] = None):
+        meta = store.get_meta()
+        self.job_id = meta['job_id']
+        self.store = store
+        self.keywords = meta.get('keywords', [])
+        self.params = meta.get('params', {})
+        self.stop_event = threading.Event()
+        self._run_lock = threading.Lock()
+        self.logs = deque(maxlen=log_size)
+        self._log_seq = 0
+        self._log_lock = threading.Lock()
+        self.event_bus = event_bus
+        self.status = {
+            'job_id': self.job_id,
+            'is_running': False,
+            'is_paused': False,
+            'progress': 0,
+            'current_task': '',
+            'total_keywords': len(self.keywords),
+            'processed_keywords': 0,
+            'total_videos': store.count(),
+            'current_keyword': '',
+            'error': None,
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return self.status['is_running']
+
+    @property
+    def is_paused(self) -> bool:
+        return self.status['is_paused']
+
+    def add_log(self, message: str, is_error: bool = False):
+        """添加任务日志（带递增序号），超出容量时丢弃最旧的记录"""
+        with self._log_lock:
+            self._log_seq += 1
+            entry = {
+                'seq': self._log_seq,
+                'timestamp': datetime.now().strftime('%H:%M:%S'),
+                'message': message,
+                'is_error': is_error
+            }
+            self.logs.append(entry)
+        self.publish(log=entry)
+
+    def update(self, **fields):
+        """更新状态字段并发布（节流的）进度事件"""
+        self.status.update(fields)
+        self.publish(throttle=True)
+
+    def publish(self, log: Optional[Dict] = None, throttle: bool = False):
+        """向事件总线发布当前状态（不含视频列表）"""
+        if self.event_bus is None:
+            return
+        self.event_bus.publish(
+            'crawler',
+            {**self.status, 'log': log},
+            throttle_key=f'crawler:{self.job_id}' if throttle else None,
+            min_interval=self.PROGRESS_EVENT_INTERVAL
+        )
+
+    def get_logs(self, since: int = 0) -> List[Dict]:
+        """序号大于 since 的日志；since 超出当前序号（如服务重启后）时从头返回"""
+        with self._log_lock:
+            if since > self._log_seq:
+                since = 0
+            return [log for log in self.logs if log['seq'] > since]
+
+    def try_start(self) -> bool:
+        """
+        原子地将任务标记为运行中并清除停止信号
+
+        Returns:
+            是否成功；任务已在运行（包括正在停止）时返回 False
+        """
+        with self._run_lock:
+            if self.is_running:
+                return False
+            self.stop_event.clear()
+            self.status['is_running'] = True
+            return True
+
+    def start(self):
+        """重置运行期状态（日志序号保持递增，客户端游标不会失效）；停止信号在启动线程前已清除"""
+        with self._log_lock:
+            self.logs.clear()
+        self.status.update(is_running=True, is_paused=False, progress=0, error=None)
+        self.publish()
+
+    def finish(self):
+        """任务线程结束时调用，运行状态只在这里清除"""
+        if self.stop_event.is_set():
+            self.status['current_task'] = '任务已停止'
+            self.add_log("任务已停止")
+        with self._run_lock:
+            self.status.update(is_running=False, is_paused=False)
+        self.publish()
+
+    def pause(self) -> bool:
+        if self.is_running and not self.is_paused:
+            self.status['is_paused'] = True
+            self.add_log("任务已暂停")
+            return True
+        return False
+
+    def resume(self) -> bool:
+        if self.is_running and self.is_paused:
+            self.status['is_paused'] = False
+            self.add_log("任务继续执行")
+            return True
+        return False
+
+    def stop(self):
+        """发出停止信号；任务线程退出前 is_running 保持为 True，避免同一任务被再次启动"""
+        self.stop_event.set()
+        if self.is_running:
+            self.status.update(is_paused=False, current_task='正在停止...')
+            self.add_log("正在停止任务...")
+
+    def to_dict(self, log_since: int = 0) -> Dict:
+        """任务状态快照，只包含序号大于 log_since 的日志"""
+        logs = self.get_logs(log_since)
+        return {
+            **self.status,
+            'logs': logs,
+            'log_cursor': logs[-1]['seq'] if logs else min(log_since, self._log_seq)
+        }
+
+
+class CrawlJobRegistry:
+    """进程内的爬取任务注册表（线程安全）"""
+
+    def __init__(self, job_store: CrawlJobStore, event_bus: Optional[EventBus] = None):
+        self.job_store = job_store
+        self.event_bus = event_bus
+        self._jobs: Dict[str, CrawlJob] = {}
+        self._latest_id: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def register(self, store: CrawlResultStore) -> CrawlJob:
+        """登记任务；同一任务重复登记时返回已有实例"""
+        job_id = store.get_meta()['job_id']
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = CrawlJob(store, event_bus=self.event_bus)
+                self._jobs[job_id] = job
+            self._latest_id = job_id
+            return job
+
+    def get(self, job_id: str) -> Optional[CrawlJob]:
+        """获取任务；不在内存中时尝试从任务存储加载（例如进程重启后）"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+
+        store = self.job_store.open_job(job_id)
+        if store is None:
+            return None
+        with self._lock:
+            return self._jobs.setdefault(job_id, CrawlJob(store, event_bus=self.event_bus))
+
+    def latest(self) -> Optional[CrawlJob]:
+        """最近启动的任务"""
+        with self._lock:
+            return self._jobs.get(self._latest_id) if self._latest_id else None
+
+    def running(self) -> List[CrawlJob]:
+        """正在运行的任务"""
+        with self._lock:
+            return [job for job in self._jobs.values() if job.is_running]
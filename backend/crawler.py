@@ -5,11 +5,40 @@ B站视频搜索爬虫模块
 import requests
 from bs4 import BeautifulSoup
 import re
+import html
 import time
 import random
-from urllib.parse import quote
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import quote, urlparse
 from datetime import datetime
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Optional, Callable, Set
+
+from rate_limiter import TokenBucketRateLimiter
+from detail_cache import VideoDetailCache
+
+# ========== 快速解析引擎使用的预编译正则 ==========
+# 页面中的 <script> 内容（不构建 DOM，直接定位内嵌状态脚本）
+_SCRIPT_RE = re.compile(r'<script\b[^>]*>(.*?)</script>', re.S | re.I)
+# 视频卡片标题区域、卡片内第一个链接、标题元素
+_CARD_RE = re.compile(r'<div\b[^>]*class="[^"]*\bbili-video-card__info--right\b[^"]*"')
+_CARD_HREF_RE = re.compile(r'<a\b[^>]*?\bhref="([^"]*)"')
+_CARD_TITLE_RE = re.compile(
+    r'<h3\b[^>]*class="[^"]*\bbili-video-card__info--tit\b[^"]*"[^>]*>(.*?)</h3>', re.S
+)
+_TAG_RE = re.compile(r'<[^>]+>')
+_VIDEO_HREF_RE = re.compile(r'/video/(BV[a-zA-Z0-9]+)/')
+# JS 对象扫描：一次匹配跳过整个字符串字面量，只在花括号处停下
+_OBJECT_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]', re.S)
+# 视频对象的全部字段合并为一个模式
+_VIDEO_FIELD_RE = re.compile(
+    r'(bvid|title|description|arcurl|tag|duration):"([^"]*)"|(play|review|pubdate):(\d+)'
+)
+_UNICODE_ESCAPE_RE = re.compile(r'\\u([0-9a-fA-F]{4})')
+
+
+class SearchError(Exception):
+    """搜索请求失败（非 200 状态码或网络异常），与没有结果的空页面区分"""
 
 
 class BilibiliCrawler:
@@ -25,47 +54,125 @@ class BilibiliCrawler:
         'Referer': 'https://www.bilibili.com',
     }
 
-    def __init__(self):
+    SEARCH_HOST = 'search.bilibili.com'
+    DETAIL_HOST = 'www.bilibili.com'
+
+    # 需要重试的状态码（412 为B站风控拦截）
+    RETRY_STATUS_CODES = {412, 429, 500, 502, 503, 504}
+    RETRY_BACKOFF = 1.0  # 重试基础退避时间（秒）
+
+    # 搜索结果解析引擎：fast 为单次扫描、不构建 DOM；bs4 为原 BeautifulSoup 实现
+    PARSER_ENGINES = ('fast', 'bs4')
+
+    # 视频对象中的数字字段
+    INT_FIELDS = ('play', 'review', 'pubdate')
+    VIDEO_FIELDS = ('bvid', 'title', 'description', 'arcurl', 'play',
+                    'review', 'tag', 'pubdate', 'duration')
+
+    def __init__(self, parser_engine: str = 'fast'):
+        if parser_engine not in self.PARSER_ENGINES:
+            raise ValueError(f"不支持的解析引擎: {parser_engine}")
+        self.parser_engine = parser_engine
+        # 搜索页地址前缀，离线基准测试时可指向本地服务
+        self.search_base_url = f"https://{self.SEARCH_HOST}"
         self.session = requests.Session()
         self.session.headers.update(self.HEADERS)
+        # 按域名共享的限速器 {host: TokenBucketRateLimiter}
+        self.rate_limiters: Dict[str, TokenBucketRateLimiter] = {}
+        # 可选的视频详情持久化缓存
+        self.detail_cache: Optional[VideoDetailCache] = None
+
+    def set_rate_limiter(self, host: str, limiter: Optional[TokenBucketRateLimiter]):
+        """为指定域名设置限速器，传入 None 表示取消限速"""
+        if limiter is None:
+            self.rate_limiters.pop(host, None)
+        else:
+            self.rate_limiters[host] = limiter
+
+    def set_detail_cache(self, cache: Optional[VideoDetailCache]):
+        """设置视频详情缓存，传入 None 表示不使用缓存"""
+        self.detail_cache = cache
 
-    def search(self, keyword: str, page: int = 1) -> List[Dict]:
+    def _get(self, url: str, timeout: float,
+             stop_event: Optional[threading.Event] = None) -> Optional[requests.Response]:
+        """经过域名限速器发起 GET 请求，等待期间收到停止信号时返回 None"""
+        limiter = self.rate_limiters.get(urlparse(url).netloc)
+        if limiter is not None and not limiter.acquire(stop_event):
+            return None
+        return self.session.get(url, timeout=timeout)
+
+    def search(self, keyword: str, page: int = 1,
+               stop_event: Optional[threading.Event] = None) -> List[Dict]:
         """
         搜索B站视频
 
         Args:
             keyword: 搜索关键词
             page: 页码
+            stop_event: 可选的停止信号，限速等待期间被设置时直接返回空列表
 
         Returns:
             视频信息列表
+
+        Raises:
+            SearchError: 请求失败（非 200 状态码或网络异常）
         """
         encoded_keyword = quote(keyword, encoding='utf-8')
 
         if page == 1:
-            url = f"https://search.bilibili.com/all?keyword={encoded_keyword}"
+            url = f"{self.search_base_url}/all?keyword={encoded_keyword}"
         else:
             offset = (page - 1) * 30
-            url = f"https://search.bilibili.com/all?keyword={encoded_keyword}&page={page}&o={offset}"
+            url = f"{self.search_base_url}/all?keyword={encoded_keyword}&page={page}&o={offset}"
 
         try:
-            response = self.session.get(url, timeout=15)
-            if response.status_code == 200:
-                return self._parse_search_results(response.text)
-            else:
-                print(f"搜索请求失败，状态码: {response.status_code}")
-                return []
-        except Exception as e:
-            print(f"搜索失败: {e}")
+            response = self._get(url, timeout=15, stop_event=stop_event)
+        except requests.RequestException as e:
+            raise SearchError(f"搜索失败: {e}") from e
+        if response is None:
             return []
+        if response.status_code != 200:
+            raise SearchError(f"搜索请求失败，状态码: {response.status_code}")
+        return self._parse_search_results(response.text)
 
     def _parse_search_results(self, html_content: str) -> List[Dict]:
         """解析搜索结果页面"""
+        if self.parser_engine == 'bs4':
+            return self._parse_search_results_bs4(html_content)
+        return self._parse_search_results_fast(html_content)
+
+    def _parse_search_results_fast(self, html_content: str) -> List[Dict]:
+        """单次扫描解析搜索结果：正则定位内嵌状态脚本，不构建 DOM"""
+        videos = []
+
+        try:
+            bvid_title_map = self._extract_titles_fast(html_content)
+
+            for script_match in _SCRIPT_RE.finditer(html_content):
+                script_content = script_match.group(1)
+
+                if 'type:f' in script_content and 'bvid:' in script_content:
+                    for block in self._extract_video_blocks(script_content):
+                        video_info = self._parse_video_object(block)
+                        if video_info:
+                            bvid = video_info.get('bvid', '')
+                            if bvid in bvid_title_map:
+                                video_info['title'] = bvid_title_map[bvid]
+                            videos.append(video_info)
+                    break
+
+        except Exception as e:
+            print(f"解析搜索结果失败: {e}")
+
+        return videos
+
+    def _parse_search_results_bs4(self, html_content: str) -> List[Dict]:
+        """使用 BeautifulSoup 解析搜索结果页面"""
         videos = []
 
         try:
             # 从HTML中提取完整标题
-            bvid_title_map = self._extract_titles_from_html(html_content)
+            bvid_title_map = self._extract_titles_bs4(html_content)
 
             soup = BeautifulSoup(html_content, 'html.parser')
             scripts = soup.find_all('script')
@@ -95,6 +202,43 @@ class BilibiliCrawler:
 
     def _extract_titles_from_html(self, html_content: str) -> Dict[str, str]:
         """从HTML中提取BVID到标题的映射"""
+        if self.parser_engine == 'bs4':
+            return self._extract_titles_bs4(html_content)
+        return self._extract_titles_fast(html_content)
+
+    def _extract_titles_fast(self, html_content: str) -> Dict[str, str]:
+        """按卡片切分原始 HTML，用正则提取BVID到标题的映射"""
+        bvid_title_map = {}
+
+        try:
+            starts = [m.start() for m in _CARD_RE.finditer(html_content)]
+            for i, start in enumerate(starts):
+                end = starts[i + 1] if i + 1 < len(starts) else len(html_content)
+                card = html_content[start:end]
+
+                link = _CARD_HREF_RE.search(card)
+                if not link:
+                    continue
+                bvid_match = _VIDEO_HREF_RE.search(html.unescape(link.group(1)))
+                if not bvid_match:
+                    continue
+
+                title_match = _CARD_TITLE_RE.search(card)
+                if title_match:
+                    # 与 get_text(strip=True) 一致：逐段去空白后拼接
+                    parts = (html.unescape(part).strip()
+                             for part in _TAG_RE.split(title_match.group(1)))
+                    title = ''.join(part for part in parts if part)
+                    if title:
+                        bvid_title_map[bvid_match.group(1)] = title
+
+        except Exception as e:
+            print(f"提取标题失败: {e}")
+
+        return bvid_title_map
+
+    def _extract_titles_bs4(self, html_content: str) -> Dict[str, str]:
+        """使用 BeautifulSoup 提取BVID到标题的映射"""
         bvid_title_map = {}
 
         try:
@@ -139,6 +283,29 @@ class BilibiliCrawler:
 
     def _extract_complete_object(self, content: str, start_pos: int) -> Optional[str]:
         """从指定位置提取完整的JavaScript对象"""
+        if self.parser_engine == 'bs4':
+            return self._extract_complete_object_scan(content, start_pos)
+        return self._extract_complete_object_fast(content, start_pos)
+
+    def _extract_complete_object_fast(self, content: str, start_pos: int) -> Optional[str]:
+        """用正则逐个跳过字符串字面量，只在花括号处计数"""
+        if start_pos >= len(content) or content[start_pos] != '{':
+            return None
+
+        brace_count = 0
+        for token in _OBJECT_TOKEN_RE.finditer(content, start_pos):
+            char = token.group()
+            if char == '{':
+                brace_count += 1
+            elif char == '}':
+                brace_count -= 1
+                if brace_count == 0:
+                    return content[start_pos:token.end()]
+
+        return None
+
+    def _extract_complete_object_scan(self, content: str, start_pos: int) -> Optional[str]:
+        """逐字符扫描提取完整的JavaScript对象"""
         try:
             if start_pos >= len(content) or content[start_pos] != '{':
                 return None
@@ -175,6 +342,51 @@ class BilibiliCrawler:
 
     def _parse_video_object(self, obj_str: str) -> Optional[Dict]:
         """解析单个视频对象字符串"""
+        if self.parser_engine == 'bs4':
+            return self._parse_video_object_regex(obj_str)
+        return self._parse_video_object_fast(obj_str)
+
+    def _parse_video_object_fast(self, obj_str: str) -> Optional[Dict]:
+        """用合并后的单个正则一次性提取全部字段（每个字段取首次出现的值）"""
+        try:
+            found = {}
+            for match in _VIDEO_FIELD_RE.finditer(obj_str):
+                if match.group(1):
+                    field, value = match.group(1), match.group(2)
+                else:
+                    field, value = match.group(3), match.group(4)
+                if field not in found:
+                    found[field] = value
+                    if len(found) == len(self.VIDEO_FIELDS):
+                        break
+
+            bvid = found.get('bvid', '')
+            if not bvid.startswith('BV'):
+                return None
+
+            video_info = {}
+            for field in self.VIDEO_FIELDS:
+                value = found.get(field)
+                if field in self.INT_FIELDS:
+                    video_info[field] = int(value) if value else 0
+                else:
+                    video_info[field] = self._decode_js_string(value) if value else ''
+
+            video_info['author'] = ''
+            video_info['uploadDate'] = ''
+
+            if video_info['pubdate']:
+                video_info['pubdate'] = self._timestamp_to_datetime(video_info['pubdate'])
+
+            return video_info
+
+        except Exception as e:
+            print(f"解析视频对象失败: {e}")
+
+        return None
+
+    def _parse_video_object_regex(self, obj_str: str) -> Optional[Dict]:
+        """逐字段正则匹配解析单个视频对象字符串"""
         try:
             video_info = {}
 
@@ -218,8 +430,11 @@ class BilibiliCrawler:
 
     def _decode_js_string(self, s: str) -> str:
         """解码JavaScript字符串中的转义字符"""
+        if '\\' not in s:
+            return s
+
         try:
-            s = re.sub(r'\\u([0-9a-fA-F]{4})', lambda m: chr(int(m.group(1), 16)), s)
+            s = _UNICODE_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 16)), s)
 
             replacements = {
                 '\\n': '\n', '\\r': '\r', '\\t': '\t',
@@ -244,73 +459,209 @@ class BilibiliCrawler:
         except:
             return ''
 
-    def get_video_detail(self, url: str) -> Optional[Dict]:
-        """获取视频详细信息"""
-        try:
-            response = self.session.get(url, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                title_tag = soup.find('meta', {'itemprop': 'name'})
-                author_tag = soup.find('meta', {'itemprop': 'author'})
-                upload_date_tag = soup.find('meta', {'itemprop': 'uploadDate'})
-                publish_date_tag = soup.find('meta', {'itemprop': 'datePublished'})
-                desc_tag = soup.find('meta', {'itemprop': 'description'})
-
-                title = title_tag.get('content', '') if title_tag else ''
-                title = title.replace('_哔哩哔哩_bilibili', '')
-
-                author = author_tag.get('content', '') if author_tag else ''
-                upload_date = upload_date_tag.get('content', '') if upload_date_tag else ''
-                publish_date = publish_date_tag.get('content', '') if publish_date_tag else ''
-
-                full_desc = desc_tag.get('content', '') if desc_tag else ''
-                if '视频播放量' in full_desc:
-                    description = full_desc.split('视频播放量')[0].strip()
+    def get_video_detail(self, url: str, max_retries: int = 0,
+                         stop_event: Optional[threading.Event] = None,
+                         force_refresh: bool = False) -> Optional[Dict]:
+        """
+        获取视频详细信息
+
+        Args:
+            url: 视频页面地址
+            max_retries: 请求失败（网络异常、412/429/5xx）时的最大重试次数
+            stop_event: 可选的停止信号
+            force_refresh: 忽略缓存，强制重新请求（结果仍会写入缓存）
+
+        Returns:
+            详细信息字典，失败时返回 None
+        """
+        bvid_match = re.search(r'(BV[a-zA-Z0-9]+)', url)
+        bvid = bvid_match.group(1) if bvid_match else None
+
+        if self.detail_cache is not None and bvid and not force_refresh:
+            cached = self.detail_cache.get(bvid)
+            if cached is not None:
+                return cached
+
+        detail = self._fetch_video_detail(url, max_retries, stop_event)
+        if detail is not None and self.detail_cache is not None and bvid:
+            self.detail_cache.put(bvid, detail)
+        return detail
+
+    def _fetch_video_detail(self, url: str, max_retries: int,
+                            stop_event: Optional[threading.Event]) -> Optional[Dict]:
+        """请求并解析视频详情页，失败时按指数退避重试"""
+        for attempt in range(max_retries + 1):
+            try:
+                response = self._get(url, timeout=10, stop_event=stop_event)
+                if response is None:
+                    return None
+                if response.status_code == 200:
+                    return self._parse_video_detail(response.content)
+                if response.status_code not in self.RETRY_STATUS_CODES:
+                    return None
+                error = f"状态码 {response.status_code}"
+            except Exception as e:
+                error = str(e)
+
+            if attempt < max_retries:
+                # 指数退避，并加入随机抖动避免重试同时发生
+                delay = self.RETRY_BACKOFF * (2 ** attempt) + random.uniform(0, self.RETRY_BACKOFF)
+                if stop_event is not None:
+                    if stop_event.wait(delay):
+                        return None
                 else:
-                    description = full_desc.strip()
-                if description.endswith(','):
-                    description = description[:-1].strip()
-
-                return {
-                    'title': title,
-                    'author': author,
-                    'description': description,
-                    'uploadDate': upload_date,
-                    'datePublished': publish_date
-                }
-            else:
-                return None
-        except Exception as e:
-            print(f"获取视频详情失败: {e}")
-            return None
+                    time.sleep(delay)
 
-    def enrich_videos(self, videos: List[Dict],
-                      progress_callback: Optional[Callable] = None) -> List[Dict]:
-        """补充视频详细信息"""
-        enriched_videos = []
-        total = len(videos)
+        print(f"获取视频详情失败: {error}")
+        return None
 
-        for i, video in enumerate(videos):
-            url = video.get('arcurl', '')
-            if url:
-                detailed_info = self.get_video_detail(url)
+    def _parse_video_detail(self, content) -> Dict:
+        """解析视频详情页面的 meta 信息"""
+        soup = BeautifulSoup(content, 'html.parser')
 
-                if detailed_info:
-                    video['title'] = detailed_info['title']
-                    video['description'] = detailed_info['description']
-                    video['author'] = detailed_info['author']
-                    video['uploadDate'] = detailed_info['uploadDate']
+        title_tag = soup.find('meta', {'itemprop': 'name'})
+        author_tag = soup.find('meta', {'itemprop': 'author'})
+        upload_date_tag = soup.find('meta', {'itemprop': 'uploadDate'})
+        publish_date_tag = soup.find('meta', {'itemprop': 'datePublished'})
+        desc_tag = soup.find('meta', {'itemprop': 'description'})
 
-                    if detailed_info['datePublished']:
-                        video['pubdate'] = detailed_info['datePublished']
+        title = title_tag.get('content', '') if title_tag else ''
+        title = title.replace('_哔哩哔哩_bilibili', '')
 
-                time.sleep(random.uniform(0.5, 1.5))
+        author = author_tag.get('content', '') if author_tag else ''
+        upload_date = upload_date_tag.get('content', '') if upload_date_tag else ''
+        publish_date = publish_date_tag.get('content', '') if publish_date_tag else ''
 
-            enriched_videos.append(video)
+        full_desc = desc_tag.get('content', '') if desc_tag else ''
+        if '视频播放量' in full_desc:
+            description = full_desc.split('视频播放量')[0].strip()
+        else:
+            description = full_desc.strip()
+        if description.endswith(','):
+            description = description[:-1].strip()
+
+        return {
+            'title': title,
+            'author': author,
+            'description': description,
+            'uploadDate': upload_date,
+            'datePublished': publish_date
+        }
+
+    @staticmethod
+    def _apply_video_detail(video: Dict, detailed_info: Optional[Dict]):
+        """将详细信息写回视频字典"""
+        if not detailed_info:
+            return
+
+        video['title'] = detailed_info['title']
+        video['description'] = detailed_info['description']
+        video['author'] = detailed_info['author']
+        video['uploadDate'] = detailed_info['uploadDate']
+
+        if detailed_info['datePublished']:
+            video['pubdate'] = detailed_info['datePublished']
 
-            if progress_callback and (i + 1) % 10 == 0:
-                progress_callback(f"已处理 {i + 1}/{total} 个视频")
+    def enrich_videos(self, videos: List[Dict],
+                      progress_callback: Optional[Callable] = None,
+                      max_workers: int = 1,
+                      max_retries: int = 2,
+                      item_callback: Optional[Callable[[int, int], None]] = None,
+                      stop_event: Optional[threading.Event] = None,
+                      force_refresh: bool = False,
+                      executor: Optional[Executor] = None,
+                      failed: Optional[Set[int]] = None) -> List[Dict]:
+        """
+        补充视频详细信息
 
-        return enriched_videos
+        Args:
+            videos: 视频信息列表
+            progress_callback: 日志回调，每处理 10 个视频调用一次，接收消息字符串
+            max_workers: 并发线程数，大于 1 时启用并行模式
+            max_retries: 单个视频请求失败时的重试次数
+            item_callback: 进度回调，每完成一个视频调用一次，接收 (已完成数, 总数)
+            stop_event: 可选的停止信号，被设置后不再发起新的请求
+            force_refresh: 忽略详情缓存，全部重新请求
+            executor: 可选的共享线程池，提供时在其中执行，同时在途的请求不超过 max_workers 个
+            failed: 可选的集合，未能补充详情（请求失败或因停止未请求）的视频位置会加入其中
+
+        Returns:
+            与输入顺序一致的视频列表
+        """
+        total = len(videos)
+        # 详情页域名已配置限速器时由限速器控制节奏，否则沿用随机等待
+        use_sleep = self.DETAIL_HOST not in self.rate_limiters
+
+        def enrich_one(index: int) -> Dict:
+            video = videos[index]
+            url = video.get('arcurl', '')
+            if not url:
+                return video
+            if stop_event is not None and stop_event.is_set():
+                if failed is not None:
+                    failed.add(index)
+                return video
+
+            bvid = video.get('bvid')
+            if self.detail_cache is not None and bvid and not force_refresh:
+                cached = self.detail_cache.get(bvid)
+                if cached is not None:
+                    # 命中缓存时不发起请求，也无需等待
+                    self._apply_video_detail(video, cached)
+                    return video
+
+            detailed_info = self.get_video_detail(url, max_retries=max_retries,
+                                                  stop_event=stop_event, force_refresh=True)
+            self._apply_video_detail(video, detailed_info)
+            if detailed_info is None and failed is not None:
+                failed.add(index)
+            if use_sleep:
+                time.sleep(random.uniform(0.5, 1.5))
+            return video
+
+        def report(done: int):
+            if item_callback:
+                item_callback(done, total)
+            if progress_callback and (done % 10 == 0 or done == total):
+                progress_callback(f"已处理 {done}/{total} 个视频")
+
+        if executor is None and max_workers <= 1:
+            enriched_videos = []
+            for i in range(total):
+                enriched_videos.append(enrich_one(i))
+                report(len(enriched_videos))
+            return enriched_videos
+
+        # 并行模式：结果按输入位置写回，保证输出顺序不变；
+        # 以滑动窗口提交，共享线程池时不会一次占满队列而阻塞其他任务
+        enriched_videos: List[Optional[Dict]] = [None] * total
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        pending = {}
+        next_index = 0
+        done = 0
+        try:
+            while next_index < total or pending:
+                while next_index < total and len(pending) < max(1, max_workers):
+                    pending[executor.submit(enrich_one, next_index)] = next_index
+                    next_index += 1
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    i = pending.pop(future)
+                    try:
+                        enriched_videos[i] = future.result()
+                    except Exception as e:
+                        print(f"补充视频信息失败: {e}")
+                        enriched_videos[i] = videos[i]
+                        if failed is not None:
+                            failed.add(i)
+                    done += 1
+                    report(done)
+        finally:
+            if own_executor:
+                executor.shutdown(wait=True)
 
+        return enriched_videos
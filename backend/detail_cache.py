@@ -0,0 +1,149 @@
+# backend/detail_cache.py
+"""
+视频详情持久化缓存模块
+以 BVID 为键，将详情页解析结果保存在本地 SQLite 中
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class VideoDetailCache:
+    """视频详情缓存（线程安全）"""
+
+    # 每写入多少次做一次淘汰；估计的条目数超出容量时立即淘汰
+    EVICT_INTERVAL = 200
+    # 超出容量时淘汰到容量的该比例，留出余量，避免缓存满后每次写入都触发淘汰
+    EVICT_TARGET_RATIO = 0.9
+
+    def __init__(self, db_path: str, ttl: float = 7 * 24 * 3600, max_entries: int = 100000):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite 数据库文件路径
+            ttl: 缓存有效期（秒），小于等于 0 表示永不过期
+            max_entries: 最大缓存条目数，超出后按最近访问时间淘汰
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS video_details (
+                bvid TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_video_details_accessed ON video_details(accessed_at)'
+        )
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_video_details_fetched ON video_details(fetched_at)'
+        )
+        self._conn.commit()
+
+        # 条目数估计值：每次写入加一（覆盖已有条目时偏大），淘汰时校正
+        self._estimated_count = self._conn.execute('SELECT COUNT(*) FROM video_details').fetchone()[0]
+        self._puts_since_evict = 0
+
+    def _is_expired(self, fetched_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - fetched_at > self.ttl
+
+    def get(self, bvid: str) -> Optional[Dict]:
+        """读取缓存，未命中或已过期时返回 None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data, fetched_at FROM video_details WHERE bvid = ?', (bvid,)
+            ).fetchone()
+
+            if row is None or self._is_expired(row[1], now):
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                'UPDATE video_details SET accessed_at = ? WHERE bvid = ?', (now, bvid)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, bvid: str, detail: Dict):
+        """写入缓存，每 EVICT_INTERVAL 次写入或估计超出容量时淘汰过期与最久未访问的条目"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO video_details (bvid, data, fetched_at, accessed_at) '
+                'VALUES (?, ?, ?, ?)',
+                (bvid, json.dumps(detail, ensure_ascii=False), now, now)
+            )
+            self._estimated_count += 1
+            self._puts_since_evict += 1
+            if (self._puts_since_evict >= self.EVICT_INTERVAL
+                    or 0 < self.max_entries < self._estimated_count):
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """淘汰过期条目和超出容量的条目，并校正条目数估计值（调用方需持有锁）"""
+        if self.ttl > 0:
+            cursor = self._conn.execute(
+                'DELETE FROM video_details WHERE fetched_at < ?', (time.time() - self.ttl,)
+            )
+            self.evictions += cursor.rowcount
+
+        count = self._conn.execute('SELECT COUNT(*) FROM video_details').fetchone()[0]
+        if 0 < self.max_entries < count:
+            overflow = count - int(self.max_entries * self.EVICT_TARGET_RATIO)
+            cursor = self._conn.execute(
+                'DELETE FROM video_details WHERE bvid IN ('
+                'SELECT bvid FROM video_details ORDER BY accessed_at ASC LIMIT ?)',
+                (overflow,)
+            )
+            self.evictions += cursor.rowcount
+            count -= cursor.rowcount
+
+        self._estimated_count = count
+        self._puts_since_evict = 0
+
+    def invalidate(self, bvid: str):
+        """删除指定 BVID 的缓存"""
+        with self._lock:
+            self._conn.execute('DELETE FROM video_details WHERE bvid = ?', (bvid,))
+            self._conn.commit()
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute('DELETE FROM video_details')
+            self._conn.commit()
+            self._estimated_count = 0
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计信息"""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM video_details').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+        }
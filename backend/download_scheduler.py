@@ -0,0 +1,189 @@
+# backend/download_scheduler.py
+"""
+下载调度模块
+按优先级排队，由固定数量的工作线程执行，避免同时启动过多 yt-dlp 进程
+"""
+import heapq
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+
+class DownloadTask:
+    """一个排队或执行中的下载任务"""
+
+    def __init__(self, task_id: str, bvid: str, download_type: str, priority: int, seq: int):
+        self.task_id = task_id
+        self.bvid = bvid
+        self.download_type = download_type
+        self.priority = priority
+        self.seq = seq
+        self.state = 'queued'  # queued / running / done / cancelled
+        self.cancel_event = threading.Event()
+        self.finished = threading.Event()  # 执行结束或排队中被取消时设置
+        self.process = None  # 执行中的子进程，取消时终止
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+
+class DownloadScheduler:
+    """带优先级和并发上限的下载队列（线程安全）"""
+
+    # 优先级名称 -> 数值，数值越小越先执行
+    PRIORITIES = {'high': 0, 'normal': 1, 'low': 2}
+
+    def __init__(self, runner: Callable[[DownloadTask], None], max_concurrent: int = 3,
+                 keep_finished: int = 500):
+        """
+        Args:
+            runner: 执行单个任务的函数，接收 DownloadTask
+            max_concurrent: 同时执行的任务数上限
+            keep_finished: 保留的已结束任务数，超出后移除最早结束的
+        """
+        self.runner = runner
+        self.max_concurrent = max(1, max_concurrent)
+        self._heap = []
+        self._tasks: Dict[str, DownloadTask] = {}
+        self._finished = deque(maxlen=max(1, keep_finished))
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+        for i in range(self.max_concurrent):
+            thread = threading.Thread(target=self._worker, name=f'download-{i}')
+            thread.daemon = True
+            thread.start()
+
+    @classmethod
+    def parse_priority(cls, value) -> int:
+        """解析优先级（名称或整数），无法识别时为 normal"""
+        if isinstance(value, str) and value in cls.PRIORITIES:
+            return cls.PRIORITIES[value]
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return cls.PRIORITIES['normal']
+
+    def submit(self, task_id: str, bvid: str, download_type: str, priority: int = 1,
+               on_queued: Optional[Callable[[DownloadTask], None]] = None) -> Optional[DownloadTask]:
+        """
+        加入队列
+
+        Args:
+            on_queued: 可选，确实加入队列时在工作线程取走任务之前调用（持有队列锁），用于写入排队状态
+
+        Returns:
+            新任务；同一任务已在排队或执行中时返回 None（不调用 on_queued）
+        """
+        with self._cond:
+            existing = self._tasks.get(task_id)
+            if existing is not None and existing.state in ('queued', 'running'):
+                return None
+
+            task = DownloadTask(task_id, bvid, download_type, priority, next(self._counter))
+            if on_queued is not None:
+                on_queued(task)
+            self._tasks[task_id] = task
+            heapq.heappush(self._heap, (priority, task.seq, task))
+            self._cond.notify()
+            return task
+
+    def cancel(self, task_id: str) -> bool:
+        """取消任务：排队中的直接移出队列，执行中的终止其子进程"""
+        with self._cond:
+            task = self._tasks.get(task_id)
+            if task is None or task.state not in ('queued', 'running'):
+                return False
+
+            task.cancel_event.set()
+            if task.state == 'queued':
+                # 堆中的条目在出队时跳过
+                task.state = 'cancelled'
+                self._mark_finished(task)
+                task.finished.set()
+            process = task.process
+
+        if process is not None and process.poll() is None:
+            process.terminate()
+        return True
+
+    def is_active(self, task_id: str) -> bool:
+        """任务是否在排队或执行中"""
+        with self._cond:
+            task = self._tasks.get(task_id)
+            return task is not None and task.state in ('queued', 'running')
+
+    def get_task(self, task_id: str) -> Optional[DownloadTask]:
+        with self._cond:
+            return self._tasks.get(task_id)
+
+    def queue_position(self, task_id: str) -> Optional[int]:
+        """排队位置（从 1 开始），不在队列中时返回 None"""
+        with self._cond:
+            task = self._tasks.get(task_id)
+            if task is None or task.state != 'queued':
+                return None
+            ahead = sum(1 for priority, seq, queued in self._heap
+                        if queued.state == 'queued' and (priority, seq) < (task.priority, task.seq))
+            return ahead + 1
+
+    def attach_process(self, task: DownloadTask, process) -> bool:
+        """
+        记录任务的子进程，供取消时终止
+
+        Returns:
+            任务是否已被取消（已取消时立即终止该进程）
+        """
+        with self._cond:
+            task.process = process
+            cancelled = task.cancelled
+        if cancelled:
+            process.terminate()
+        return cancelled
+
+    def pending(self) -> List[DownloadTask]:
+        """按执行顺序排列的排队任务"""
+        with self._cond:
+            return [task for _, _, task in sorted(self._heap) if task.state == 'queued']
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    while not self._heap:
+                        self._cond.wait()
+                    _, _, task = heapq.heappop(self._heap)
+                    if task.state == 'queued':
+                        task.state = 'running'
+                        break
+
+            try:
+                self.runner(task)
+            except Exception as e:
+                print(f"下载任务 {task.task_id} 异常: {e}")
+            finally:
+                with self._cond:
+                    task.state = 'cancelled' if task.cancelled else 'done'
+                    task.process = None
+                    self._mark_finished(task)
+                task.finished.set()
+
+    def _mark_finished(self, task: DownloadTask):
+        """记录已结束的任务，并移除超出保留数量的最早结束的任务（调用方需持有锁）"""
+        if len(self._finished) == self._finished.maxlen:
+            oldest = self._finished[0]
+            # 同一任务 ID 可能已重新提交，只移除仍是该已结束任务的条目
+            if self._tasks.get(oldest.task_id) is oldest:
+                del self._tasks[oldest.task_id]
+        self._finished.append(task)
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            states = [task.state for task in self._tasks.values()]
+        return {
+            'max_concurrent': self.max_concurrent,
+            'queued': states.count('queued'),
+            'running': states.count('running'),
+        }
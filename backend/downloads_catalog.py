@@ -0,0 +1,316 @@
+# backend/downloads_catalog.py
+"""
+下载目录索引模块
+将下载目录中各视频的文件、大小、修改时间、音频/视频/转写 标记与 AI 总结保存在本地 SQLite 中，
+下载列表直接查询索引（分页、排序、筛选），不再每次遍历目录；
+下载、转写、删除时即时更新，后台定期按目录修改时间核对，补上外部对目录的改动
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+AUDIO_EXTENSIONS = ('.m4a', '.mp3', '.wav', '.aac')
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.flv', '.mkv')
+# 下载中/写入中的临时文件，不计入索引
+TEMP_SUFFIXES = ('.part', '.ytdl')
+# 与转写文件放在一起的 AI 总结
+SUMMARY_SUFFIX = '_summary.md'
+
+# 允许排序的字段（接口参数 → 列名）
+SORT_FIELDS = {
+    'mtime': 'mtime',
+    'title': 'title',
+    'size': 'total_size',
+    'files': 'file_count',
+    'bvid': 'bvid',
+}
+
+
+def classify_files(bvid: str, names: List[str]) -> Dict:
+    """根据文件名判断是否有音频/视频/转写/总结，并取标题（优先取音频文件名）"""
+    has_audio = False
+    has_video = False
+    has_transcript = False
+    has_summary = False
+    title = bvid
+
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        ext = ext.lower()
+        if name.endswith(SUMMARY_SUFFIX):
+            has_summary = True
+        elif ext in AUDIO_EXTENSIONS:
+            has_audio = True
+            title = stem
+        elif ext in VIDEO_EXTENSIONS:
+            has_video = True
+            if not has_audio:
+                title = stem.replace('_video', '')
+        elif ext == '.txt' and not name.endswith('_timestamped.txt'):
+            has_transcript = True
+        elif ext in ('.srt', '.json'):
+            has_transcript = True
+
+    return {
+        'title': title,
+        'has_audio': has_audio,
+        'has_video': has_video,
+        'has_transcript': has_transcript,
+        'has_summary': has_summary,
+    }
+
+
+class DownloadsCatalog:
+    """下载目录索引（线程安全）"""
+
+    def __init__(self, db_path: str, download_dir: str):
+        """
+        初始化索引
+
+        Args:
+            db_path: SQLite 数据库文件路径
+            download_dir: 下载目录，每个子目录对应一个 BVID
+        """
+        self.db_path = db_path
+        self.download_dir = download_dir
+        self.last_scan: Optional[Dict] = None
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS downloads (
+                bvid TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                has_audio INTEGER NOT NULL,
+                has_video INTEGER NOT NULL,
+                has_transcript INTEGER NOT NULL,
+                has_summary INTEGER NOT NULL DEFAULT 0,
+                summary TEXT,
+                file_count INTEGER NOT NULL,
+                total_size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                dir_mtime REAL NOT NULL
+            )
+        ''')
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(downloads)')}
+        if 'summary' not in columns:
+            # 旧版索引没有总结字段：补上后清空目录修改时间，下次核对时全部重新扫描
+            self._conn.execute('ALTER TABLE downloads ADD COLUMN has_summary INTEGER NOT NULL DEFAULT 0')
+            self._conn.execute('ALTER TABLE downloads ADD COLUMN summary TEXT')
+            self._conn.execute('UPDATE downloads SET dir_mtime = 0')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_downloads_mtime ON downloads(mtime)')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS download_files (
+                bvid TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                PRIMARY KEY (bvid, name)
+            )
+        ''')
+        self._conn.commit()
+
+    def refresh(self, bvid: str):
+        """重新扫描一个视频目录并更新索引，目录不存在或没有文件时移除"""
+        bvid_dir = os.path.join(self.download_dir, bvid)
+        try:
+            dir_mtime = os.stat(bvid_dir).st_mtime
+            entries = list(os.scandir(bvid_dir))
+        except (FileNotFoundError, NotADirectoryError):
+            self.remove(bvid)
+            return
+
+        files = []
+        for entry in entries:
+            if entry.name.endswith(TEMP_SUFFIXES):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((entry.name, stat.st_size, stat.st_mtime))
+
+        if not files:
+            self.remove(bvid)
+            return
+
+        info = classify_files(bvid, [name for name, _, _ in files])
+        summary = None
+        if info['has_summary']:
+            summary_file = next(name for name, _, _ in files if name.endswith(SUMMARY_SUFFIX))
+            try:
+                with open(os.path.join(bvid_dir, summary_file), 'r', encoding='utf-8') as f:
+                    summary = f.read()
+            except (OSError, UnicodeDecodeError):
+                pass
+
+        with self._lock:
+            self._conn.execute('DELETE FROM download_files WHERE bvid = ?', (bvid,))
+            self._conn.executemany(
+                'INSERT INTO download_files (bvid, name, size, mtime) VALUES (?, ?, ?, ?)',
+                [(bvid, name, size, mtime) for name, size, mtime in files]
+            )
+            self._conn.execute(
+                'INSERT OR REPLACE INTO downloads (bvid, title, has_audio, has_video, has_transcript, '
+                'has_summary, summary, file_count, total_size, mtime, dir_mtime) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (bvid, info['title'], info['has_audio'], info['has_video'], info['has_transcript'],
+                 info['has_summary'], summary, len(files), sum(size for _, size, _ in files),
+                 max(mtime for _, _, mtime in files), dir_mtime)
+            )
+            self._conn.commit()
+
+    def remove(self, bvid: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM download_files WHERE bvid = ?', (bvid,))
+            self._conn.execute('DELETE FROM downloads WHERE bvid = ?', (bvid,))
+            self._conn.commit()
+
+    def reconcile(self) -> Dict:
+        """
+        核对索引与下载目录：只重新扫描修改时间变化的子目录，并移除已不存在的条目
+
+        子目录中文件的新增、删除与改名都会更新目录的修改时间，因此每次核对只需对每个子目录做一次 stat
+        """
+        start = time.perf_counter()
+        with self._lock:
+            known = dict(self._conn.execute('SELECT bvid, dir_mtime FROM downloads').fetchall())
+
+        seen = set()
+        refreshed = 0
+        try:
+            entries = list(os.scandir(self.download_dir))
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            try:
+                if not entry.is_dir():
+                    continue
+                dir_mtime = entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            seen.add(entry.name)
+            if known.get(entry.name) != dir_mtime:
+                self.refresh(entry.name)
+                refreshed += 1
+
+        removed = [bvid for bvid in known if bvid not in seen]
+        for bvid in removed:
+            self.remove(bvid)
+
+        self.last_scan = {
+            'time': time.time(),
+            'seconds': round(time.perf_counter() - start, 3),
+            'directories': len(seen),
+            'refreshed': refreshed,
+            'removed': len(removed),
+        }
+        return self.last_scan
+
+    def start_scanner(self, interval: float) -> threading.Thread:
+        """启动后台核对线程：立即核对一次，之后每 interval 秒核对一次"""
+        def run():
+            while True:
+                try:
+                    self.reconcile()
+                except Exception as e:
+                    print(f"[DownloadsCatalog] 核对下载目录失败: {e}")
+                time.sleep(interval)
+
+        thread = threading.Thread(target=run, name='downloads-scanner')
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def query(self, page: int = 1, page_size: int = 0, sort: str = 'mtime', order: str = 'desc',
+              keyword: str = '', has_audio: Optional[bool] = None, has_video: Optional[bool] = None,
+              has_transcript: Optional[bool] = None, has_summary: Optional[bool] = None,
+              include_files: bool = True) -> Tuple[List[Dict], int]:
+        """
+        查询下载列表
+
+        Args:
+            page: 页码，从 1 开始
+            page_size: 每页条数，小于等于 0 表示返回全部
+            sort: 排序字段，见 SORT_FIELDS
+            order: asc / desc
+            keyword: 按标题或 BVID 模糊筛选
+            has_audio / has_video / has_transcript / has_summary: 按标记筛选，None 表示不筛选
+            include_files: 是否附带每个视频的文件列表
+
+        Returns:
+            (当前页条目, 符合条件的总数)
+        """
+        conditions = []
+        args = []
+        if keyword:
+            conditions.append("(title LIKE ? ESCAPE '\\' OR bvid LIKE ? ESCAPE '\\')")
+            pattern = '%' + keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            args += [pattern, pattern]
+        for column, value in (('has_audio', has_audio), ('has_video', has_video),
+                              ('has_transcript', has_transcript), ('has_summary', has_summary)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                args.append(int(value))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        column = SORT_FIELDS.get(sort, 'mtime')
+        direction = 'ASC' if order == 'asc' else 'DESC'
+        sql = (f'SELECT bvid, title, has_audio, has_video, has_transcript, has_summary, summary, '
+               f'file_count, total_size, mtime FROM downloads {where} ORDER BY {column} {direction}, bvid {direction}')
+        page_args = list(args)
+        if page_size > 0:
+            sql += ' LIMIT ? OFFSET ?'
+            page_args += [page_size, (max(1, page) - 1) * page_size]
+
+        with self._lock:
+            total = self._conn.execute(f'SELECT COUNT(*) FROM downloads {where}', args).fetchone()[0]
+            rows = self._conn.execute(sql, page_args).fetchall()
+            files: Dict[str, List[Dict]] = {}
+            if include_files and rows:
+                bvids = [row[0] for row in rows]
+                placeholders = ','.join('?' * len(bvids))
+                for bvid, name, size, mtime in self._conn.execute(
+                        f'SELECT bvid, name, size, mtime FROM download_files '
+                        f'WHERE bvid IN ({placeholders}) ORDER BY name', bvids):
+                    files.setdefault(bvid, []).append({
+                        'name': name,
+                        'size': size,
+                        'mtime': mtime,
+                        'path': os.path.join(self.download_dir, bvid, name),
+                    })
+
+        items = []
+        for bvid, title, audio, video, transcript, has_summary, summary, file_count, total_size, mtime in rows:
+            item = {
+                'bvid': bvid,
+                'title': title,
+                'has_audio': bool(audio),
+                'has_video': bool(video),
+                'has_transcript': bool(transcript),
+                'has_summary': bool(has_summary),
+                'summary': summary,
+                'file_count': file_count,
+                'total_size': total_size,
+                'mtime': mtime,
+            }
+            if include_files:
+                item['files'] = files.get(bvid, [])
+            items.append(item)
+        return items, total
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            count, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(total_size), 0) FROM downloads').fetchone()
+        return {
+            'downloads': count,
+            'total_size': size,
+            'last_scan': self.last_scan,
+        }
@@ -0,0 +1,119 @@
+# backend/event_bus.py
+"""
+进度事件总线
+后台任务发布进度事件，SSE 连接订阅后逐条推送给前端，替代客户端轮询
+"""
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Iterator, Optional
+
+
+class EventBus:
+    """进程内的发布/订阅总线（线程安全）"""
+
+    def __init__(self, history_size: int = 500, queue_size: int = 1000, max_throttle_keys: int = 1000):
+        """
+        Args:
+            history_size: 保留的最近事件数，断线重连时按 Last-Event-ID 补发
+            queue_size: 每个订阅者的队列容量，消费过慢时丢弃最旧的事件
+            max_throttle_keys: 保留发布时间的节流键数，超出时丢弃最久未发布的键
+        """
+        self.queue_size = queue_size
+        self.max_throttle_keys = max_throttle_keys
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        # 节流键 -> 上次发布时间，按发布先后排列（LRU）；每个任务一个键，需限制数量
+        self._last_published: 'OrderedDict[str, float]' = OrderedDict()
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def publish(self, event: str, data: Dict,
+                throttle_key: Optional[str] = None, min_interval: float = 0.0) -> bool:
+        """
+        发布事件
+
+        Args:
+            event: 事件类型（crawler / download / transcribe ...）
+            data: 事件数据，需可 JSON 序列化
+            throttle_key: 节流键，同一键在 min_interval 秒内只发布一次
+            min_interval: 节流间隔（秒）
+
+        Returns:
+            是否已发布（被节流时返回 False）
+        """
+        with self._lock:
+            if throttle_key is not None:
+                now = time.monotonic()
+                if now - self._last_published.get(throttle_key, 0.0) < min_interval:
+                    return False
+                self._last_published[throttle_key] = now
+                self._last_published.move_to_end(throttle_key)
+                while len(self._last_published) > self.max_throttle_keys:
+                    # 被丢弃的键最多让对应任务多发布一次事件
+                    self._last_published.popitem(last=False)
+
+            self._seq += 1
+            item = (self._seq, event, json.dumps(data, ensure_ascii=False))
+            self._history.append(item)
+            subscribers = list(self._subscribers)
+
+        for q in subscribers:
+            self._put(q, item)
+        return True
+
+    def _put(self, q: queue.Queue, item):
+        try:
+            q.put_nowait(item)
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                q.put_nowait(item)
+            except queue.Full:
+                pass
+
+    def subscribe(self, last_event_id: int = 0) -> queue.Queue:
+        """订阅事件；提供 last_event_id 时先补发其后仍在历史中的事件"""
+        q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            if last_event_id:
+                for item in self._history:
+                    if item[0] > last_event_id:
+                        self._put(q, item)
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q: queue.Queue):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def stream(self, last_event_id: int = 0, keepalive: float = 15.0) -> Iterator[str]:
+        """
+        生成 SSE 格式的文本流，空闲时定期发送注释行保持连接
+
+        客户端断开后生成器被关闭，订阅随之取消
+        """
+        q = self.subscribe(last_event_id)
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    seq, event, data = q.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f'id: {seq}\nevent: {event}\ndata: {data}\n\n'
+        finally:
+            self.unsubscribe(q)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self._seq,
+            }
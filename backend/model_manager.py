@@ -0,0 +1,229 @@
+# backend/model_manager.py
+"""
+转写模型管理
+按 (引擎, 模型大小) 保存已加载的模型，可在启动时后台预加载；
+超出内存预算时淘汰最久未使用的空闲模型，并记录每个模型的加载耗时与常驻内存
+"""
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# 尚未实测时用于预算判断的常驻内存估计（MB）
+MODEL_MEMORY_ESTIMATE_MB = {
+    "tiny": 200,
+    "base": 350,
+    "small": 1100,
+    "medium": 3000,
+    "large": 6000,
+}
+
+
+def current_rss_mb() -> Optional[float]:
+    """当前进程的常驻内存（MB），无法读取时返回 None（仅支持 Linux）"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def model_memory_mb(model) -> Optional[float]:
+    """由模型自身计算占用内存（MB）：PyTorch 模型为参数与缓冲区的字节数之和，无法计算时返回 None"""
+    try:
+        tensors = list(model.parameters()) + list(model.buffers())
+    except (AttributeError, TypeError):
+        return None
+    return sum(t.numel() * t.element_size() for t in tensors) / 1024 / 1024
+
+
+def parse_model_specs(value: str, default_engine: str) -> List[Tuple[str, str]]:
+    """
+    解析模型列表配置，如 "medium,faster:small"
+
+    Returns:
+        [(引擎, 模型大小), ...]，未写引擎的项使用 default_engine
+    """
+    specs = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        engine, _, model_size = item.rpartition(":")
+        specs.append((engine or default_engine, model_size))
+    return specs
+
+
+class ModelEntry:
+    """一个已加载的模型实例"""
+
+    def __init__(self, engine: str, model_size: str, model, load_seconds: float, memory_mb: float):
+        self.engine = engine
+        self.model_size = model_size
+        self.model = model
+        self.load_seconds = load_seconds
+        self.memory_mb = memory_mb
+        self.in_use = False
+        self.uses = 0
+        self.last_used = time.time()
+
+    def to_dict(self) -> Dict:
+        return {
+            "engine": self.engine,
+            "model": self.model_size,
+            "state": "in_use" if self.in_use else "idle",
+            "load_seconds": round(self.load_seconds, 2),
+            "memory_mb": round(self.memory_mb, 1),
+            "uses": self.uses,
+            "last_used": self.last_used,
+        }
+
+
+class ModelManager:
+    """
+    模型池（线程安全）
+
+    同一个模型实例同时只借给一个使用者（openai-whisper 推理时会在模型上挂缓存钩子，不能并发共享）；
+    同一模型被并发使用时各自加载一份，归还后留在池中供后续任务复用
+    """
+
+    def __init__(self, loader: Callable[[str, str], object], memory_budget_mb: float = 0):
+        """
+        Args:
+            loader: 加载模型的函数，接收 (引擎, 模型大小)
+            memory_budget_mb: 模型常驻内存预算（MB），超出时淘汰最久未使用的空闲模型，0 表示不限制
+        """
+        self.loader = loader
+        self.memory_budget_mb = memory_budget_mb
+        self._entries: List[ModelEntry] = []
+        self._idle: "OrderedDict[int, ModelEntry]" = OrderedDict()  # 空闲实例，按最近使用排序
+        self._measured_mb: Dict[Tuple[str, str], float] = {}  # 各模型实测的常驻内存
+        self._loading: List[Tuple[str, str]] = []
+        self._evictions = 0
+        self._cond = threading.Condition()
+        # 串行加载：避免同时加载多个模型造成内存峰值，也使内存增量的测量准确
+        self._load_lock = threading.Lock()
+
+    def estimate_mb(self, engine: str, model_size: str) -> float:
+        """模型的常驻内存：已加载过的用实测值，否则用估计值"""
+        measured = self._measured_mb.get((engine, model_size))
+        if measured is not None:
+            return measured
+        return MODEL_MEMORY_ESTIMATE_MB.get(model_size, 0)
+
+    @contextmanager
+    def acquire(self, engine: str, model_size: str) -> Iterator[object]:
+        """借出一个模型实例，池中没有空闲实例时加载新的，用完自动归还"""
+        entry = self._take_idle(engine, model_size)
+        if entry is None:
+            entry = self._load(engine, model_size)
+        try:
+            yield entry.model
+        finally:
+            with self._cond:
+                entry.in_use = False
+                entry.uses += 1
+                entry.last_used = time.time()
+                self._idle[id(entry)] = entry
+                self._evict(0)
+
+    def _take_idle(self, engine: str, model_size: str) -> Optional[ModelEntry]:
+        with self._cond:
+            for key, entry in reversed(self._idle.items()):
+                if entry.engine == engine and entry.model_size == model_size:
+                    del self._idle[key]
+                    entry.in_use = True
+                    return entry
+        return None
+
+    def _load(self, engine: str, model_size: str, idle: bool = False) -> ModelEntry:
+        """加载模型；idle 为 True 时加载后直接放入空闲池（预加载），否则借出给调用方"""
+        with self._load_lock:
+            if not idle:
+                # 等待加载锁期间可能已有同一模型加载完成（如预加载），直接借用，避免重复加载
+                entry = self._take_idle(engine, model_size)
+                if entry is not None:
+                    return entry
+
+            with self._cond:
+                self._evict(self.estimate_mb(engine, model_size))
+                self._loading.append((engine, model_size))
+
+            try:
+                rss_before = current_rss_mb()
+                start = time.perf_counter()
+                model = self.loader(engine, model_size)
+                load_seconds = time.perf_counter() - start
+                rss_after = current_rss_mb()
+            finally:
+                with self._cond:
+                    self._loading.remove((engine, model_size))
+
+            memory_mb = model_memory_mb(model)
+            if memory_mb is None:
+                # 加载期间其他线程仍在分配、释放内存，进程 RSS 的增量可能偏小甚至为 0，不低于估计值
+                measured = rss_after - rss_before if rss_before is not None and rss_after is not None else 0.0
+                memory_mb = max(measured, MODEL_MEMORY_ESTIMATE_MB.get(model_size, 0))
+            print(f"[ModelManager] 已加载 {engine}/{model_size}：{load_seconds:.1f} 秒，约 {memory_mb:.0f} MB")
+
+            entry = ModelEntry(engine, model_size, model, load_seconds, memory_mb)
+            entry.in_use = not idle
+            with self._cond:
+                self._measured_mb[(engine, model_size)] = memory_mb
+                self._entries.append(entry)
+                if idle:
+                    # 在释放加载锁之前放入空闲池，等待加载锁的请求随后即可借用
+                    self._idle[id(entry)] = entry
+                    self._evict(0)
+            return entry
+
+    def _evict(self, needed_mb: float):
+        """淘汰最久未使用的空闲模型，直到为 needed_mb 留出预算（调用方持有锁）"""
+        if self.memory_budget_mb <= 0:
+            return
+        evicted = False
+        while self._idle and self._used_mb() + needed_mb > self.memory_budget_mb:
+            _, entry = self._idle.popitem(last=False)
+            self._entries.remove(entry)
+            self._evictions += 1
+            evicted = True
+            print(f"[ModelManager] 超出内存预算，卸载 {entry.engine}/{entry.model_size}")
+        if evicted:
+            gc.collect()
+
+    def _used_mb(self) -> float:
+        return sum(entry.memory_mb for entry in self._entries)
+
+    def preload(self, specs: List[Tuple[str, str]]) -> threading.Thread:
+        """在后台线程中依次加载模型并放入池中，首个请求无需等待加载"""
+        def run():
+            for engine, model_size in specs:
+                with self._cond:
+                    loaded = any(entry.engine == engine and entry.model_size == model_size
+                                 for entry in self._idle.values())
+                if loaded:
+                    continue
+                try:
+                    self._load(engine, model_size, idle=True)
+                except Exception as e:
+                    print(f"[ModelManager] 预加载 {engine}/{model_size} 失败: {e}")
+
+        thread = threading.Thread(target=run, name="model-preload")
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {
+                "memory_budget_mb": self.memory_budget_mb,
+                "memory_used_mb": round(self._used_mb(), 1),
+                "rss_mb": current_rss_mb(),
+                "evictions": self._evictions,
+                "loading": [f"{engine}/{model_size}" for engine, model_size in self._loading],
+                "models": [entry.to_dict() for entry in self._entries],
+            }
@@ -0,0 +1,280 @@
+# backend/pipeline.py
+"""
+流水线任务模块
+输入依次流经多个阶段（如 搜索 → 下载音频 → 转写 → 总结），每个阶段有独立的并发数，
+阶段之间用有界队列衔接：上游每产出一个条目即可进入下游，下游处理不过来时上游自动等待。
+网络密集与计算密集的阶段因此重叠执行，总耗时接近最慢阶段的处理能力
+"""
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+# 阶段结束标记
+_DONE = object()
+
+
+class PipelineStage:
+    """流水线的一个阶段"""
+
+    def __init__(self, name: str, handler: Callable[['PipelineJob', Dict], Optional[Iterable[Dict]]],
+                 workers: int = 1, queue_size: int = 10):
+        """
+        Args:
+            name: 阶段名称
+            handler: 处理函数，接收 (任务, 条目)，返回交给下一阶段的条目（可以是多个，返回空表示到此为止）
+            workers: 该阶段的工作线程数
+            queue_size: 该阶段输入队列的容量
+        """
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+
+
+class PipelineJob:
+    """
+    一个流水线任务（线程安全）
+
+    第一阶段的输入（如关键词）不单独记录；各阶段产出的条目必须带 key 字段，
+    按 key 去重并记录所在阶段与状态。条目中以下划线开头的字段只在阶段之间传递，不出现在状态中
+    """
+
+    def __init__(self, job_id: str, stages: List[PipelineStage], inputs: List[Dict],
+                 params: Optional[Dict] = None, context: Optional[Dict] = None, max_items: int = 0,
+                 on_update: Optional[Callable[['PipelineJob'], None]] = None):
+        """
+        Args:
+            inputs: 第一阶段的输入
+            params: 任务参数，随状态一起返回
+            context: 仅供处理函数读取的配置（如接口密钥），不出现在状态中
+            max_items: 最多接收的条目数，达到后不再接收新条目，0 表示不限制
+            on_update: 状态变化时调用
+        """
+        self.job_id = job_id
+        self.stages = stages
+        self.inputs = inputs
+        self.params = params or {}
+        self.context = context or {}
+        self.max_items = max_items
+        self.on_update = on_update
+
+        self.state = 'pending'  # pending / running / completed / cancelled
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self.items: "OrderedDict[str, Dict]" = OrderedDict()
+        self.logs = deque(maxlen=100)
+        self.stats = {
+            stage.name: {'processed': 0, 'failed': 0, 'active': 0, 'busy_seconds': 0.0}
+            for stage in stages
+        }
+
+        self._queues = [queue.Queue(maxsize=stage.queue_size) for stage in stages]
+        self._alive = [stage.workers for stage in stages]
+        self._lock = threading.RLock()
+
+    @property
+    def accepting(self) -> bool:
+        """是否还接收新条目（来源阶段可据此提前停止）"""
+        if self.cancel_event.is_set():
+            return False
+        with self._lock:
+            return not self.max_items or len(self.items) < self.max_items
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def add_log(self, message: str):
+        with self._lock:
+            self.logs.append({'time': time.strftime('%H:%M:%S'), 'message': message})
+        print(f"[Pipeline {self.job_id}] {message}")
+
+    def start(self):
+        self.state = 'running'
+        self.started_at = time.time()
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(target=self._worker, args=(index,),
+                                          name=f'pipeline-{self.job_id}-{stage.name}-{n}')
+                thread.daemon = True
+                thread.start()
+
+        feeder = threading.Thread(target=self._feed, name=f'pipeline-{self.job_id}-feed')
+        feeder.daemon = True
+        feeder.start()
+        self._notify()
+
+    def cancel(self) -> bool:
+        """取消任务：正在处理的条目完成后停止，队列中的条目标记为已取消"""
+        if self.state not in ('pending', 'running'):
+            return False
+        self.cancel_event.set()
+        return True
+
+    def _notify(self):
+        if self.on_update:
+            try:
+                self.on_update(self)
+            except Exception as e:
+                print(f"流水线状态回调异常: {e}")
+
+    def _feed(self):
+        for item in self.inputs:
+            if self.cancel_event.is_set():
+                break
+            self._queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            self._queues[0].put(_DONE)
+
+    def _accept(self, item: Dict, next_index: int) -> bool:
+        """记录新产出的条目；已存在或超出上限时不再向下游传递"""
+        with self._lock:
+            key = item['key']
+            if key in self.items:
+                # 同一条目再次到达（如下游阶段返回自身），只更新所在阶段
+                if self.items[key] is not item:
+                    return False
+            elif self.max_items and len(self.items) >= self.max_items:
+                return False
+            else:
+                item.setdefault('timings', {})
+                self.items[key] = item
+            item['stage'] = self.stages[min(next_index, len(self.stages) - 1)].name
+            item['state'] = 'queued' if next_index < len(self.stages) else 'done'
+            return True
+
+    def _worker(self, index: int):
+        stage = self.stages[index]
+        stats = self.stats[stage.name]
+        input_queue = self._queues[index]
+        last = index == len(self.stages) - 1
+
+        while True:
+            item = input_queue.get()
+            if item is _DONE:
+                break
+
+            tracked = index > 0
+            if self.cancel_event.is_set():
+                if tracked:
+                    item['state'] = 'cancelled'
+                continue
+
+            if tracked:
+                item['state'] = 'running'
+            with self._lock:
+                stats['active'] += 1
+            self._notify()
+
+            start = time.perf_counter()
+            blocked = 0.0  # 等待下游队列的时间，不计入本阶段的处理时间
+            produced = 0
+            failed = False
+            try:
+                # 处理函数可以是生成器：每产出一个条目立即交给下游
+                for output in stage.handler(self, item) or []:
+                    produced += 1
+                    if self._accept(output, index + 1) and not last:
+                        put_start = time.perf_counter()
+                        self._put(index + 1, output)
+                        blocked += time.perf_counter() - put_start
+            except Exception as e:
+                failed = True
+                if tracked:
+                    item['state'] = 'error'
+                    item['error'] = f"{stage.name}: {e}"
+                self.add_log(f"{stage.name} 失败 {item.get('key', '')}: {e}")
+            elapsed = time.perf_counter() - start - blocked
+
+            with self._lock:
+                stats['active'] -= 1
+                stats['busy_seconds'] += elapsed
+                stats['failed' if failed else 'processed'] += 1
+                if tracked:
+                    item['timings'][stage.name] = round(elapsed, 2)
+                    if not failed and not produced:
+                        # 处理函数没有交给下游：该条目在此阶段结束
+                        item['state'] = 'done'
+                        item['stage'] = stage.name
+            self._notify()
+
+        self._stage_finished(index)
+
+    def _put(self, index: int, item: Dict):
+        """放入下游队列，队列满时等待（取消后丢弃）"""
+        while not self.cancel_event.is_set():
+            try:
+                self._queues[index].put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        item['state'] = 'cancelled'
+
+    def _stage_finished(self, index: int):
+        """阶段的最后一个工作线程退出后通知下游结束；最后一个阶段结束即任务结束"""
+        with self._lock:
+            self._alive[index] -= 1
+            if self._alive[index] > 0:
+                return
+
+        if index + 1 < len(self.stages):
+            for _ in range(self.stages[index + 1].workers):
+                self._queues[index + 1].put(_DONE)
+            return
+
+        with self._lock:
+            for item in self.items.values():
+                if item.get('state') in ('queued', 'running'):
+                    item['state'] = 'cancelled'
+            self.state = 'cancelled' if self.cancel_event.is_set() else 'completed'
+            self.finished_at = time.time()
+        self.add_log(f"流水线{'已取消' if self.state == 'cancelled' else '完成'}，用时 {self.elapsed:.1f} 秒")
+        self._notify()
+
+    def get_stage_stats(self) -> List[Dict]:
+        """各阶段的排队数、处理数与工作线程占用率"""
+        elapsed = self.elapsed
+        result = []
+        with self._lock:
+            for index, stage in enumerate(self.stages):
+                stats = self.stats[stage.name]
+                result.append({
+                    'name': stage.name,
+                    'workers': stage.workers,
+                    'queued': self._queues[index].qsize(),
+                    'active': stats['active'],
+                    'processed': stats['processed'],
+                    'failed': stats['failed'],
+                    'busy_seconds': round(stats['busy_seconds'], 1),
+                    # 阶段工作线程的平均占用率，接近 1 的阶段即为瓶颈
+                    'utilization': round(stats['busy_seconds'] / (elapsed * stage.workers), 2) if elapsed else 0.0,
+                })
+        return result
+
+    def to_dict(self, include_items: bool = True) -> Dict:
+        with self._lock:
+            states = [item.get('state') for item in self.items.values()]
+            data = {
+                'job_id': self.job_id,
+                'state': self.state,
+                'params': self.params,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'elapsed': round(self.elapsed, 1),
+                'total_items': len(self.items),
+                'done_items': states.count('done'),
+                'failed_items': states.count('error'),
+                'stages': self.get_stage_stats(),
+                'logs': list(self.logs),
+            }
+            if include_items:
+                data['items'] = [{k: v for k, v in item.items() if not k.startswith('_')}
+                                 for item in self.items.values()]
+        return data
@@ -0,0 +1,129 @@
+# backend/rate_limiter.py
+"""
+令牌桶限速器模块
+在多个线程之间共享，统一控制对同一站点的请求频率
+"""
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+
+class TokenBucketRateLimiter:
+    """令牌桶限速器（线程安全）"""
+
+    def __init__(self, rate: float = 1.0, burst: int = 1, jitter: float = 0.0):
+        """
+        初始化限速器
+
+        Args:
+            rate: 每秒补充的令牌数（即稳定状态下的请求速率）
+            burst: 桶容量，允许的最大突发请求数
+            jitter: 每次放行前附加的随机延迟上限（秒），用于打散请求节奏
+        """
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.jitter = max(0.0, float(jitter))
+
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._total_acquired = 0
+        # 最近放行的时间点，用于统计实际速率
+        self._recent = deque()
+        self._window = 10.0
+
+    def configure(self, rate: float = None, burst: int = None, jitter: float = None):
+        """运行时调整限速参数"""
+        with self._lock:
+            self._refill()
+            if rate is not None and rate > 0:
+                self.rate = float(rate)
+            if burst is not None:
+                self.burst = max(1, int(burst))
+                self._tokens = min(self._tokens, self.burst)
+            if jitter is not None:
+                self.jitter = max(0.0, float(jitter))
+
+    def _refill(self):
+        """按流逝时间补充令牌（调用方需持有锁）"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def acquire(self, stop_event: threading.Event = None) -> bool:
+        """
+        获取一个令牌，必要时阻塞等待
+
+        Args:
+            stop_event: 可选的停止信号，被设置时立即放弃等待
+
+        Returns:
+            是否成功获取令牌
+        """
+        with self._lock:
+            self._waiting += 1
+
+        try:
+            while True:
+                if stop_event is not None and stop_event.is_set():
+                    return False
+
+                with self._lock:
+                    self._refill()
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        now = time.monotonic()
+                        self._total_acquired += 1
+                        self._recent.append(now)
+                        self._trim_recent(now)
+                        jitter = self.jitter
+                        break
+                    wait = (1 - self._tokens) / self.rate
+
+                # 分段等待，便于及时响应停止信号
+                time.sleep(min(wait, 0.5))
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        if jitter > 0:
+            delay = random.uniform(0, jitter)
+            if stop_event is not None:
+                stop_event.wait(delay)
+            else:
+                time.sleep(delay)
+        return True
+
+    def _trim_recent(self, now: float):
+        """丢弃统计窗口外的记录（调用方需持有锁）"""
+        while self._recent and now - self._recent[0] > self._window:
+            self._recent.popleft()
+
+    def get_stats(self) -> Dict:
+        """获取限速器状态：配置、当前实际速率和排队数"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill()
+            self._trim_recent(now)
+            if self._recent:
+                # 以最早一次放行到现在的时长估算（至少按 1 秒计）
+                span = max(now - self._recent[0], 1.0)
+                current_rate = len(self._recent) / span
+            else:
+                current_rate = 0.0
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'jitter': self.jitter,
+                'current_rate': round(current_rate, 3),
+                'queue_depth': self._waiting,
+                'available_tokens': round(self._tokens, 2),
+                'total_requests': self._total_acquired,
+            }
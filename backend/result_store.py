@@ -0,0 +1,266 @@
+# backend/result_store.py
+"""
+爬取结果存储模块
+每获取一页结果即追加写入 SQLite，增量去重，记录断点，按需导出 Excel；
+每条结果记录其 关键词序号、页码、页内位置，去重与导出均按此顺序，与各页完成的先后无关
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from openpyxl import Workbook
+
+
+class CrawlResultStore:
+    """单个爬取任务的结果存储（线程安全）"""
+
+    # 导出 Excel 时的列顺序
+    COLUMNS = [
+        'bvid', 'title', 'arcurl', 'description', 'author',
+        'uploadDate', 'play', 'review', 'tag', 'pubdate',
+        'duration', '搜索关键词', '操作时间'
+    ]
+
+    def __init__(self, db_path: str):
+        """
+        打开（或创建）存储
+
+        Args:
+            db_path: SQLite 数据库文件路径
+        """
+        self.db_path = db_path
+        # 已保存的 BVID -> 其结果顺序 (关键词序号, 页码, 页内位置)
+        self._seen_bvids: Dict[str, Tuple[int, int, int]] = {}
+
+        # 视频数据的修改次数，导出时据此判断结果是否有变化
+        self._version = 0
+        self._export_lock = threading.Lock()
+        self._last_export: Optional[Tuple[str, int, int]] = None  # (路径, 版本, 行数)
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS videos (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                bvid TEXT NOT NULL,
+                data TEXT NOT NULL,
+                enriched INTEGER NOT NULL DEFAULT 0,
+                keyword_index INTEGER NOT NULL DEFAULT 0,
+                page INTEGER NOT NULL DEFAULT 0,
+                position INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_videos_bvid ON videos(bvid);
+            CREATE TABLE IF NOT EXISTS pages_done (
+                keyword_index INTEGER NOT NULL,
+                page INTEGER NOT NULL,
+                PRIMARY KEY (keyword_index, page)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        ''')
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(videos)')}
+        if 'keyword_index' not in columns:
+            # 旧版结果库没有顺序字段：补上后旧结果按写入顺序排在最前
+            for column in ('keyword_index', 'page', 'position'):
+                self._conn.execute(f'ALTER TABLE videos ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_videos_order ON videos(keyword_index, page, position, seq)'
+        )
+        self._conn.commit()
+
+        for bvid, keyword_index, page, position in self._conn.execute(
+                'SELECT bvid, keyword_index, page, position FROM videos '
+                'ORDER BY keyword_index DESC, page DESC, position DESC, seq DESC'):
+            self._seen_bvids[bvid] = (keyword_index, page, position)
+
+        self.remove_duplicates: bool = self.get_meta().get('remove_duplicates', True)
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    # ========== 元数据 ==========
+    def set_meta(self, **values):
+        """写入元数据（值以 JSON 保存）"""
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                [(key, json.dumps(value, ensure_ascii=False)) for key, value in values.items()]
+            )
+            self._conn.commit()
+            if 'remove_duplicates' in values:
+                self.remove_duplicates = values['remove_duplicates']
+
+    def get_meta(self) -> Dict:
+        """读取全部元数据"""
+        with self._lock:
+            rows = self._conn.execute('SELECT key, value FROM meta').fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    # ========== 搜索结果与断点 ==========
+    def add_page(self, keyword_index: int, page: int, videos: List[Dict]) -> Tuple[int, int]:
+        """
+        写入一页搜索结果，并在同一事务中记录该页已完成
+
+        去重时保留结果顺序最靠前的一条：已保存的重复视频来自更靠后的页面时，改为本页的结果，
+        因此并发搜索时各页完成的先后不影响去重结果
+
+        Returns:
+            (写入数量, 因重复被跳过的数量)
+        """
+        rows = []
+        replaced = []
+        skipped = 0
+        with self._lock:
+            for position, video in enumerate(videos):
+                bvid = video.get('bvid', '')
+                order = (keyword_index, page, position)
+                data = json.dumps(video, ensure_ascii=False)
+                if self.remove_duplicates and bvid in self._seen_bvids:
+                    skipped += 1
+                    if order < self._seen_bvids[bvid]:
+                        self._seen_bvids[bvid] = order
+                        replaced.append((data, keyword_index, page, position, bvid))
+                    continue
+                self._seen_bvids.setdefault(bvid, order)
+                rows.append((bvid, data, keyword_index, page, position))
+
+            with self._conn:
+                if rows:
+                    self._conn.executemany(
+                        'INSERT INTO videos (bvid, data, keyword_index, page, position) VALUES (?, ?, ?, ?, ?)',
+                        rows
+                    )
+                if replaced:
+                    self._conn.executemany(
+                        'UPDATE videos SET data = ?, enriched = 0, keyword_index = ?, page = ?, position = ? '
+                        'WHERE bvid = ?', replaced
+                    )
+                self._conn.execute(
+                    'INSERT OR IGNORE INTO pages_done (keyword_index, page) VALUES (?, ?)',
+                    (keyword_index, page)
+                )
+            if rows or replaced:
+                self._version += 1
+
+        return len(rows), skipped
+
+    def get_done_pages(self) -> Set[Tuple[int, int]]:
+        """已完成的 (关键词序号, 页码) 集合"""
+        with self._lock:
+            rows = self._conn.execute('SELECT keyword_index, page FROM pages_done').fetchall()
+        return {(keyword_index, page) for keyword_index, page in rows}
+
+    def update_videos(self, rows: List[Tuple[int, Dict]], enriched: bool = True):
+        """按序号写回更新后的视频信息，并标记是否已补充详情"""
+        with self._lock:
+            self._conn.executemany(
+                'UPDATE videos SET data = ?, enriched = ? WHERE seq = ?',
+                [(json.dumps(video, ensure_ascii=False), int(enriched), seq) for seq, video in rows]
+            )
+            self._conn.commit()
+            self._version += 1
+
+    def count(self, pending_only: bool = False) -> int:
+        """已保存的视频数量，pending_only 时只统计尚未补充详情的"""
+        sql = 'SELECT COUNT(*) FROM videos'
+        if pending_only:
+            sql += ' WHERE enriched = 0'
+        with self._lock:
+            return self._conn.execute(sql).fetchone()[0]
+
+    def get_videos(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """按结果顺序（关键词序号、页码、页内位置）读取视频，limit 为 None 时读取全部"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT data FROM videos ORDER BY keyword_index, page, position, seq LIMIT ? OFFSET ?',
+                (-1 if limit is None else limit, offset)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def get_videos_after(self, after_seq: int = 0, limit: int = 100) -> List[Tuple[int, Dict]]:
+        """读取序号大于 after_seq 的视频 (序号, 视频)，供增量轮询使用"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT seq, data FROM videos WHERE seq > ? ORDER BY seq LIMIT ?',
+                (after_seq, limit)
+            ).fetchall()
+        return [(seq, json.loads(data)) for seq, data in rows]
+
+    def iter_batches(self, batch_size: int = 200,
+                     pending_only: bool = False) -> Iterator[List[Tuple[int, Dict]]]:
+        """按写入顺序分批读取 (序号, 视频)，内存占用与总数无关"""
+        sql = 'SELECT seq, data FROM videos WHERE seq > ?'
+        if pending_only:
+            sql += ' AND enriched = 0'
+        sql += ' ORDER BY seq LIMIT ?'
+
+        last_seq = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(sql, (last_seq, batch_size)).fetchall()
+            if not rows:
+                return
+            last_seq = rows[-1][0]
+            yield [(seq, json.loads(data)) for seq, data in rows]
+
+    def iter_ordered(self, batch_size: int = 1000) -> Iterator[List[Dict]]:
+        """按结果顺序（关键词序号、页码、页内位置）分批读取视频，内存占用与总数无关"""
+        sql = ('SELECT keyword_index, page, position, seq, data FROM videos '
+               'WHERE (keyword_index, page, position, seq) > (?, ?, ?, ?) '
+               'ORDER BY keyword_index, page, position, seq LIMIT ?')
+
+        last = (-1, -1, -1, -1)
+        while True:
+            with self._lock:
+                rows = self._conn.execute(sql, (*last, batch_size)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][:4]
+            yield [json.loads(row[4]) for row in rows]
+
+    def export_excel(self, output_path: str) -> int:
+        """
+        以流式方式按结果顺序导出 Excel
+
+        同一存储的导出依次执行；结果自上次导出到同一路径后没有变化时直接返回，不重新生成
+
+        Returns:
+            导出的行数
+        """
+        with self._export_lock:
+            with self._lock:
+                version = self._version
+            if (self._last_export is not None and self._last_export[:2] == (output_path, version)
+                    and os.path.exists(output_path)):
+                return self._last_export[2]
+
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            sheet.append(self.COLUMNS)
+
+            count = 0
+            for batch in self.iter_ordered(batch_size=1000):
+                for video in batch:
+                    sheet.append([video.get(col, '') for col in self.COLUMNS])
+                    count += 1
+
+            fd, tmp_path = tempfile.mkstemp(suffix='.xlsx.tmp', dir=os.path.dirname(output_path) or '.')
+            os.close(fd)
+            try:
+                workbook.save(tmp_path)
+                os.replace(tmp_path, output_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._last_export = (output_path, version, count)
+            return count
@@ -0,0 +1,324 @@
+# backend/summarizer.py
+"""
+AI 总结模块
+调用 OpenAI 兼容接口总结文本；长文本按片段边界切成若干块，各块并发总结后再合并（map-reduce），
+总耗时取决于并发的分块总结而不是一次超长请求
+"""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from openai import OpenAI
+
+from transcriber import TranscriptSegment
+
+DEFAULT_BASE_URL = 'https://api.openai.com/v1'
+DEFAULT_MODEL = 'gpt-3.5-turbo'
+DEFAULT_PROMPT = '请总结以下内容的主要观点：'
+SYSTEM_PROMPT = '你是一个专业的内容总结助手。'
+
+# 分块总结与合并时使用的提示
+CHUNK_PROMPT = '以下是一段长内容的第 {index}/{total} 部分{span}。请提炼这一部分的要点，保留关键事实与结论，后续会与其他部分合并。总结要求：{prompt}'
+REDUCE_PROMPT = '以下是一段长内容按顺序分成的各部分的要点。请将它们整合成一份完整、连贯、不重复的总结。总结要求：{prompt}'
+
+_CJK_PATTERN = re.compile('[㐀-䶿一-鿿豈-﫿぀-ヿ가-힯]')
+# 纯文本分块时的断句位置
+_SENTENCE_END = re.compile(r'(?<=[。！？!?；;\n])')
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估计 token 数：中日韩文字约每字 1 个，其余约每 4 个字符 1 个"""
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _format_time(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours:02d}:{minutes:02d}:{seconds:02d}'
+
+
+def chunk_segments(segments: Sequence[TranscriptSegment], max_tokens: int) -> List[Dict]:
+    """
+    按片段边界将转写切块，每块估计不超过 max_tokens（单个片段超出时独占一块）
+
+    Returns:
+        [{'start', 'end', 'text', 'tokens'}, ...]
+    """
+    chunks = []
+    current: List[TranscriptSegment] = []
+    tokens = 0
+    for seg in segments:
+        text = seg.text.strip()
+        if not text:
+            continue
+        seg_tokens = estimate_tokens(text)
+        if current and tokens + seg_tokens > max_tokens:
+            chunks.append(_make_chunk(current, tokens))
+            current, tokens = [], 0
+        current.append(seg)
+        tokens += seg_tokens
+    if current:
+        chunks.append(_make_chunk(current, tokens))
+    return chunks
+
+
+def _make_chunk(segments: List[TranscriptSegment], tokens: int) -> Dict:
+    return {
+        'start': segments[0].start,
+        'end': segments[-1].end,
+        'text': '\n'.join(seg.text.strip() for seg in segments),
+        'tokens': tokens,
+    }
+
+
+def chunk_text(text: str, max_tokens: int) -> List[Dict]:
+    """
+    没有时间戳的纯文本按句子切块，每块估计不超过 max_tokens
+
+    断句保留句末标点与换行，各块直接拼接原文，不会丢失词之间的分隔
+    """
+    pieces = []
+    for sentence in _SENTENCE_END.split(text):
+        # 没有标点的长句（转写文本常见）按字数硬切，按每字 1 个 token 计，不会超出上限
+        pieces.extend(sentence[i:i + max_tokens] for i in range(0, len(sentence), max_tokens))
+
+    chunks = []
+    current: List[str] = []
+    tokens = 0
+
+    def flush():
+        chunk = ''.join(current).strip()
+        if chunk:
+            chunks.append({'start': None, 'end': None, 'text': chunk, 'tokens': tokens})
+
+    for piece in pieces:
+        piece_tokens = estimate_tokens(piece)
+        if current and tokens + piece_tokens > max_tokens:
+            flush()
+            current, tokens = [], 0
+        current.append(piece)
+        tokens += piece_tokens
+    flush()
+    return chunks
+
+
+def _complete(client: OpenAI, model: str, content: str) -> Dict:
+    """发送一次对话请求，返回内容、耗时与 token 用量"""
+    start = time.perf_counter()
+    response = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": content}
+        ]
+    )
+    usage = getattr(response, 'usage', None)
+    return {
+        'content': response.choices[0].message.content,
+        'seconds': round(time.perf_counter() - start, 2),
+        'prompt_tokens': getattr(usage, 'prompt_tokens', None) or 0,
+        'completion_tokens': getattr(usage, 'completion_tokens', None) or 0,
+    }
+
+
+def _stream_complete(client: OpenAI, model: str, content: str) -> Iterator[str]:
+    """
+    以流式模式发送一次对话请求，逐段产出生成的文本
+
+    生成器的返回值（StopIteration.value）与 _complete 相同，另含首个 token 到达的时刻 first_token_at
+    """
+    start = time.perf_counter()
+    first_token_at = None
+    parts = []
+    usage = None
+    stream = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": content}
+        ],
+        stream=True
+    )
+    for chunk in stream:
+        # 部分兼容接口会在最后一个数据块中附带用量
+        usage = getattr(chunk, 'usage', None) or usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            parts.append(delta)
+            yield delta
+    return {
+        'content': ''.join(parts),
+        'seconds': round(time.perf_counter() - start, 2),
+        'prompt_tokens': getattr(usage, 'prompt_tokens', None) or 0,
+        'completion_tokens': getattr(usage, 'completion_tokens', None) or 0,
+        'first_token_at': first_token_at,
+    }
+
+
+def summarize_long(api_key: str, text: str = '', segments: Optional[Sequence[TranscriptSegment]] = None,
+                   base_url: str = DEFAULT_BASE_URL, prompt: str = DEFAULT_PROMPT,
+                   model: str = DEFAULT_MODEL, chunk_tokens: int = 3000, max_workers: int = 4) -> Dict:
+    """
+    分块总结长文本：各块并发总结（map），再将各块要点合并为最终总结（reduce）；
+    要点合起来仍超出 chunk_tokens 时逐层合并。内容不超过一块时直接总结
+
+    Args:
+        text: 要总结的文本（没有 segments 时使用）
+        segments: 转写片段，分块与片段边界对齐并标注时间范围
+        chunk_tokens: 每块估计的 token 上限
+        max_workers: 同时进行的请求数上限
+
+    Returns:
+        {'summary', 'mode', 'chunks', 'reduce_rounds', 'usage', 'map_seconds', 'reduce_seconds', 'elapsed'}
+    """
+    for event, data in _summarize_events(api_key, text, segments, base_url, prompt, model,
+                                         chunk_tokens, max_workers, stream=False):
+        if event == 'done':
+            return data
+
+
+def summarize_stream(api_key: str, text: str = '', segments: Optional[Sequence[TranscriptSegment]] = None,
+                     base_url: str = DEFAULT_BASE_URL, prompt: str = DEFAULT_PROMPT,
+                     model: str = DEFAULT_MODEL, chunk_tokens: int = 3000,
+                     max_workers: int = 4) -> Iterator[Tuple[str, Dict]]:
+    """
+    流式总结，参数同 summarize_long；最终总结的请求以流式模式发送，生成的文本边到达边产出
+
+    Yields:
+        (事件, 数据)：
+        plan  - {'mode', 'chunks'} 分块情况
+        chunk - 一个分块总结完成（map 阶段，按完成顺序），数据同 summarize_long 的 chunks 各项
+        delta - {'content'} 最终总结的一段文本
+        done  - 同 summarize_long 的返回值，另含 first_token_seconds（从开始到首个 token 的秒数）
+    """
+    return _summarize_events(api_key, text, segments, base_url, prompt, model,
+                             chunk_tokens, max_workers, stream=True)
+
+
+def _summarize_events(api_key: str, text: str, segments: Optional[Sequence[TranscriptSegment]],
+                      base_url: str, prompt: str, model: str, chunk_tokens: int, max_workers: int,
+                      stream: bool) -> Iterator[Tuple[str, Dict]]:
+    """summarize_long 与 summarize_stream 的共同实现，stream 为 True 时最终请求以流式发送"""
+    start = time.perf_counter()
+    chunks = chunk_segments(segments, chunk_tokens) if segments else chunk_text(text, chunk_tokens)
+    client = OpenAI(base_url=base_url, api_key=api_key)
+    calls = []
+
+    def final_request(content: str) -> Iterator[Tuple[str, Dict]]:
+        if not stream:
+            return _complete(client, model, content)
+        deltas = _stream_complete(client, model, content)
+        while True:
+            try:
+                yield 'delta', {'content': next(deltas)}
+            except StopIteration as finished:
+                return finished.value
+
+    if len(chunks) <= 1:
+        yield 'plan', {'mode': 'single', 'chunks': len(chunks)}
+        # 内容不超过一块时直接发送原文
+        content = text or (chunks[0]['text'] if chunks else '')
+        result = yield from final_request(f"{prompt}\n\n{content}")
+        calls.append(result)
+        yield 'done', _build_result(result['content'], 'single', [], 0, calls, result['seconds'], 0.0, start,
+                                   result.get('first_token_at'))
+        return
+
+    yield 'plan', {'mode': 'map_reduce', 'chunks': len(chunks)}
+
+    def summarize_chunk(index: int) -> Dict:
+        chunk = chunks[index]
+        span = ''
+        if chunk['start'] is not None:
+            span = f"（{_format_time(chunk['start'])} - {_format_time(chunk['end'])}）"
+        instruction = CHUNK_PROMPT.format(index=index + 1, total=len(chunks), span=span, prompt=prompt)
+        return _complete(client, model, f"{instruction}\n\n{chunk['text']}")
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='summarize') as executor:
+        map_start = time.perf_counter()
+        futures = {executor.submit(summarize_chunk, index): index for index in range(len(chunks))}
+        results: List[Optional[Dict]] = [None] * len(chunks)
+        chunk_info: List[Optional[Dict]] = [None] * len(chunks)
+        for future in as_completed(futures):
+            index = futures[future]
+            result = results[index] = future.result()
+            chunk = chunks[index]
+            chunk_info[index] = {
+                'index': index,
+                'start': chunk['start'],
+                'end': chunk['end'],
+                'estimated_tokens': chunk['tokens'],
+                'seconds': result['seconds'],
+                'prompt_tokens': result['prompt_tokens'],
+                'completion_tokens': result['completion_tokens'],
+            }
+            yield 'chunk', chunk_info[index]
+        map_seconds = time.perf_counter() - map_start
+        calls.extend(results)
+
+        # 合并：要点过多时先分组并发合并，直到能放进一次请求
+        reduce_start = time.perf_counter()
+        instruction = REDUCE_PROMPT.format(prompt=prompt)
+        partials = [result['content'] for result in results]
+        rounds = 0
+        while True:
+            rounds += 1
+            groups = _group_partials(partials, chunk_tokens)
+            if len(groups) == 1:
+                break
+            reduced = list(executor.map(
+                lambda group: _complete(client, model, f"{instruction}\n\n" + '\n\n'.join(group)), groups))
+            calls.extend(reduced)
+            partials = [result['content'] for result in reduced]
+
+        result = yield from final_request(f"{instruction}\n\n" + '\n\n'.join(groups[0]))
+        calls.append(result)
+        reduce_seconds = time.perf_counter() - reduce_start
+
+    yield 'done', _build_result(result['content'], 'map_reduce', chunk_info, rounds, calls, map_seconds,
+                               reduce_seconds, start, result.get('first_token_at'))
+
+
+def _group_partials(partials: List[str], max_tokens: int) -> List[List[str]]:
+    """将各块要点分组，每组估计不超过 max_tokens；每组至少两项，保证每轮合并都能减少数量"""
+    groups = [[]]
+    tokens = 0
+    for partial in partials:
+        partial_tokens = estimate_tokens(partial)
+        if len(groups[-1]) >= 2 and tokens + partial_tokens > max_tokens:
+            groups.append([])
+            tokens = 0
+        groups[-1].append(partial)
+        tokens += partial_tokens
+    if len(groups) > 1 and len(groups[-1]) == 1:
+        groups[-2].extend(groups.pop())
+    return groups
+
+
+def _build_result(summary: str, mode: str, chunks: List[Dict], rounds: int, calls: List[Dict],
+                  map_seconds: float, reduce_seconds: float, start: float,
+                  first_token_at: Optional[float] = None) -> Dict:
+    prompt_tokens = sum(call['prompt_tokens'] for call in calls)
+    completion_tokens = sum(call['completion_tokens'] for call in calls)
+    return {
+        'summary': summary,
+        'mode': mode,
+        'chunks': chunks,
+        'reduce_rounds': rounds,
+        'usage': {
+            'requests': len(calls),
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+        },
+        'map_seconds': round(map_seconds, 2),
+        'reduce_seconds': round(reduce_seconds, 2),
+        'first_token_seconds': round(first_token_at - start, 2) if first_token_at is not None else None,
+        'elapsed': round(time.perf_counter() - start, 2),
+    }
@@ -0,0 +1,151 @@
+# backend/summary_cache.py
+"""
+AI 总结持久化缓存模块
+以 文本 + 总结要求 + 模型 + 接口地址 的哈希为键，将总结结果保存在本地 SQLite 中，
+相同内容再次总结时直接返回，无需再次调用接口
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class SummaryCache:
+    """总结结果缓存（线程安全）"""
+
+    # 每写入多少次做一次淘汰；估计的条目数超出容量时立即淘汰
+    EVICT_INTERVAL = 200
+    # 超出容量时淘汰到容量的该比例，留出余量，避免缓存满后每次写入都触发淘汰
+    EVICT_TARGET_RATIO = 0.9
+
+    def __init__(self, db_path: str, ttl: float = 30 * 24 * 3600, max_entries: int = 5000):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite 数据库文件路径
+            ttl: 缓存有效期（秒），小于等于 0 表示永不过期
+            max_entries: 最大缓存条目数，超出后按最近访问时间淘汰，小于等于 0 表示不限制
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS summaries (
+                cache_key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_summaries_accessed ON summaries(accessed_at)'
+        )
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_summaries_created ON summaries(created_at)'
+        )
+        self._conn.commit()
+
+        # 条目数估计值：每次写入加一（覆盖已有条目时偏大），淘汰时校正
+        self._estimated_count = self._conn.execute('SELECT COUNT(*) FROM summaries').fetchone()[0]
+        self._puts_since_evict = 0
+
+    @staticmethod
+    def make_key(text: str, prompt: str, model: str, base_url: str) -> str:
+        """由文本、总结要求、模型与接口地址生成缓存键"""
+        payload = json.dumps([text, prompt, model, base_url], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - created_at > self.ttl
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        """读取缓存，未命中或已过期时返回 None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data, created_at FROM summaries WHERE cache_key = ?', (cache_key,)
+            ).fetchone()
+
+            if row is None or self._is_expired(row[1], now):
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                'UPDATE summaries SET accessed_at = ? WHERE cache_key = ?', (now, cache_key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, cache_key: str, result: Dict):
+        """写入缓存，每 EVICT_INTERVAL 次写入或估计超出容量时淘汰过期与最久未访问的条目"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO summaries (cache_key, data, created_at, accessed_at) '
+                'VALUES (?, ?, ?, ?)',
+                (cache_key, json.dumps(result, ensure_ascii=False), now, now)
+            )
+            self._estimated_count += 1
+            self._puts_since_evict += 1
+            if (self._puts_since_evict >= self.EVICT_INTERVAL
+                    or 0 < self.max_entries < self._estimated_count):
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """淘汰过期条目和超出容量的条目，并校正条目数估计值（调用方需持有锁）"""
+        if self.ttl > 0:
+            cursor = self._conn.execute(
+                'DELETE FROM summaries WHERE created_at < ?', (time.time() - self.ttl,)
+            )
+            self.evictions += cursor.rowcount
+
+        count = self._conn.execute('SELECT COUNT(*) FROM summaries').fetchone()[0]
+        if 0 < self.max_entries < count:
+            overflow = count - int(self.max_entries * self.EVICT_TARGET_RATIO)
+            cursor = self._conn.execute(
+                'DELETE FROM summaries WHERE cache_key IN ('
+                'SELECT cache_key FROM summaries ORDER BY accessed_at ASC LIMIT ?)',
+                (overflow,)
+            )
+            self.evictions += cursor.rowcount
+            count -= cursor.rowcount
+
+        self._estimated_count = count
+        self._puts_since_evict = 0
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute('DELETE FROM summaries')
+            self._conn.commit()
+            self._estimated_count = 0
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计信息"""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM summaries').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,233 @@
+# backend/transcribe_batch.py
+"""
+批量转写模块
+一个批次包含多个音频，按同一条流水线处理：解码线程提前解码下一个文件，
+推理线程同时转写当前文件，解码与推理重叠执行；多个批次依次运行
+"""
+import queue
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+
+class BatchItem:
+    """批次中的一个音频"""
+
+    def __init__(self, bvid: str, audio_file: str):
+        self.bvid = bvid
+        self.audio_file = audio_file
+        self.state = 'queued'  # queued / decoded / transcribing / done / cached / error / cancelled
+        self.audio_seconds = 0.0
+        self.decode_seconds = 0.0
+        self.transcribe_seconds = 0.0
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'bvid': self.bvid,
+            'state': self.state,
+            'audio_seconds': round(self.audio_seconds, 1),
+            'decode_seconds': round(self.decode_seconds, 2),
+            'transcribe_seconds': round(self.transcribe_seconds, 2),
+            'error': self.error,
+        }
+
+
+class TranscribeBatch:
+    """一个批量转写任务"""
+
+    def __init__(self, batch_id: str, items: List[BatchItem], engine: str, model_size: str,
+                 formats: List[str]):
+        self.batch_id = batch_id
+        self.items = items
+        self.engine = engine
+        self.model_size = model_size
+        self.formats = formats
+        self.state = 'queued'  # queued / running / completed / cancelled
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.decode_wait_seconds = 0.0  # 推理线程等待解码的总时间，越小说明流水线越饱和
+        self.cancel_event = threading.Event()
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def to_dict(self, include_items: bool = True) -> Dict:
+        states = [item.state for item in self.items]
+        audio_seconds = sum(item.audio_seconds for item in self.items if item.state == 'done')
+        elapsed = self.elapsed
+        data = {
+            'batch_id': self.batch_id,
+            'state': self.state,
+            'engine': self.engine,
+            'model': self.model_size,
+            'formats': self.formats,
+            'total': len(self.items),
+            'completed': states.count('done'),
+            'cached': states.count('cached'),
+            'failed': states.count('error'),
+            'pending': sum(states.count(s) for s in ('queued', 'decoded', 'transcribing')),
+            'current': next((item.bvid for item in self.items if item.state == 'transcribing'), None),
+            'audio_hours': round(audio_seconds / 3600, 3),
+            'wall_hours': round(elapsed / 3600, 3),
+            # 吞吐量：每小时墙钟时间转写的音频小时数
+            'audio_hours_per_hour': round(audio_seconds / elapsed, 2) if elapsed else 0.0,
+            'decode_seconds': round(sum(item.decode_seconds for item in self.items), 1),
+            'transcribe_seconds': round(sum(item.transcribe_seconds for item in self.items), 1),
+            'decode_wait_seconds': round(self.decode_wait_seconds, 1),
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if include_items:
+            data['items'] = [item.to_dict() for item in self.items]
+        return data
+
+
+class BatchTranscriber:
+    """批量转写执行器（线程安全），批次排队后由一个工作线程依次执行"""
+
+    def __init__(self, prepare: Callable[[TranscribeBatch, BatchItem], object],
+                 process: Callable[[TranscribeBatch, BatchItem, object], float],
+                 prefetch: int = 1,
+                 on_update: Optional[Callable[[TranscribeBatch], None]] = None):
+        """
+        Args:
+            prepare: 在解码线程中执行，返回解码好的音频；返回 None 表示无需转写（如命中缓存）
+            process: 在推理线程中转写 prepare 的结果，返回音频时长（秒）
+            prefetch: 提前解码的文件数，内存中最多同时存在 prefetch + 1 份解码后的音频
+            on_update: 批次或条目状态变化时调用
+        """
+        self.prepare = prepare
+        self.process = process
+        self.prefetch = max(1, prefetch)
+        self.on_update = on_update
+        self._batches: Dict[str, TranscribeBatch] = {}
+        self._pending = queue.Queue()
+        self._lock = threading.Lock()
+
+        thread = threading.Thread(target=self._worker, name='transcribe-batch')
+        thread.daemon = True
+        thread.start()
+
+    def submit(self, items: List[BatchItem], engine: str, model_size: str,
+               formats: List[str]) -> TranscribeBatch:
+        """新建批次并排队"""
+        batch = TranscribeBatch(uuid.uuid4().hex[:12], items, engine, model_size, formats)
+        with self._lock:
+            self._batches[batch.batch_id] = batch
+        self._pending.put(batch)
+        self._notify(batch)
+        return batch
+
+    def get(self, batch_id: str) -> Optional[TranscribeBatch]:
+        with self._lock:
+            return self._batches.get(batch_id)
+
+    def list(self) -> List[TranscribeBatch]:
+        """按创建时间倒序排列的批次"""
+        with self._lock:
+            batches = list(self._batches.values())
+        return sorted(batches, key=lambda b: b.created_at, reverse=True)
+
+    def cancel(self, batch_id: str) -> bool:
+        """取消批次：正在转写的文件完成后停止，其余条目标记为已取消"""
+        batch = self.get(batch_id)
+        if batch is None or batch.state not in ('queued', 'running'):
+            return False
+        batch.cancel_event.set()
+        return True
+
+    def _notify(self, batch: TranscribeBatch):
+        if self.on_update:
+            try:
+                self.on_update(batch)
+            except Exception as e:
+                print(f"批量转写状态回调异常: {e}")
+
+    def _worker(self):
+        while True:
+            batch = self._pending.get()
+            if not batch.cancel_event.is_set():
+                self._run(batch)
+            self._finish(batch)
+
+    def _run(self, batch: TranscribeBatch):
+        batch.state = 'running'
+        batch.started_at = time.time()
+        self._notify(batch)
+
+        decoded = queue.Queue(maxsize=self.prefetch)
+        decoder = threading.Thread(target=self._decode_all, args=(batch, decoded),
+                                   name=f'transcribe-batch-decode-{batch.batch_id}')
+        decoder.daemon = True
+        decoder.start()
+
+        while True:
+            wait_start = time.perf_counter()
+            entry = decoded.get()
+            batch.decode_wait_seconds += time.perf_counter() - wait_start
+            if entry is None:
+                break
+
+            item, audio = entry
+            entry = None
+            if batch.cancel_event.is_set():
+                item.state = 'cancelled'
+                continue
+
+            item.state = 'transcribing'
+            self._notify(batch)
+            start = time.perf_counter()
+            try:
+                item.audio_seconds = self.process(batch, item, audio)
+                item.state = 'done'
+            except Exception as e:
+                item.state = 'error'
+                item.error = str(e)
+            item.transcribe_seconds = time.perf_counter() - start
+            # 释放本文件的音频，内存中只保留预解码的下一个文件
+            audio = None
+            self._notify(batch)
+
+        decoder.join()
+
+    def _decode_all(self, batch: TranscribeBatch, decoded: queue.Queue):
+        """解码线程：依次准备各文件，队列满时等待推理线程取走"""
+        try:
+            for item in batch.items:
+                if batch.cancel_event.is_set():
+                    break
+                start = time.perf_counter()
+                try:
+                    audio = self.prepare(batch, item)
+                except Exception as e:
+                    item.state = 'error'
+                    item.error = str(e)
+                    audio = None
+                item.decode_seconds = time.perf_counter() - start
+
+                if audio is None:
+                    if item.state == 'queued':
+                        item.state = 'cached'
+                    self._notify(batch)
+                    continue
+
+                item.state = 'decoded'
+                decoded.put((item, audio))
+                audio = None
+        finally:
+            decoded.put(None)
+
+    def _finish(self, batch: TranscribeBatch):
+        for item in batch.items:
+            if item.state in ('queued', 'decoded'):
+                item.state = 'cancelled'
+        batch.state = 'cancelled' if batch.cancel_event.is_set() else 'completed'
+        batch.finished_at = time.time()
+        self._notify(batch)
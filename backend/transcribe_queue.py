@@ -0,0 +1,172 @@
+# backend/transcribe_queue.py
+"""
+转写任务队列
+固定数量的工作线程依次执行转写任务，每个工作线程持有自己的转写器，
+队列有容量上限，满时拒绝新任务而不是无限堆积
+"""
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+
+class TranscribeQueueFull(Exception):
+    """转写队列已满"""
+
+
+class TranscribeJob:
+    """一个排队或执行中的转写任务"""
+
+    def __init__(self, task_id: str, bvid: str, audio_file: str, output_formats: List[str],
+                 engine: Optional[str] = None, model_size: Optional[str] = None):
+        self.task_id = task_id
+        self.bvid = bvid
+        self.audio_file = audio_file
+        self.output_formats = output_formats
+        self.engine = engine
+        self.model_size = model_size
+        self.state = 'queued'  # queued / running / done
+        self.finished = threading.Event()  # 执行结束时设置
+        self.external = False  # 由队列以外执行（如批量转写），只登记、不排队
+
+
+class TranscribeQueue:
+    """转写工作池（线程安全）"""
+
+    def __init__(self, runner: Callable[[TranscribeJob, object], None],
+                 transcriber_factory: Callable[[Optional[str], Optional[str]], object],
+                 workers: int = 1, max_queue: int = 20, keep_finished: int = 500):
+        """
+        Args:
+            runner: 执行单个任务的函数，接收 (任务, 该工作线程的转写器)
+            transcriber_factory: 按 (引擎, 模型大小) 创建转写器的函数，每个工作线程对每种组合调用一次
+            workers: 工作线程数，即同时执行的转写数
+            max_queue: 排队任务数上限
+            keep_finished: 保留的已结束任务数，超出后移除最早结束的
+        """
+        self.runner = runner
+        self.transcriber_factory = transcriber_factory
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._queue = deque()
+        self._jobs: Dict[str, TranscribeJob] = {}
+        self._finished = deque(maxlen=max(1, keep_finished))
+        self._running = 0
+        self._cond = threading.Condition()
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f'transcribe-{i}')
+            thread.daemon = True
+            thread.start()
+
+    def submit(self, task_id: str, bvid: str, audio_file: str,
+               output_formats: List[str], engine: Optional[str] = None,
+               model_size: Optional[str] = None) -> Optional[TranscribeJob]:
+        """
+        加入队列
+
+        Returns:
+            新任务；同一任务已在排队或执行中时返回 None
+
+        Raises:
+            TranscribeQueueFull: 排队任务数已达上限
+        """
+        with self._cond:
+            existing = self._jobs.get(task_id)
+            if existing is not None and existing.state in ('queued', 'running'):
+                return None
+            if len(self._queue) >= self.max_queue:
+                raise TranscribeQueueFull(f"转写队列已满（{self.max_queue}）")
+
+            job = TranscribeJob(task_id, bvid, audio_file, output_formats, engine, model_size)
+            self._jobs[task_id] = job
+            self._queue.append(job)
+            self._cond.notify()
+            return job
+
+    def reserve(self, task_id: str, bvid: str, audio_file: str,
+                output_formats: List[str], engine: Optional[str] = None,
+                model_size: Optional[str] = None) -> Optional[TranscribeJob]:
+        """
+        登记一个在队列以外执行的任务，登记期间同一任务不能再加入队列，执行结束后调用 release
+
+        Returns:
+            登记的任务；同一任务已在排队或执行中时返回 None
+        """
+        with self._cond:
+            existing = self._jobs.get(task_id)
+            if existing is not None and existing.state in ('queued', 'running'):
+                return None
+
+            job = TranscribeJob(task_id, bvid, audio_file, output_formats, engine, model_size)
+            job.external = True
+            self._jobs[task_id] = job
+            return job
+
+    def release(self, task_id: str):
+        """结束 reserve 登记的任务"""
+        with self._cond:
+            job = self._jobs.get(task_id)
+            if job is None or not job.external or job.state == 'done':
+                return
+            self._mark_finished(job)
+        job.finished.set()
+
+    def is_active(self, task_id: str) -> bool:
+        """任务是否在排队或执行中"""
+        with self._cond:
+            job = self._jobs.get(task_id)
+            return job is not None and job.state in ('queued', 'running')
+
+    def get_job(self, task_id: str) -> Optional[TranscribeJob]:
+        with self._cond:
+            return self._jobs.get(task_id)
+
+    def queue_position(self, task_id: str) -> Optional[int]:
+        """排队位置（从 1 开始），不在队列中时返回 None"""
+        with self._cond:
+            for i, job in enumerate(self._queue, 1):
+                if job.task_id == task_id:
+                    return i
+        return None
+
+    def _worker(self):
+        transcribers = {}  # (引擎, 模型大小) -> 本线程的转写器
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                job = self._queue.popleft()
+                job.state = 'running'
+                self._running += 1
+
+            try:
+                key = (job.engine, job.model_size)
+                if key not in transcribers:
+                    transcribers[key] = self.transcriber_factory(job.engine, job.model_size)
+                self.runner(job, transcribers[key])
+            except Exception as e:
+                print(f"转写任务 {job.task_id} 异常: {e}")
+            finally:
+                with self._cond:
+                    self._mark_finished(job)
+                    self._running -= 1
+                job.finished.set()
+
+    def _mark_finished(self, job: TranscribeJob):
+        """标记任务结束，并移除超出保留数量的已结束任务（调用方需持有锁）"""
+        job.state = 'done'
+        if len(self._finished) == self._finished.maxlen:
+            oldest = self._finished[0]
+            # 同一任务 ID 可能已重新提交，只移除仍是该已结束任务的条目
+            if self._jobs.get(oldest.task_id) is oldest:
+                del self._jobs[oldest.task_id]
+        self._finished.append(job)
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'running': self._running,
+                'queued': len(self._queue),
+                'max_queue': self.max_queue,
+            }
@@ -1,14 +1,25 @@
 # backend/transcriber.py
 """
 音频转写模块
-支持：分段输出、时间戳、多种输出格式
+支持：分段输出、时间戳、多种输出格式、可切换的推理引擎
 """
 
 import os
 import json
+import shutil
+import subprocess
+import tempfile
+import multiprocessing
+import numpy as np
 import whisper
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass, asdict
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, ContextManager, Iterable, Iterator, Tuple
+from model_manager import ModelManager
+
+# Whisper 输入采样率
+SAMPLE_RATE = 16000
 
 
 @dataclass
@@ -97,6 +108,22 @@ class TranscriptResult:
         }
         return json.dumps(data, ensure_ascii=False, indent=2)
 
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TranscriptResult':
+        """从 to_json() 输出的结构还原"""
+        return cls(
+            text=data["text"],
+            segments=[TranscriptSegment(start=seg["start"], end=seg["end"], text=seg["text"])
+                      for seg in data.get("segments", [])],
+            language=data.get("language"),
+            duration=data.get("duration", 0.0)
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> 'TranscriptResult':
+        """从 JSON 文本还原"""
+        return cls.from_dict(json.loads(text))
+
     def get_segments_by_time(self, start: float, end: float) -> List[TranscriptSegment]:
         """获取指定时间范围内的片段"""
         return [seg for seg in self.segments if seg.start >= start and seg.end <= end]
@@ -149,6 +176,230 @@ class TranscriptResult:
         return f"{hours:02d}:{minutes:02d}:{secs:02d}.{ms:03d}"
 
 
+class TranscriptStream:
+    """
+    流式转写结果
+    迭代时随解码进度逐段产出 TranscriptSegment，迭代结束后用 result() 取得完整结果
+    """
+
+    def __init__(self, duration: float, language: Optional[str]):
+        self.duration = duration
+        self.language = language  # 检测到语言后由转写过程更新
+        self.segments: List[TranscriptSegment] = []
+        self.texts: List[str] = []  # 各片段未去除空白的原始文本，拼接即为完整文本
+        self.finished = False
+        self._source: Optional[Iterator[Tuple[TranscriptSegment, str]]] = None
+
+    @property
+    def progress(self) -> float:
+        """已转写比例（0~1），按最后一个片段的结束时间与总时长推算"""
+        if self.finished:
+            return 1.0
+        if not self.segments or not self.duration:
+            return 0.0
+        return min(1.0, self.segments[-1].end / self.duration)
+
+    def __iter__(self) -> Iterator[TranscriptSegment]:
+        for segment, raw_text in self._source:
+            self.segments.append(segment)
+            self.texts.append(raw_text)
+            yield segment
+        self.finished = True
+
+    def close(self):
+        """提前结束转写，释放音频"""
+        self._source.close()
+
+    def result(self) -> TranscriptResult:
+        """读完剩余片段并返回完整结果"""
+        for _ in self:
+            pass
+        return TranscriptResult(
+            text="".join(self.texts).strip(),
+            segments=list(self.segments),
+            language=self.language,
+            duration=self.duration
+        )
+
+
+class TranscriptWriter:
+    """
+    边转写边写出各格式文件
+    写入过程中文件名带 .part 后缀，转写完成后改为正式文件名，未完成的结果不会被当作转写稿读取
+    """
+
+    FILE_SUFFIXES = {
+        "txt": ".txt",
+        "timestamped": "_timestamped.txt",
+        "srt": ".srt",
+        "vtt": ".vtt",
+        "json": ".json",
+    }
+
+    # 各格式对应的 TranscriptResult 输出方法
+    FORMATTERS = {
+        "txt": "to_plain_text",
+        "timestamped": "to_timestamped_text",
+        "srt": "to_srt",
+        "vtt": "to_vtt",
+        "json": "to_json",
+    }
+
+    @classmethod
+    def save(cls, result: TranscriptResult, output_dir: str, base_name: str,
+             formats: List[str], overwrite: bool = False) -> dict:
+        """
+        把已有的完整结果写成各格式文件
+
+        Args:
+            overwrite: 为 False 时已存在的文件不重写
+
+        Returns:
+            包含各格式文件路径的字典
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        saved_files = {}
+        for fmt, suffix in cls.FILE_SUFFIXES.items():
+            if fmt not in formats:
+                continue
+            path = os.path.join(output_dir, base_name + suffix)
+            if overwrite or not os.path.exists(path):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(getattr(result, cls.FORMATTERS[fmt])())
+            saved_files[fmt] = path
+        return saved_files
+
+    def __init__(self, output_dir: str, base_name: str, formats: List[str]):
+        os.makedirs(output_dir, exist_ok=True)
+        self.paths = {
+            fmt: os.path.join(output_dir, base_name + suffix)
+            for fmt, suffix in self.FILE_SUFFIXES.items() if fmt in formats
+        }
+        # JSON 需要完整结果，结束时一次写出
+        self._files = {
+            fmt: open(path + ".part", "w", encoding="utf-8")
+            for fmt, path in self.paths.items() if fmt != "json"
+        }
+        self._count = 0
+        self._pending_space = ""  # 纯文本末尾暂缓写出的空白，保证与完整文本一致
+        if "vtt" in self._files:
+            self._files["vtt"].write("WEBVTT\n")
+
+    def write(self, segment: TranscriptSegment, raw_text: str):
+        """追加一个片段，格式与 TranscriptResult 的各 to_* 方法一致"""
+        self._count += 1
+        first = self._count == 1
+        separator = "" if first else "\n"
+        files = self._files
+
+        if "txt" in files:
+            text = self._pending_space + raw_text
+            if first:
+                text = text.lstrip()
+            stripped = text.rstrip()
+            self._pending_space = text[len(stripped):]
+            files["txt"].write(stripped)
+
+        if "timestamped" in files:
+            files["timestamped"].write(
+                f"{separator}[{segment.start_formatted} -> {segment.end_formatted}] {segment.text}")
+
+        if "srt" in files:
+            start_srt = TranscriptResult._to_srt_time(segment.start)
+            end_srt = TranscriptResult._to_srt_time(segment.end)
+            files["srt"].write(f"{separator}{self._count}\n{start_srt} --> {end_srt}\n"
+                               f"{segment.text.strip()}\n")
+
+        if "vtt" in files:
+            start_vtt = TranscriptResult._to_vtt_time(segment.start)
+            end_vtt = TranscriptResult._to_vtt_time(segment.end)
+            files["vtt"].write(f"\n{start_vtt} --> {end_vtt}\n{segment.text.strip()}\n")
+
+        # 及时落盘，转写中途即可查看已完成的部分
+        for f in files.values():
+            f.flush()
+
+    def finish(self, result: TranscriptResult) -> dict:
+        """写出 JSON 并将临时文件改为正式文件名，返回各格式的文件路径"""
+        for f in self._files.values():
+            f.close()
+        for fmt, path in self.paths.items():
+            if fmt == "json":
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(result.to_json())
+            else:
+                os.replace(path + ".part", path)
+        return dict(self.paths)
+
+    def discard(self):
+        """转写失败时删除临时文件"""
+        for fmt, f in self._files.items():
+            f.close()
+            part_path = self.paths[fmt] + ".part"
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+
+# ========== 推理引擎 ==========
+# openai: openai-whisper（PyTorch，fp32）
+# faster: faster-whisper（CTranslate2，CPU 上可用 int8 量化，需 pip install faster-whisper）
+ENGINES = ("openai", "faster")
+
+# faster-whisper 不接受的 openai-whisper 参数
+_FASTER_UNSUPPORTED_KWARGS = {"verbose", "fp16"}
+
+
+def load_engine_model(engine: str, model_size: str, compute_type: str = "int8",
+                      cpu_threads: int = 0):
+    """加载指定引擎的模型"""
+    if engine == "openai":
+        return whisper.load_model(model_size)
+    if engine == "faster":
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("faster-whisper 未安装，请运行: pip install faster-whisper")
+        return WhisperModel(model_size, device="cpu", compute_type=compute_type,
+                            cpu_threads=cpu_threads)
+    raise ValueError(f"未知的转写引擎: {engine}，可选: {', '.join(ENGINES)}")
+
+
+def iter_engine(engine: str, model, audio: np.ndarray,
+                transcribe_kwargs: dict) -> Tuple[Optional[str], Iterable[dict]]:
+    """
+    用指定引擎转写，片段按解码顺序产出
+
+    faster-whisper 边解码边产出片段；openai-whisper 没有流式接口，整段解码完成后一次返回
+
+    Returns:
+        (语言, 片段迭代器 [{"start", "end", "text"}, ...])
+    """
+    if engine == "faster":
+        kwargs = {k: v for k, v in transcribe_kwargs.items() if k not in _FASTER_UNSUPPORTED_KWARGS}
+        segments_iter, info = model.transcribe(audio, **kwargs)
+        return info.language, ({"start": seg.start, "end": seg.end, "text": seg.text} for seg in segments_iter)
+    result = model.transcribe(audio, **transcribe_kwargs)
+    return result.get("language"), result.get("segments", [])
+
+
+def run_engine(engine: str, model, audio: np.ndarray, transcribe_kwargs: dict) -> dict:
+    """
+    用指定引擎转写，结果统一为 openai-whisper 的格式
+
+    Returns:
+        {"text": 完整文本, "segments": [{"start", "end", "text"}, ...], "language": 语言}
+    """
+    if engine == "faster":
+        language, segments_iter = iter_engine(engine, model, audio, transcribe_kwargs)
+        segments = list(segments_iter)
+        return {
+            "text": "".join(seg["text"] for seg in segments),
+            "segments": segments,
+            "language": language
+        }
+    return model.transcribe(audio, **transcribe_kwargs)
+
+
 class WhisperTranscriber:
     """Whisper 转写器"""
 
@@ -164,25 +415,60 @@ class WhisperTranscriber:
     # 简体中文引导提示词
     SIMPLIFIED_CHINESE_PROMPT = "以下是普通话的句子，请使用简体中文输出。"
 
-    def __init__(self, model_size: str = "medium"):
+    # openai 引擎分段转写时，取上一段结尾作为下一段提示词的字符数
+    PROMPT_CONTEXT_CHARS = 100
+
+    def __init__(self, model_size: str = "medium", mmap_threshold: float = 0,
+                 mmap_dir: Optional[str] = None, chunk_workers: int = 0,
+                 long_audio_threshold: float = 1800, chunk_seconds: float = 300,
+                 engine: str = "openai", compute_type: str = "int8", stream_seconds: float = 60,
+                 model_manager: Optional[ModelManager] = None):
         """
         初始化转写器
 
         Args:
             model_size: 模型大小 (tiny, base, small, medium, large)
+            engine: 推理引擎 (openai, faster)
+            compute_type: faster 引擎的计算精度 (int8, int8_float32, float32 ...)
+            mmap_threshold: 音频时长超过该值（秒）时将解码后的 PCM 写入磁盘并内存映射，0 表示不启用
+            mmap_dir: 内存映射文件目录，默认系统临时目录
+            chunk_workers: 长音频分段并行转写的进程数，小于 2 时不启用（每个进程各加载一份模型）
+            long_audio_threshold: 音频时长超过该值（秒）时启用分段并行转写
+            chunk_seconds: 分段的目标长度（秒），实际切点落在附近最安静的位置
+            stream_seconds: openai 引擎没有流式接口，按该长度（秒）在静音处切成小段依次转写，
+                            每段完成即产出结果；0 表示整段一次转写
+            model_manager: 模型池，提供时从池中借用模型（多个转写器共享、可预加载），否则由本实例懒加载
         """
+        if engine not in ENGINES:
+            raise ValueError(f"未知的转写引擎: {engine}，可选: {', '.join(ENGINES)}")
         self.model_size = model_size
+        self.engine = engine
+        self.compute_type = compute_type
         self.model = None
+        self.mmap_threshold = mmap_threshold
+        self.mmap_dir = mmap_dir
+        self.chunk_workers = chunk_workers
+        self.long_audio_threshold = long_audio_threshold
+        self.chunk_seconds = chunk_seconds
+        self.stream_seconds = stream_seconds
+        self.model_manager = model_manager
+        self._chunk_pool: Optional[ProcessPoolExecutor] = None
         self._progress_callback: Optional[Callable] = None
 
     def load_model(self):
         """加载 Whisper 模型"""
         if self.model is None:
-            print(f"[Transcriber] Loading Whisper model ({self.model_size})...")
-            self.model = whisper.load_model(self.model_size)
+            print(f"[Transcriber] Loading Whisper model ({self.model_size}, {self.engine})...")
+            self.model = load_engine_model(self.engine, self.model_size, self.compute_type)
             print(f"[Transcriber] Model loaded!")
         return self.model
 
+    def _use_model(self) -> ContextManager:
+        """借用模型：有模型池时从池中借出，用完归还；否则使用本实例懒加载的模型"""
+        if self.model_manager is not None:
+            return self.model_manager.acquire(self.engine, self.model_size)
+        return nullcontext(self.load_model())
+
     def set_progress_callback(self, callback: Callable[[str, float], None]):
         """
         设置进度回调函数
@@ -192,28 +478,85 @@ class WhisperTranscriber:
         """
         self._progress_callback = callback
 
-    def _report_progress(self, message: str, progress: float):
-        """报告进度"""
-        if self._progress_callback:
-            self._progress_callback(message, progress)
+    def _report_progress(self, message: str, progress: float,
+                         callback: Optional[Callable[[str, float], None]] = None):
+        """报告进度（优先使用本次调用传入的回调）"""
+        callback = callback or self._progress_callback
+        if callback:
+            callback(message, progress)
         print(f"[Transcriber] {message} ({progress:.1f}%)")
 
+    @staticmethod
+    def probe_duration(audio_path: str) -> Optional[float]:
+        """用 ffprobe 读取容器中的时长（秒），无需解码；失败时返回 None"""
+        if not shutil.which("ffprobe"):
+            return None
+        try:
+            output = subprocess.run(
+                ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+                 "-of", "default=noprint_wrappers=1:nokey=1", audio_path],
+                capture_output=True, text=True, timeout=30, check=True
+            ).stdout.strip()
+            return float(output)
+        except (subprocess.SubprocessError, ValueError):
+            return None
+
     def get_audio_duration(self, audio_path: str) -> float:
-        """获取音频时长（秒）"""
+        """获取音频时长（秒），优先读取元数据，不可用时才完整解码"""
+        duration = self.probe_duration(audio_path)
+        if duration is not None:
+            return duration
         audio = whisper.load_audio(audio_path)
-        return len(audio) / 16000  # Whisper 采样率 16kHz
+        return len(audio) / SAMPLE_RATE
 
-    def transcribe(
+    def load_audio(self, audio_path: str) -> np.ndarray:
+        """
+        解码音频为 16kHz 单声道 float32，整个转写过程只解码这一次
+
+        时长超过 mmap_threshold 时解码到磁盘文件并以内存映射方式返回，
+        避免长音频在内存中常驻一份完整的 PCM 数组
+        """
+        if self.mmap_threshold > 0:
+            duration = self.probe_duration(audio_path)
+            if duration is not None and duration > self.mmap_threshold:
+                return self._load_audio_mmap(audio_path)
+        return whisper.load_audio(audio_path, sr=SAMPLE_RATE)
+
+    def _load_audio_mmap(self, audio_path: str) -> np.ndarray:
+        """用 ffmpeg 解码为 f32le 文件并内存映射"""
+        fd, pcm_path = tempfile.mkstemp(suffix=".pcm", dir=self.mmap_dir)
+        os.close(fd)
+        try:
+            subprocess.run(
+                ["ffmpeg", "-nostdin", "-threads", "0", "-y", "-i", audio_path,
+                 "-f", "f32le", "-ac", "1", "-ar", str(SAMPLE_RATE), pcm_path],
+                capture_output=True, check=True
+            )
+            # 写时复制映射：模型可以正常读取，数据按需从磁盘换入
+            audio = np.memmap(pcm_path, dtype=np.float32, mode="c")
+        except subprocess.CalledProcessError as e:
+            os.remove(pcm_path)
+            raise RuntimeError(f"音频解码失败: {e.stderr.decode(errors='ignore')}") from e
+
+        # POSIX 下映射建立后即可删除目录项，文件在映射释放时由系统回收；
+        # 其他系统在转写结束后删除
+        if os.name == "posix":
+            os.remove(pcm_path)
+        return audio
+
+    def transcribe_stream(
             self,
             audio_path: str,
             language: str = "zh",
             task: str = "transcribe",
             word_timestamps: bool = False,
             use_simplified_chinese: bool = True,
+            progress_callback: Optional[Callable[[str, float], None]] = None,
+            audio: Optional[np.ndarray] = None,
             **kwargs
-    ) -> TranscriptResult:
+    ) -> TranscriptStream:
         """
-        转写音频文件
+        流式转写音频文件：音频在调用时解码，迭代返回值时逐段转写并产出片段
 
         Args:
             audio_path: 音频文件路径
@@ -221,19 +564,18 @@ class WhisperTranscriber:
             task: "transcribe" 保留原语言，"translate" 翻译成英文
             word_timestamps: 是否输出词级时间戳
             use_simplified_chinese: 是否强制使用简体中文（仅对中文有效）
+            progress_callback: 本次转写的进度回调，多个任务共用一个实例时互不干扰
+            audio: 已由 load_audio() 解码好的音频，提供时不再解码（批量转写时解码与推理流水并行）
             **kwargs: 其他 whisper 参数
 
         Returns:
-            TranscriptResult 对象
+            TranscriptStream 对象
         """
-        self._report_progress("正在加载模型...", 0)
-        model = self.load_model()
-
-        self._report_progress("正在分析音频...", 10)
-        duration = self.get_audio_duration(audio_path)
-        self._report_progress(f"音频时长: {duration / 60:.1f} 分钟", 15)
-
-        self._report_progress("正在转写...", 20)
+        if audio is None:
+            self._report_progress("正在解码音频...", 0, progress_callback)
+            audio = self.load_audio(audio_path)
+        duration = len(audio) / SAMPLE_RATE
+        self._report_progress(f"音频时长: {duration / 60:.1f} 分钟", 10, progress_callback)
 
         # 构建转写参数
         transcribe_kwargs = {
@@ -249,43 +591,215 @@ class WhisperTranscriber:
             transcribe_kwargs["initial_prompt"] = self.SIMPLIFIED_CHINESE_PROMPT
             print(f"[Transcriber] 使用简体中文引导提示")
 
-        # 执行转写
-        result = model.transcribe(audio_path, **transcribe_kwargs)
+        stream = TranscriptStream(duration, language)
+        if self.chunk_workers > 1 and duration > self.long_audio_threshold:
+            # 长音频：按静音切分后多进程并行转写，按顺序产出
+            source = self._iter_chunked(audio, transcribe_kwargs, stream, progress_callback)
+        else:
+            source = self._iter_sequential(audio, transcribe_kwargs, stream, progress_callback)
+        stream._source = self._release_audio(source, getattr(audio, "filename", None))
+        return stream
 
-        self._report_progress("正在处理结果...", 90)
+    @staticmethod
+    def _release_audio(source: Iterator, pcm_path: Optional[str]) -> Iterator:
+        """转写结束或提前关闭时释放音频，删除残留的内存映射文件"""
+        try:
+            yield from source
+        finally:
+            source.close()
+            if pcm_path and os.path.exists(pcm_path):
+                os.remove(pcm_path)
+
+    def _iter_sequential(self, audio: np.ndarray, transcribe_kwargs: dict, stream: TranscriptStream,
+                         progress_callback: Optional[Callable] = None
+                         ) -> Iterator[Tuple[TranscriptSegment, str]]:
+        """在当前进程中转写，产出 (片段, 原始文本)"""
+        self._report_progress("正在加载模型...", 15, progress_callback)
+        with self._use_model() as model:
+            self._report_progress("正在转写...", 20, progress_callback)
+            yield from self._iter_windows(model, audio, transcribe_kwargs, stream)
+
+    def _iter_windows(self, model, audio: np.ndarray, transcribe_kwargs: dict,
+                      stream: TranscriptStream) -> Iterator[Tuple[TranscriptSegment, str]]:
+        """用借到的模型按窗口依次转写"""
+        if self.engine == "openai" and self.stream_seconds > 0:
+            points = self.find_split_points(audio, self.stream_seconds)
+        else:
+            # faster 引擎本身边解码边产出片段，整段转写即可
+            points = [0, len(audio)]
+
+        base_prompt = transcribe_kwargs.get("initial_prompt") or ""
+        condition = transcribe_kwargs.get("condition_on_previous_text", True)
+        previous_text = ""
+        for start, end in zip(points[:-1], points[1:]):
+            kwargs = dict(transcribe_kwargs)
+            if condition and previous_text:
+                # 用上一段的结尾作为提示词，保持分段之间的上下文连贯
+                kwargs["initial_prompt"] = base_prompt + previous_text[-self.PROMPT_CONTEXT_CHARS:]
+
+            offset = start / SAMPLE_RATE
+            # 直接传入已解码的音频，模型不再重复解码
+            language, segments = iter_engine(self.engine, model, audio[start:end], kwargs)
+            if language:
+                stream.language = language
+
+            texts = []
+            for seg in segments:
+                texts.append(seg["text"])
+                yield TranscriptSegment(start=offset + seg["start"], end=offset + seg["end"],
+                                        text=seg["text"].strip()), seg["text"]
+            previous_text = "".join(texts).strip()
+
+    def _consume_stream(self, stream: TranscriptStream,
+                        progress_callback: Optional[Callable[[str, float], None]] = None,
+                        segment_callback: Optional[Callable[[TranscriptSegment], None]] = None
+                        ) -> TranscriptResult:
+        """读完流式结果，每个片段报告一次实际进度"""
+        for segment in stream:
+            if segment_callback:
+                segment_callback(segment)
+            self._report_progress(f"[{segment.end_formatted}] {segment.text[:40]}",
+                                  20 + 75 * stream.progress, progress_callback)
+        result = stream.result()
+        self._report_progress("转写完成!", 100, progress_callback)
+        return result
 
-        # 构建分段结果
-        segments = []
-        for seg in result.get("segments", []):
-            segments.append(TranscriptSegment(
-                start=seg["start"],
-                end=seg["end"],
-                text=seg["text"].strip()
-            ))
+    def transcribe(
+            self,
+            audio_path: str,
+            language: str = "zh",
+            task: str = "transcribe",
+            word_timestamps: bool = False,
+            use_simplified_chinese: bool = True,
+            progress_callback: Optional[Callable[[str, float], None]] = None,
+            segment_callback: Optional[Callable[[TranscriptSegment], None]] = None,
+            **kwargs
+    ) -> TranscriptResult:
+        """
+        转写音频文件
 
-        self._report_progress("转写完成!", 100)
+        Args:
+            audio_path: 音频文件路径
+            language: 语言代码 (zh, en, ja, etc.)，None 表示自动检测
+            task: "transcribe" 保留原语言，"translate" 翻译成英文
+            word_timestamps: 是否输出词级时间戳
+            use_simplified_chinese: 是否强制使用简体中文（仅对中文有效）
+            progress_callback: 本次转写的进度回调，多个任务共用一个实例时互不干扰
+            segment_callback: 每转写出一个片段时调用
+            **kwargs: 其他 whisper 参数
 
-        return TranscriptResult(
-            text=result["text"],
-            segments=segments,
-            language=result.get("language", language),
-            duration=duration
-        )
+        Returns:
+            TranscriptResult 对象
+        """
+        stream = self.transcribe_stream(audio_path, language, task, word_timestamps,
+                                        use_simplified_chinese, progress_callback, **kwargs)
+        return self._consume_stream(stream, progress_callback, segment_callback)
+
+    # ========== 长音频分段并行转写 ==========
+    @staticmethod
+    def find_split_points(audio: np.ndarray, chunk_seconds: float = 300,
+                          search_seconds: float = 20, frame_seconds: float = 0.03) -> List[int]:
+        """
+        按能量寻找切分点：在每个目标边界前后 search_seconds 内取短时能量最低的帧
+
+        只计算边界附近窗口的能量，长音频也不需要额外的整段内存
+
+        Returns:
+            切分点样本下标列表，首尾为 0 和音频长度
+        """
+        total = len(audio)
+        chunk = int(chunk_seconds * SAMPLE_RATE)
+        window = int(search_seconds * SAMPLE_RATE)
+        frame = max(1, int(frame_seconds * SAMPLE_RATE))
+
+        points = [0]
+        pos = 0
+        # 剩余部分不足 1.5 个分段时不再切分，避免末尾出现过短的分段
+        while total - pos > chunk * 1.5:
+            target = pos + chunk
+            lo = max(pos + frame, target - window)
+            hi = min(total - frame, target + window)
+            n_frames = (hi - lo) // frame
+            if n_frames <= 0:
+                break
+
+            frames = np.asarray(audio[lo:lo + n_frames * frame], dtype=np.float32).reshape(n_frames, frame)
+            energy = np.sqrt(np.mean(frames * frames, axis=1))
+            cut = lo + int(np.argmin(energy)) * frame + frame // 2
+            points.append(cut)
+            pos = cut
+
+        points.append(total)
+        return points
+
+    def _get_chunk_pool(self) -> ProcessPoolExecutor:
+        """常驻进程池，各进程加载一次模型后重复使用"""
+        if self._chunk_pool is None:
+            threads = max(1, (os.cpu_count() or 1) // self.chunk_workers)
+            self._chunk_pool = ProcessPoolExecutor(
+                max_workers=self.chunk_workers,
+                # spawn 避免在多线程的服务进程中 fork
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunk_worker,
+                initargs=(self.engine, self.model_size, self.compute_type, threads)
+            )
+        return self._chunk_pool
+
+    def _iter_chunked(self, audio: np.ndarray, transcribe_kwargs: dict, stream: TranscriptStream,
+                      progress_callback: Optional[Callable] = None
+                      ) -> Iterator[Tuple[TranscriptSegment, str]]:
+        """
+        分段并行转写，按全局时间戳产出 (片段, 原始文本)
+
+        各分段并行执行，结果按分段顺序产出：前面的分段完成后立即可见，无需等待全部完成
+        """
+        points = self.find_split_points(audio, self.chunk_seconds)
+        total = len(points) - 1
+        self._report_progress(f"正在并行转写 {total} 个分段（{self.chunk_workers} 个进程）...",
+                              20, progress_callback)
+
+        pool = self._get_chunk_pool()
+        futures = [
+            pool.submit(_transcribe_chunk, np.asarray(audio[start:end]),
+                        start / SAMPLE_RATE, transcribe_kwargs)
+            for start, end in zip(points[:-1], points[1:])
+        ]
+
+        languages = []
+        try:
+            for future in futures:
+                chunk_segments, chunk_language = future.result()
+                languages.append(chunk_language)
+                stream.language = max(set(languages), key=languages.count)
+                for start, end, text in chunk_segments:
+                    yield TranscriptSegment(start=start, end=end, text=text.strip()), text
+        finally:
+            # 提前结束时取消尚未开始的分段
+            for future in futures:
+                future.cancel()
+
+    def close(self):
+        """关闭分段转写进程池"""
+        if self._chunk_pool is not None:
+            self._chunk_pool.shutdown(wait=False, cancel_futures=True)
+            self._chunk_pool = None
 
     def transcribe_and_save(
             self,
             audio_path: str,
             output_dir: str,
             formats: List[str] = None,
+            segment_callback: Optional[Callable[[TranscriptSegment], None]] = None,
             **kwargs
     ) -> dict:
         """
-        转写并保存多种格式
+        转写并保存多种格式，片段转写出来即追加写入文件
 
         Args:
             audio_path: 音频文件路径
             output_dir: 输出目录
             formats: 输出格式列表 ["txt", "srt", "vtt", "json", "timestamped"]
+            segment_callback: 每转写出一个片段时调用
             **kwargs: 传递给 transcribe() 的参数
 
         Returns:
@@ -294,59 +808,66 @@ class WhisperTranscriber:
         if formats is None:
             formats = ["txt", "timestamped", "srt", "json"]
 
-        result = self.transcribe(audio_path, **kwargs)
-
-        os.makedirs(output_dir, exist_ok=True)
         base_name = os.path.splitext(os.path.basename(audio_path))[0]
+        writer = TranscriptWriter(output_dir, base_name, formats)
 
-        saved_files = {}
+        try:
+            stream = self.transcribe_stream(audio_path, **kwargs)
 
-        if "txt" in formats:
-            path = os.path.join(output_dir, f"{base_name}.txt")
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(result.to_plain_text())
-            saved_files["txt"] = path
-
-        if "timestamped" in formats:
-            path = os.path.join(output_dir, f"{base_name}_timestamped.txt")
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(result.to_timestamped_text())
-            saved_files["timestamped"] = path
-
-        if "srt" in formats:
-            path = os.path.join(output_dir, f"{base_name}.srt")
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(result.to_srt())
-            saved_files["srt"] = path
-
-        if "vtt" in formats:
-            path = os.path.join(output_dir, f"{base_name}.vtt")
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(result.to_vtt())
-            saved_files["vtt"] = path
-
-        if "json" in formats:
-            path = os.path.join(output_dir, f"{base_name}.json")
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(result.to_json())
-            saved_files["json"] = path
+            def on_segment(segment: TranscriptSegment):
+                writer.write(segment, stream.texts[-1])
+                if segment_callback:
+                    segment_callback(segment)
+
+            result = self._consume_stream(stream, kwargs.get("progress_callback"), on_segment)
+        except BaseException:
+            writer.discard()
+            raise
 
         return {
             "result": result,
-            "files": saved_files
+            "files": writer.finish(result)
         }
 
 
-# 全局转写器实例（懒加载）
-_transcriber: Optional[WhisperTranscriber] = None
+# ========== 分段转写子进程 ==========
+# 每个子进程持有的引擎与模型，由进程池的 initializer 加载
+_chunk_engine = None
+_chunk_model = None
+
+
+def _init_chunk_worker(engine: str, model_size: str, compute_type: str, threads: int):
+    """子进程初始化：限制每个进程的线程数，加载模型"""
+    global _chunk_engine, _chunk_model
+    if engine == "openai":
+        import torch
+        torch.set_num_threads(threads)
+    _chunk_engine = engine
+    _chunk_model = load_engine_model(engine, model_size, compute_type, cpu_threads=threads)
+
+
+def _transcribe_chunk(audio: np.ndarray, offset: float, transcribe_kwargs: dict):
+    """
+    转写一个分段，时间戳加上分段在整段音频中的起始时间
+
+    Returns:
+        ([(开始, 结束, 原始文本), ...], 语言)
+    """
+    language, segments = iter_engine(_chunk_engine, _chunk_model, audio, transcribe_kwargs)
+    return [(offset + seg["start"], offset + seg["end"], seg["text"]) for seg in segments], language
+
+
+# 全局模型池与转写器实例（懒加载），转写器按 (模型大小, 引擎) 区分，模型由模型池统一管理
+_model_manager = ModelManager(load_engine_model)
+_transcribers = {}
 
 
-def get_transcriber(model_size: str = "medium") -> WhisperTranscriber:
+def get_transcriber(model_size: str = "medium", engine: str = "openai") -> WhisperTranscriber:
     """获取全局转写器实例"""
-    global _transcriber
-    if _transcriber is None:
-        _transcriber = WhisperTranscriber(model_size)
-    return _transcriber
+    key = (model_size, engine)
+    if key not in _transcribers:
+        _transcribers[key] = WhisperTranscriber(model_size, engine=engine, model_manager=_model_manager)
+    return _transcribers[key]
 
 
 # ============ 命令行测试 ============
@@ -0,0 +1,190 @@
+# backend/transcript_cache.py
+"""
+转写结果持久化缓存模块
+以 音频内容哈希 + 转写参数 为键，将 TranscriptResult 保存在本地 SQLite 中；
+同一段音频即使重新下载到其他目录，也能直接取回结果而无需再次转写
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from transcriber import TranscriptResult
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class TranscriptCache:
+    """转写结果缓存（线程安全）"""
+
+    # 每写入多少次做一次淘汰；估计的条目数超出容量时立即淘汰
+    EVICT_INTERVAL = 200
+    # 超出容量时淘汰到容量的该比例，留出余量，避免缓存满后每次写入都触发淘汰
+    EVICT_TARGET_RATIO = 0.9
+
+    def __init__(self, db_path: str, max_entries: int = 10000):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite 数据库文件路径
+            max_entries: 最大缓存条目数，超出后按最近访问时间淘汰，小于等于 0 表示不限制
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS transcripts (
+                cache_key TEXT PRIMARY KEY,
+                audio_hash TEXT NOT NULL,
+                params TEXT NOT NULL,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_transcripts_accessed ON transcripts(accessed_at)'
+        )
+        # 文件哈希记录：大小与修改时间未变时直接复用，避免每次请求都读完整个音频
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS audio_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                sha256 TEXT NOT NULL
+            )
+        ''')
+        self._conn.commit()
+
+        # 条目数估计值：每次写入加一（覆盖已有条目时偏大），淘汰时校正
+        self._estimated_count = self._conn.execute('SELECT COUNT(*) FROM transcripts').fetchone()[0]
+        self._puts_since_evict = 0
+
+    def hash_audio(self, audio_path: str) -> str:
+        """计算音频文件内容的 SHA-256"""
+        path = os.path.abspath(audio_path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT size, mtime, sha256 FROM audio_hashes WHERE path = ?', (path,)
+            ).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime:
+            return row[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        sha256 = digest.hexdigest()
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO audio_hashes (path, size, mtime, sha256) VALUES (?, ?, ?, ?)',
+                (path, stat.st_size, stat.st_mtime, sha256)
+            )
+            self._conn.commit()
+        return sha256
+
+    @staticmethod
+    def make_key(audio_hash: str, params: Dict) -> str:
+        """由音频哈希和转写参数（模型、语言、任务、提示词等）生成缓存键"""
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(f'{audio_hash}\n{payload}'.encode('utf-8')).hexdigest()
+
+    def key_for(self, audio_path: str, params: Dict) -> str:
+        """音频文件与转写参数对应的缓存键"""
+        return self.make_key(self.hash_audio(audio_path), params)
+
+    def get(self, cache_key: str) -> Optional[TranscriptResult]:
+        """读取缓存，未命中时返回 None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM transcripts WHERE cache_key = ?', (cache_key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                'UPDATE transcripts SET accessed_at = ? WHERE cache_key = ?', (time.time(), cache_key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return TranscriptResult.from_json(row[0])
+
+    def find_by_audio(self, audio_hash: str) -> Optional[TranscriptResult]:
+        """任意参数下同一音频最近写入的结果（用于为已有转写补建索引），不计入命中统计"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM transcripts WHERE audio_hash = ? ORDER BY created_at DESC LIMIT 1',
+                (audio_hash,)
+            ).fetchone()
+        return TranscriptResult.from_json(row[0]) if row else None
+
+    def put(self, cache_key: str, result: TranscriptResult, audio_hash: str = '', params: Dict = None):
+        """写入缓存，每 EVICT_INTERVAL 次写入或估计超出容量时淘汰最久未访问的条目"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO transcripts '
+                '(cache_key, audio_hash, params, data, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (cache_key, audio_hash, json.dumps(params or {}, sort_keys=True, ensure_ascii=False),
+                 result.to_json(), now, now)
+            )
+            self._estimated_count += 1
+            self._puts_since_evict += 1
+            if (self._puts_since_evict >= self.EVICT_INTERVAL
+                    or 0 < self.max_entries < self._estimated_count):
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """淘汰超出容量的条目，并校正条目数估计值（调用方需持有锁）"""
+        count = self._conn.execute('SELECT COUNT(*) FROM transcripts').fetchone()[0]
+        if 0 < self.max_entries < count:
+            overflow = count - int(self.max_entries * self.EVICT_TARGET_RATIO)
+            cursor = self._conn.execute(
+                'DELETE FROM transcripts WHERE cache_key IN ('
+                'SELECT cache_key FROM transcripts ORDER BY accessed_at ASC LIMIT ?)',
+                (overflow,)
+            )
+            self.evictions += cursor.rowcount
+            count -= cursor.rowcount
+
+        self._estimated_count = count
+        self._puts_since_evict = 0
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute('DELETE FROM transcripts')
+            self._conn.execute('DELETE FROM audio_hashes')
+            self._conn.commit()
+            self._estimated_count = 0
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计信息"""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM transcripts').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,231 @@
+# backend/transcript_index.py
+"""
+转写全文检索模块
+以转写片段为单位建立 SQLite FTS5 倒排索引，按 BVID 增量更新；
+中文按相邻两字（二元组）切分，英文与数字按单词切分，不依赖分词词典。
+查询返回命中的视频、片段起止时间与摘录
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from transcriber import TranscriptResult
+
+# 中日韩文字按二元组切分，其余按单词切分
+_CJK_RANGE = '㐀-䶿一-鿿豈-﫿぀-ヿ가-힯'
+_TOKEN_PATTERN = re.compile(f'[{_CJK_RANGE}]+|[^\\W_{_CJK_RANGE}]+')
+_CJK_PATTERN = re.compile(f'[{_CJK_RANGE}]')
+
+SNIPPET_CONTEXT = 30  # 摘录中命中位置前后保留的字数
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    切分文本：连续的中文切成二元组，并在末尾补上最后一个字，使单字查询也能以前缀匹配命中；
+    英文与数字转为小写单词
+    """
+    tokens = []
+    for run in _TOKEN_PATTERN.findall(text):
+        if _CJK_PATTERN.match(run):
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            tokens.append(run[-1])
+        else:
+            tokens.append(run.lower())
+    return tokens
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    将用户输入转为 FTS5 查询：每个连续的词或中文片段作为一个短语（二元组须相邻出现），各短语同时满足
+
+    Returns:
+        FTS5 查询串，没有可检索的内容时返回 None
+    """
+    phrases = []
+    for run in _TOKEN_PATTERN.findall(query):
+        if _CJK_PATTERN.match(run):
+            if len(run) == 1:
+                phrases.append(f'"{run}"*')
+            else:
+                phrases.append('"' + ' '.join(run[i:i + 2] for i in range(len(run) - 1)) + '"')
+        else:
+            phrases.append(f'"{run.lower()}"')
+    return ' '.join(phrases) or None
+
+
+def make_snippet(text: str, terms: List[str]) -> Tuple[str, List[List[int]]]:
+    """
+    截取命中位置附近的文本
+
+    Returns:
+        (摘录, 摘录中各命中词的 [起, 止) 位置)
+    """
+    lowered = text.lower()
+    positions = []
+    for term in terms:
+        start = lowered.find(term)
+        while start >= 0:
+            positions.append((start, start + len(term)))
+            start = lowered.find(term, start + len(term))
+    if not positions:
+        return text[:SNIPPET_CONTEXT * 2], []
+
+    positions.sort()
+    begin = max(0, positions[0][0] - SNIPPET_CONTEXT)
+    end = min(len(text), positions[0][1] + SNIPPET_CONTEXT)
+    prefix = '…' if begin > 0 else ''
+    suffix = '…' if end < len(text) else ''
+    offset = len(prefix) - begin
+    highlights = [[s + offset, e + offset] for s, e in positions if s >= begin and e <= end]
+    return prefix + text[begin:end] + suffix, highlights
+
+
+class TranscriptIndex:
+    """转写全文索引（线程安全）"""
+
+    def __init__(self, db_path: str):
+        """
+        初始化索引
+
+        Args:
+            db_path: SQLite 数据库文件路径
+        """
+        self.db_path = db_path
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS indexed_transcripts (
+                bvid TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                language TEXT,
+                duration REAL NOT NULL,
+                segment_count INTEGER NOT NULL,
+                indexed_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS transcript_segments (
+                id INTEGER PRIMARY KEY,
+                bvid TEXT NOT NULL,
+                start REAL NOT NULL,
+                end REAL NOT NULL,
+                text TEXT NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_transcript_segments_bvid ON transcript_segments(bvid)'
+        )
+        # 倒排索引，rowid 与 transcript_segments.id 对应，只保存切分后的词
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS transcript_segments_fts USING fts5(tokens, tokenize='unicode61')"
+        )
+        self._conn.commit()
+
+    def index(self, bvid: str, result: TranscriptResult, title: str = ''):
+        """建立（或重建）一个视频的索引"""
+        rows = [(seg.start, seg.end, seg.text.strip()) for seg in result.segments if seg.text.strip()]
+        with self._lock:
+            self._delete(bvid)
+            for start, end, text in rows:
+                cursor = self._conn.execute(
+                    'INSERT INTO transcript_segments (bvid, start, end, text) VALUES (?, ?, ?, ?)',
+                    (bvid, start, end, text)
+                )
+                self._conn.execute(
+                    'INSERT INTO transcript_segments_fts (rowid, tokens) VALUES (?, ?)',
+                    (cursor.lastrowid, ' '.join(tokenize(text)))
+                )
+            self._conn.execute(
+                'INSERT OR REPLACE INTO indexed_transcripts '
+                '(bvid, title, language, duration, segment_count, indexed_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (bvid, title or bvid, result.language, result.duration, len(rows), time.time())
+            )
+            self._conn.commit()
+
+    def remove(self, bvid: str):
+        with self._lock:
+            self._delete(bvid)
+            self._conn.commit()
+
+    def _delete(self, bvid: str):
+        """删除一个视频的索引（调用方需持有锁）"""
+        self._conn.execute(
+            'DELETE FROM transcript_segments_fts WHERE rowid IN '
+            '(SELECT id FROM transcript_segments WHERE bvid = ?)', (bvid,)
+        )
+        self._conn.execute('DELETE FROM transcript_segments WHERE bvid = ?', (bvid,))
+        self._conn.execute('DELETE FROM indexed_transcripts WHERE bvid = ?', (bvid,))
+
+    def is_indexed(self, bvid: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                'SELECT 1 FROM indexed_transcripts WHERE bvid = ?', (bvid,)
+            ).fetchone() is not None
+
+    def search(self, query: str, limit: int = 50, offset: int = 0,
+               bvid: Optional[str] = None) -> Tuple[List[Dict], int]:
+        """
+        检索转写片段，按相关度排序
+
+        Args:
+            query: 检索词，空格分隔的多个词需同时出现在同一片段中
+            limit / offset: 分页
+            bvid: 只在该视频中检索
+
+        Returns:
+            (命中的片段, 命中总数)
+        """
+        match = build_match_query(query)
+        if match is None:
+            return [], 0
+
+        where = 'transcript_segments_fts MATCH ?'
+        args = [match]
+        if bvid:
+            where += ' AND s.bvid = ?'
+            args.append(bvid)
+
+        with self._lock:
+            total = self._conn.execute(
+                f'SELECT COUNT(*) FROM transcript_segments_fts '
+                f'JOIN transcript_segments s ON s.id = transcript_segments_fts.rowid WHERE {where}', args
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                f'SELECT s.bvid, t.title, s.start, s.end, s.text, bm25(transcript_segments_fts) AS score '
+                f'FROM transcript_segments_fts '
+                f'JOIN transcript_segments s ON s.id = transcript_segments_fts.rowid '
+                f'JOIN indexed_transcripts t ON t.bvid = s.bvid '
+                f'WHERE {where} ORDER BY score, s.bvid, s.start LIMIT ? OFFSET ?',
+                args + [limit, offset]
+            ).fetchall()
+
+        terms = [run.lower() for run in _TOKEN_PATTERN.findall(query)]
+        hits = []
+        for hit_bvid, title, start, end, text, score in rows:
+            snippet, highlights = make_snippet(text, terms)
+            hits.append({
+                'bvid': hit_bvid,
+                'title': title,
+                'start': start,
+                'end': end,
+                'snippet': snippet,
+                'highlights': highlights,
+                'score': round(-score, 3),
+            })
+        return hits, total
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            transcripts, segments = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(segment_count), 0) FROM indexed_transcripts'
+            ).fetchone()
+        return {
+            'transcripts': transcripts,
+            'segments': segments,
+        }
@@ -25,6 +25,20 @@ let videosPerPage = 50;                // 每页数量
 
 // 轮询
 let crawlerPollingInterval = null;
+let currentCrawlJobId = null;          // 当前爬取任务ID
+let crawlLogCursor = 0;                // 已收到的最后一条爬虫日志序号
+let crawlVideoCursor = 0;              // 已收到的最后一个视频序号
+let crawlVideos = [];                  // 本次爬取已收到的视频
+let crawlerStatusPending = false;      // 上一次状态请求尚未返回
+
+
+// 事件推送（SSE），不可用时回退到轮询
+let eventSource = null;
+let sseConnected = false;
+let lastCrawlerUpdateAt = 0;           // 最近一次收到爬虫状态的时间
+let crawlerRefreshTimer = null;
+const taskEventHandlers = {};          // 任务ID -> 状态处理函数
+const SSE_FALLBACK_INTERVAL = 15000;   // SSE 正常时的兜底轮询间隔（毫秒）
 
 
 // 转写队列
@@ -37,6 +51,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initEventListeners();
     loadSavedData();
     loadDownloadedInfo();
+    connectEventStream();
 });
 
 
@@ -346,6 +361,7 @@ async function startCrawl() {
         formData.append('pages', document.getElementById('pages-to-crawl').value);
         formData.append('enable_detailed_info', document.getElementById('enable-detailed-info').checked);
         formData.append('remove_duplicates', document.getElementById('remove-duplicates').checked);
+        formData.append('force_refresh', document.getElementById('force-refresh').checked);
 
         const response = await fetch(endpoint, {
             method: 'POST',
@@ -356,6 +372,10 @@ async function startCrawl() {
 
         if (response.ok) {
             showNotification(`开始搜索，共 ${data.keywords_count} 个关键词`, 'success');
+            currentCrawlJobId = data.job_id;
+            crawlLogCursor = 0;
+            crawlVideoCursor = 0;
+            crawlVideos = [];
             startCrawlerPolling();
         } else {
             showNotification('错误: ' + data.error, 'error');
@@ -370,53 +390,105 @@ async function startCrawl() {
 }
 
 
+function crawlerJobUrl(action) {
+    if (!currentCrawlJobId) return `/api/crawler/${action}`;
+    return `/api/crawler/jobs/${encodeURIComponent(currentCrawlJobId)}/${action}`;
+}
+
+
 function startCrawlerPolling() {
+    stopCrawlerPolling();
+    lastCrawlerUpdateAt = Date.now();
+    crawlerPollingInterval = setInterval(crawlerPollTick, 1000);
+}
+
+
+function stopCrawlerPolling() {
     if (crawlerPollingInterval) clearInterval(crawlerPollingInterval);
-    crawlerPollingInterval = setInterval(updateCrawlerStatus, 1000);
+    crawlerPollingInterval = null;
+}
+
+
+function crawlerPollTick() {
+    // SSE 正常推送时不轮询，长时间没有收到状态才兜底请求一次
+    if (sseConnected && Date.now() - lastCrawlerUpdateAt < SSE_FALLBACK_INTERVAL) return;
+    updateCrawlerStatus();
+}
+
+
+function scheduleCrawlerRefresh() {
+    // 合并短时间内的多次事件，只拉取一次增量
+    if (crawlerRefreshTimer) return;
+    crawlerRefreshTimer = setTimeout(() => {
+        crawlerRefreshTimer = null;
+        updateCrawlerStatus();
+    }, 500);
+}
+
+
+function renderCrawlerProgress(status) {
+    // 更新进度
+    document.getElementById('crawl-progress-bar').style.width = `${status.progress}%`;
+    document.getElementById('crawl-progress-text').textContent = `${Math.round(status.progress)}%`;
+
+    // 更新状态
+    let statusText = status.current_task || '处理中...';
+    if (status.current_keyword) {
+        statusText = `${status.current_keyword} (${status.processed_keywords + 1}/${status.total_keywords})`;
+    }
+    document.getElementById('crawl-status').textContent = statusText;
+
+    // 更新按钮
+    if (status.is_paused) {
+        document.getElementById('pause-crawl').classList.add('hidden');
+        document.getElementById('resume-crawl').classList.remove('hidden');
+    } else {
+        document.getElementById('pause-crawl').classList.remove('hidden');
+        document.getElementById('resume-crawl').classList.add('hidden');
+    }
 }
 
 
 async function updateCrawlerStatus() {
+    // 上一次请求未返回时跳过，避免同一游标被重复使用
+    if (crawlerStatusPending) return;
+    crawlerStatusPending = true;
+
     try {
-        const response = await fetch('/api/crawler/status');
+        // 只拉取游标之后的日志和视频，响应大小与爬取总量无关
+        const params = new URLSearchParams({
+            log_cursor: crawlLogCursor,
+            video_cursor: crawlVideoCursor
+        });
+        const response = await fetch(`${crawlerJobUrl('status')}?${params}`);
         const status = await response.json();
+        crawlLogCursor = status.log_cursor;
+        crawlVideoCursor = status.video_cursor;
+        lastCrawlerUpdateAt = Date.now();
 
-        // 更新进度
-        document.getElementById('crawl-progress-bar').style.width = `${status.progress}%`;
-        document.getElementById('crawl-progress-text').textContent = `${Math.round(status.progress)}%`;
-
-        // 更新状态
-        let statusText = status.current_task || '处理中...';
-        if (status.current_keyword) {
-            statusText = `${status.current_keyword} (${status.processed_keywords + 1}/${status.total_keywords})`;
-        }
-        document.getElementById('crawl-status').textContent = statusText;
+        renderCrawlerProgress(status);
 
-        // 更新按钮
-        if (status.is_paused) {
-            document.getElementById('pause-crawl').classList.add('hidden');
-            document.getElementById('resume-crawl').classList.remove('hidden');
-        } else {
-            document.getElementById('pause-crawl').classList.remove('hidden');
-            document.getElementById('resume-crawl').classList.add('hidden');
-        }
-
-        // 实时更新视频列表
-        if (status.videos && status.videos.length > allVideos.length) {
-            allVideos = status.videos;
+        // 实时追加新视频
+        if (status.videos && status.videos.length > 0) {
+            crawlVideos.push(...status.videos);
+            allVideos = crawlVideos;
             saveData();
             renderVideoList();
         }
+        if (status.has_more_videos) {
+            scheduleCrawlerRefresh();
+        }
 
         // 完成检查
         if (!status.is_running) {
-            clearInterval(crawlerPollingInterval);
+            stopCrawlerPolling();
             document.getElementById('search-progress').classList.add('hidden');
             document.getElementById('start-crawl').disabled = false;
 
             if (status.progress === 100 && !status.error) {
-                showNotification(`搜索完成，共获取 ${status.videos.length} 个视频`, 'success');
-                allVideos = status.videos;
+                // 详细信息补充后的数据通过分页接口重新加载
+                allVideos = await loadCrawlVideos();
+                showNotification(`搜索完成，共获取 ${allVideos.length} 个视频`, 'success');
                 saveData();
                 renderVideoList();
                 closePanel('search');
@@ -426,25 +498,45 @@ async function updateCrawlerStatus() {
         }
     } catch (error) {
         console.error('获取状态失败:', error);
+    } finally {
+        crawlerStatusPending = false;
     }
 }
 
 
+async function loadCrawlVideos() {
+    const pageSize = 1000;
+    let videos = [];
+    let total = Infinity;
+
+    while (videos.length < total) {
+        const params = new URLSearchParams({ offset: videos.length, limit: pageSize });
+        const response = await fetch(`${crawlerJobUrl('videos')}?${params}`);
+        const data = await response.json();
+        if (!response.ok || data.videos.length === 0) break;
+        videos = videos.concat(data.videos);
+        total = data.total;
+    }
+
+    return videos;
+}
+
+
 async function pauseCrawl() {
-    await fetch('/api/crawler/pause', { method: 'POST' });
+    await fetch(crawlerJobUrl('pause'), { method: 'POST' });
     showNotification('已暂停', 'warning');
 }
 
 
 async function resumeCrawl() {
-    await fetch('/api/crawler/resume', { method: 'POST' });
+    await fetch(crawlerJobUrl('resume'), { method: 'POST' });
     showNotification('继续搜索', 'success');
 }
 
 
 async function stopCrawl() {
-    await fetch('/api/crawler/stop', { method: 'POST' });
-    clearInterval(crawlerPollingInterval);
+    await fetch(crawlerJobUrl('stop'), { method: 'POST' });
+    stopCrawlerPolling();
     document.getElementById('search-progress').classList.add('hidden');
     document.getElementById('start-crawl').disabled = false;
     showNotification('已停止', 'warning');
@@ -629,10 +721,11 @@ function renderCardDetail(video, detail) {
     // AI总结
     html += '<div class="detail-section">';
     html += '<div class="detail-section-title">🤖 AI总结</div>';
-    if (detail.summary) {
+    if (detail.summary || detail.summaryDraft !== undefined) {
+        // summaryDraft 为流式生成中的总结，生成过程中直接更新该元素
         html += `
             <div class="content-bubble">
-                <div class="bubble-content">${escapeHtml(detail.summary)}</div>
+                <div class="bubble-content" id="summary-content-${bvid}">${escapeHtml(detail.summary || detail.summaryDraft || '正在生成总结...')}</div>
             </div>
         `;
     } else {
@@ -952,35 +1045,27 @@ async function processTranscribeQueue() {
 
 
 function waitForTranscribeComplete(taskId, bvid) {
-    return new Promise((resolve) => {
-        const poll = async () => {
-            try {
-                const response = await fetch(`/api/transcribe/status/${taskId}`);
-                const status = await response.json();
-
-                const displayTaskId = `transcribe_${bvid}`;
-                const progress = Math.round(status.progress || 0);
-
-                updateTaskInFloat(displayTaskId, status.status, progress, status.message);
-
-                if (status.status === 'completed') {
-                    videoDetails[bvid] = videoDetails[bvid] || {};
-                    videoDetails[bvid].transcript = status.text;
-                    saveData();
-                    renderVideoList();
-                    loadDownloadedInfo();
-                    resolve();
-                } else if (status.status === 'error') {
-                    resolve();
-                } else {
-                    setTimeout(poll, 2000);
-                }
-            } catch (error) {
-                console.error('获取转写状态失败:', error);
-                setTimeout(poll, 3000);
+    const statusUrl = `/api/transcribe/status/${taskId}`;
+
+    return trackTaskStatus(taskId, statusUrl, 2000, async (status) => {
+        const displayTaskId = `transcribe_${bvid}`;
+        const progress = Math.round(status.progress || 0);
+
+        updateTaskInFloat(displayTaskId, status.status, progress, status.message);
+
+        if (status.status === 'completed') {
+            // 推送事件不含转写全文，完成后再取一次完整状态
+            if (status.text === undefined) {
+                status = await (await fetch(statusUrl)).json();
             }
-        };
-        poll();
+            videoDetails[bvid] = videoDetails[bvid] || {};
+            videoDetails[bvid].transcript = status.text;
+            saveData();
+            renderVideoList();
+            loadDownloadedInfo();
+            return true;
+        }
+        return status.status === 'error';
     });
 }
 
@@ -1044,6 +1129,8 @@ async function singleSummary(bvid) {
     }
 
     showNotification('正在生成总结...', 'info');
+    videoDetails[bvid].summaryDraft = '';
+    renderVideoList();
 
     try {
         const response = await fetch('/api/summarize', {
@@ -1051,28 +1138,84 @@ async function singleSummary(bvid) {
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 text: detail.transcript,
+                bvid: bvid,
                 base_url: document.getElementById('api-base-url').value,
                 api_key: apiKey,
                 model: document.getElementById('api-model').value,
                 prompt: document.getElementById('summary-prompt').value,
-                include_timestamps: document.getElementById('include-timestamps').checked
+                include_timestamps: document.getElementById('include-timestamps').checked,
+                stream: true
             })
         });
 
-        const data = await response.json();
+        if (!response.ok) {
+            const data = await response.json();
+            throw new Error(data.error || response.statusText);
+        }
 
-        if (data.error) {
-            showNotification('总结失败: ' + data.error, 'error');
-            return;
+        // 流式结果：生成的文本边到达边显示
+        let result = null;
+        await readEventStream(response, (event, data) => {
+            if (event === 'delta') {
+                videoDetails[bvid].summaryDraft += data.content;
+                const el = document.getElementById(`summary-content-${bvid}`);
+                if (el) el.textContent = videoDetails[bvid].summaryDraft;
+            } else if (event === 'chunk') {
+                const el = document.getElementById(`summary-content-${bvid}`);
+                if (el && !videoDetails[bvid].summaryDraft) el.textContent = `正在分段总结（已完成第 ${data.index + 1} 段）...`;
+            } else if (event === 'done') {
+                result = data;
+            } else if (event === 'error') {
+                throw new Error(data.error);
+            }
+        });
+
+        if (!result) {
+            throw new Error('连接中断');
         }
 
-        videoDetails[bvid].summary = data.summary;
+        delete videoDetails[bvid].summaryDraft;
+        videoDetails[bvid].summary = result.summary;
         saveData();
         renderVideoList();
-        showNotification('总结完成', 'success');
+        if (result.cached) {
+            showNotification('总结完成（已有相同总结）', 'success');
+        } else {
+            showNotification(`总结完成（首字 ${result.first_token_seconds ?? '-'} 秒，共 ${result.elapsed} 秒）`, 'success');
+        }
 
     } catch (error) {
-        showNotification('总结请求失败: ' + error.message, 'error');
+        delete videoDetails[bvid].summaryDraft;
+        renderVideoList();
+        showNotification('总结失败: ' + error.message, 'error');
+    }
+}
+
+
+// 读取 fetch 返回的 SSE 流，逐个事件回调 onEvent(event, data)
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            });
+            if (data) onEvent(event, JSON.parse(data));
+        }
     }
 }
 
@@ -1124,7 +1267,10 @@ function addTaskToFloat(taskId, type, info) {
         <div class="task-item" id="task-${taskId}">
             <div class="task-item-header">
                 <span class="task-item-title">${typeLabels[type] || type} - ${escapeHtml(String(info))}</span>
-                <span class="task-item-status status-running" id="status-${taskId}">进行中</span>
+                <span>
+                    <span class="task-item-status status-running" id="status-${taskId}">进行中</span>
+                    ${type === 'download' ? `<button class="task-item-cancel" id="cancel-${taskId}" title="取消" onclick="cancelDownload('${taskId}')">&times;</button>` : ''}
+                </span>
             </div>
             <div class="task-item-progress">
                 <div class="task-item-progress-fill" id="progress-${taskId}" style="width: 0%"></div>
@@ -1147,12 +1293,24 @@ function updateTaskInFloat(taskId, status, progress, message) {
     progressEl.style.width = `${progress}%`;
     messageEl.textContent = message || '';
 
+    // 任务结束后移除取消按钮
+    const cancelEl = document.getElementById(`cancel-${taskId}`);
+    if (cancelEl && ['completed', 'error', 'cancelled'].includes(status)) {
+        cancelEl.remove();
+    }
+
     if (status === 'completed') {
         statusEl.textContent = '完成';
         statusEl.className = 'task-item-status status-completed';
     } else if (status === 'error') {
         statusEl.textContent = '失败';
         statusEl.className = 'task-item-status status-error';
+    } else if (status === 'queued') {
+        statusEl.textContent = '排队中';
+        statusEl.className = 'task-item-status status-queued';
+    } else if (status === 'cancelled') {
+        statusEl.textContent = '已取消';
+        statusEl.className = 'task-item-status status-cancelled';
     } else {
         statusEl.textContent = '进行中';
         statusEl.className = 'task-item-status status-running';
@@ -1174,32 +1332,107 @@ function toggleTaskFloat() {
 }
 
 
-async function pollDownloadStatus(taskId) {
-    const poll = async () => {
-        try {
-            const response = await fetch(`/api/download/status/${taskId}`);
-            const status = await response.json();
-
-            const progress = Math.round(status.progress || 0);
-            updateTaskInFloat(taskId, status.status, progress, status.message);
+function pollDownloadStatus(taskId) {
+    return trackTaskStatus(taskId, `/api/download/status/${taskId}`, 1000, (status) => {
+        const progress = Math.round(status.progress || 0);
+        updateTaskInFloat(taskId, status.status, progress, status.message);
 
-            if (status.status === 'completed') {
-                const bvid = taskId.split('_')[0];
-                // 重新加载该视频的详情
-                if (videoDetails[bvid]) {
-                    videoDetails[bvid].loaded = false;
-                }
-                loadVideoDetail(bvid);
-                loadDownloadedInfo();
-            } else if (status.status !== 'error') {
-                setTimeout(poll, 1000);
+        if (status.status === 'completed') {
+            const bvid = taskId.split('_')[0];
+            // 重新加载该视频的详情
+            if (videoDetails[bvid]) {
+                videoDetails[bvid].loaded = false;
             }
-        } catch (error) {
-            console.error('获取下载状态失败:', error);
-            setTimeout(poll, 2000);
+            loadVideoDetail(bvid);
+            loadDownloadedInfo();
+            return true;
         }
-    };
-    poll();
+        return status.status === 'error' || status.status === 'cancelled';
+    });
+}
+
+
+async function cancelDownload(taskId) {
+    try {
+        const response = await fetch(`/api/download/cancel/${taskId}`, { method: 'POST' });
+        const data = await response.json();
+        if (!response.ok) {
+            showNotification(data.error, 'warning');
+        }
+    } catch (error) {
+        showNotification('取消失败: ' + error.message, 'error');
+    }
+}
+
+
+// ========== 事件推送 ==========
+function connectEventStream() {
+    if (!window.EventSource) return;   // 不支持 SSE 时只使用轮询
+
+    eventSource = new EventSource('/api/events');
+    eventSource.onopen = () => { sseConnected = true; };
+    eventSource.onerror = () => { sseConnected = false; };  // 浏览器会自动重连
+
+    eventSource.addEventListener('crawler', (e) => handleCrawlerEvent(JSON.parse(e.data)));
+    for (const type of ['download', 'transcribe']) {
+        eventSource.addEventListener(type, (e) => {
+            const status = JSON.parse(e.data);
+            const handler = taskEventHandlers[status.task_id];
+            if (handler) handler(status);
+        });
+    }
+}
+
+
+function handleCrawlerEvent(status) {
+    if (!crawlerPollingInterval || status.job_id !== currentCrawlJobId) return;
+
+    lastCrawlerUpdateAt = Date.now();
+    renderCrawlerProgress(status);
+
+    // 有新视频或任务结束时拉取一次增量
+    if (status.total_videos > crawlVideos.length || !status.is_running) {
+        scheduleCrawlerRefresh();
+    }
+}
+
+
+/**
+ * 跟踪后台任务状态直到结束
+ * SSE 连接正常时由推送事件驱动，只做低频兜底轮询；否则按 pollInterval 轮询
+ * onStatus 返回 true 表示任务已结束
+ */
+function trackTaskStatus(taskId, statusUrl, pollInterval, onStatus) {
+    return new Promise((resolve) => {
+        let finished = false;
+        let timer = null;
+
+        const handle = async (status) => {
+            if (finished) return;
+            if (await onStatus(status)) {
+                finished = true;
+                clearTimeout(timer);
+                delete taskEventHandlers[taskId];
+                resolve();
+            }
+        };
+
+        const poll = async () => {
+            if (finished) return;
+            try {
+                const response = await fetch(statusUrl);
+                await handle(await response.json());
+            } catch (error) {
+                console.error('获取任务状态失败:', error);
+            }
+            if (!finished) {
+                timer = setTimeout(poll, sseConnected ? SSE_FALLBACK_INTERVAL : pollInterval);
+            }
+        };
+
+        taskEventHandlers[taskId] = handle;
+        poll();
+    });
 }
 
 
@@ -1247,6 +1480,10 @@ async function loadDownloadedInfo() {
                 videoDetails[item.bvid].hasAudio = item.has_audio;
                 videoDetails[item.bvid].hasVideo = item.has_video;
                 videoDetails[item.bvid].hasTranscript = item.has_transcript;
+                // 已保存到视频目录的总结，无需再次调用接口
+                if (item.summary && !videoDetails[item.bvid].summary) {
+                    videoDetails[item.bvid].summary = item.summary;
+                }
             });
             saveData();
             renderVideoList();
@@ -1263,7 +1500,7 @@ function exportData() {
         return;
     }
 
-    window.location.href = '/api/crawler/download';
+    window.location.href = crawlerJobUrl('download');
     showNotification('正在导出Excel...', 'info');
 }
 